@@ -0,0 +1,102 @@
+"""Cost of the Prometheus instrumentation.
+
+Reports the per-operation cost of the metric primitives used on hot paths,
+then the mean latency of ``POST /chat/{user_id}`` served in-process (SQLite
+temp file, mock OpenAI client) with ``METRICS_ENABLED`` on and off::
+
+    python -m benchmarks.bench_metrics_overhead --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _per_op(fn: object, repeat: int) -> float:
+    assert callable(fn)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def _primitives(repeat: int) -> None:
+    from src.core.metrics import Counter, Histogram
+
+    histogram = Histogram("bench_seconds", "Benchmark.", ("stage",))
+    counter = Counter("bench_total", "Benchmark.", ("status",))
+    child = histogram.labels("stage")
+
+    def timed() -> None:
+        with child.time():
+            pass
+
+    print(f"{'operation':<28} {'ns/op':>8}")
+    for label, fn in (
+        ("counter.labels().inc()", lambda: counter.labels("200").inc()),
+        ("histogram child.observe()", lambda: child.observe(0.003)),
+        ("with child.time()", timed),
+        ("empty loop", lambda: None),
+    ):
+        print(f"{label:<28} {_per_op(fn, repeat) * 1e9:>8.0f}")
+
+
+async def _mean_latency(enabled: bool, requests: int) -> float:
+    import httpx
+
+    from src.core.config import get_settings
+
+    os.environ["METRICS_ENABLED"] = "1" if enabled else "0"
+    get_settings.cache_clear()
+
+    from src.db.session import init_db
+    from src.main import create_app
+
+    await init_db()
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        for _ in range(50):
+            await client.post("/chat/bench", json={"message": "hello"})
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.post("/chat/bench", json={"message": "hello"})
+            response.raise_for_status()
+        return (time.perf_counter() - start) / requests
+
+
+async def _requests(requests: int, rounds: int) -> None:
+    # Alternate the two variants so drift affects both equally.
+    samples: dict[bool, list[float]] = {False: [], True: []}
+    for _ in range(rounds):
+        for enabled in (False, True):
+            samples[enabled].append(await _mean_latency(enabled, requests))
+    off, on = min(samples[False]), min(samples[True])
+    print()
+    print(f"{'POST /chat/{user_id}':<28} {'mean us':>8}")
+    print(f"{'metrics off':<28} {off * 1e6:>8.1f}")
+    print(f"{'metrics on':<28} {on * 1e6:>8.1f}")
+    print(f"{'overhead':<28} {(on - off) / off:>8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ["USE_MOCK_OPENAI"] = "1"
+    os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+
+    _primitives(args.repeat)
+    asyncio.run(_requests(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
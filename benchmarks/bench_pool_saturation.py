@@ -0,0 +1,146 @@
+"""Connection-pool saturation, to size ``DB_POOL_SIZE`` per worker.
+
+Runs ``--concurrency`` tasks that each issue the repository calls of one chat
+request (a clean ``admit`` and a block check) back to back for ``--duration``
+seconds, once per pool size, with ``DB_MAX_OVERFLOW``/``DB_POOL_TIMEOUT``
+taken from the flags. For each size it reports throughput, request latency
+percentiles, the time spent waiting for a pooled connection and how many
+requests timed out waiting::
+
+    python -m benchmarks.bench_pool_saturation --pool-sizes 2 5 10 20 \\
+        --concurrency 100 --url postgresql+asyncpg://user:pw@localhost/bench
+
+Throughput stops improving once the pool is larger than what the database
+can serve in parallel; past that point, extra connections only add
+server-side load. Without ``--url`` a temporary SQLite file is used, which
+only shows the pool's queueing behaviour. Tables are reset.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _run_pool(
+    url: str, pool_size: int, args: argparse.Namespace
+) -> dict[str, float]:
+    from sqlalchemy import event
+    from sqlalchemy.exc import TimeoutError as PoolTimeout
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from src.core.config import get_settings
+    from src.db.models import Base
+    from src.db.session import create_engine
+    from src.repository.user_repository import UserRepository
+
+    settings = get_settings().model_copy(
+        update={
+            "db_pool_size": pool_size,
+            "db_max_overflow": args.max_overflow,
+            "db_pool_timeout": args.pool_timeout,
+        }
+    )
+    engine = create_engine(url, settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    repo = UserRepository(factory)
+    users = [f"user-{i}" for i in range(args.users)]
+    for user_id in users:
+        await repo.admit(user_id)
+
+    # Time from asking the pool for a connection to getting one.
+    waits: list[float] = []
+    asked: dict[int, float] = {}
+
+    @event.listens_for(engine.sync_engine, "engine_connect")
+    def _connected(conn: object) -> None:
+        start = asked.pop(id(asyncio.current_task()), None)
+        if start is not None:
+            waits.append(time.perf_counter() - start)
+
+    latencies: list[float] = []
+    timeouts = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(offset: int) -> None:
+        nonlocal timeouts
+        i = offset
+        while time.perf_counter() < deadline:
+            user_id = users[i % len(users)]
+            i += args.concurrency
+            start = time.perf_counter()
+            asked[id(asyncio.current_task())] = start
+            try:
+                await repo.admit(user_id)
+                await repo.is_user_blocked(user_id)
+            except PoolTimeout:
+                timeouts += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await repo.aclose()
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 0.5),
+        "p99": _percentile(latencies, 0.99),
+        "wait": statistics.fmean(waits) if waits else 0.0,
+        "timeouts": timeouts,
+    }
+
+
+async def _run(url: str, args: argparse.Namespace) -> None:
+    print(
+        f"{'pool':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'wait ms':>9} {'timeouts':>9}"
+    )
+    for size in args.pool_sizes:
+        r = await _run_pool(url, size, args)
+        print(
+            f"{size:>5} {r['throughput']:>9.0f} {r['p50'] * 1e3:>9.2f} "
+            f"{r['p99'] * 1e3:>9.2f} {r['wait'] * 1e3:>9.2f} {r['timeouts']:>9.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("BENCH_POSTGRES_URL"),
+        help="database to benchmark (default: temporary SQLite file)",
+    )
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--max-overflow", type=int, default=0)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    url = args.url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/pool.db"
+    asyncio.run(_run(url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Cold-start cost of a gateway process, from exec to first response.
+
+For each run a fresh ``python -m src.serve`` process is started against a
+temporary SQLite database (migrated once beforehand) and the mock OpenAI
+client, and three moments are recorded:
+
+- ``import``: ``import src.main`` in a bare interpreter
+- ``ready``: process start until ``GET /health/ready`` first answers 200,
+  i.e. until connection warm-up has finished
+- ``first chat``: the first ``POST /chat/{user_id}`` after that, which pays
+  for anything still built lazily
+
+::
+
+    python -m benchmarks.bench_startup --runs 5 --workers 1 2 4
+
+With several workers, ``ready`` is when the first one answers; the others
+may still be starting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _import_time(env: dict[str, str]) -> float:
+    code = (
+        "import time; t = time.perf_counter(); import src.main; "
+        "print(time.perf_counter() - t)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True
+    )
+    return float(out.stdout)
+
+
+def _startup(
+    env: dict[str, str], workers: int, port: int, timeout: float
+) -> tuple[float, float]:
+    import httpx
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "src.serve",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError(f"no response within {timeout} s")
+                if process.poll() is not None:
+                    raise RuntimeError(f"server exited with {process.returncode}")
+                try:
+                    if client.get("/health/ready").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready = time.perf_counter() - started
+            start = time.perf_counter()
+            client.post("/chat/bench", json={"message": "hello"}).raise_for_status()
+            first_chat = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return ready, first_chat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/startup.db",
+        "USE_MOCK_OPENAI": "1",
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"),
+    }
+    subprocess.run([sys.executable, "-m", "src.db.migrate"], env=env, check=True)
+
+    imports = [_import_time(env) for _ in range(args.runs)]
+    print(f"import src.main  median {statistics.median(imports) * 1e3:.0f} ms\n")
+    print(
+        f"{'workers':>7} {'ready p50 ms':>13} {'ready max ms':>13} {'first chat ms':>14}"
+    )
+    for workers in args.workers:
+        samples = [
+            _startup(env, workers, args.port, args.timeout) for _ in range(args.runs)
+        ]
+        ready = [s[0] for s in samples]
+        print(
+            f"{workers:>7} {statistics.median(ready) * 1e3:>13.0f} "
+            f"{max(ready) * 1e3:>13.0f} "
+            f"{statistics.median(s[1] for s in samples) * 1e3:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Time to first byte of ``/chat`` versus ``/chat/{user_id}/stream``.
+
+Starts the gateway with uvicorn on a local port, backed by a temporary SQLite
+database and :class:`MockOpenAIClient` with a per-token delay, so it runs
+fully offline::
+
+    python -m benchmarks.bench_stream_ttfb --token-delay 0.02 --requests 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+async def _ttfb(client: object, path: str, message: str) -> tuple[float, float]:
+    import httpx
+
+    assert isinstance(client, httpx.AsyncClient)
+    start = time.perf_counter()
+    async with client.stream("POST", path, json={"message": message}) as response:
+        response.raise_for_status()
+        first = None
+        async for _ in response.aiter_raw():
+            if first is None:
+                first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return first or total, total
+
+
+async def _run(args: argparse.Namespace) -> None:
+    import httpx
+    import uvicorn
+
+    from src.main import create_app
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(), port=args.port, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    message = " ".join(["word"] * args.words)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}") as client:
+        print(f"{'endpoint':<22} {'ttfb p50 ms':>12} {'total p50 ms':>13}")
+        for label, path in (
+            ("/chat", "/chat/bench"),
+            ("/chat/stream", "/chat/bench/stream"),
+        ):
+            samples = [await _ttfb(client, path, message) for _ in range(args.requests)]
+            ttfb = statistics.median(s[0] for s in samples) * 1e3
+            total = statistics.median(s[1] for s in samples) * 1e3
+            print(f"{label:<22} {ttfb:>12.1f} {total:>13.1f}")
+
+    server.should_exit = True
+    await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ["USE_MOCK_OPENAI"] = "1"
+    os.environ["MOCK_OPENAI_TOKEN_DELAY"] = str(args.token_delay)
+    os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+    os.environ["DB_CREATE_SCHEMA_ON_STARTUP"] = "1"
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the user-ID matcher with the original per-user substring loop.
+
+Usage::
+
+    python -m benchmarks.bench_user_id_matcher --sizes 1000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.repository.user_id_matcher import UserIdMatcher
+
+
+def _loop_scan(user_ids: set[str], message: str, sender_id: str) -> bool:
+    """Original ``check_content_violation`` body."""
+
+    message_lower = message.lower()
+    for user_id in user_ids - {sender_id}:
+        if user_id.lower() in message_lower:
+            return True
+    return False
+
+
+def _time(fn: object, repeat: int) -> float:
+    assert callable(fn)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    message = "hello there, this is a perfectly ordinary chat message " * 4
+    print(f"{'ids':>10} {'build s':>10} {'loop ms':>10} {'matcher ms':>11}")
+    for size in args.sizes:
+        user_ids = {f"user-{i:07d}" for i in range(size)}
+
+        start = time.perf_counter()
+        matcher = UserIdMatcher(user_ids)
+        build = time.perf_counter() - start
+
+        loop = _time(lambda: _loop_scan(user_ids, message, "sender"), args.repeat)
+        scan = _time(lambda: matcher.find(message, exclude="sender"), args.repeat)
+        print(f"{size:>10} {build:>10.2f} {loop * 1e3:>10.3f} {scan * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Local stand-in for the OpenAI ``/v1/chat/completions`` endpoint.
+
+Unlike ``MockOpenAIClient``, the gateway talks to this server over HTTP with
+the real ``OpenAIClient``, so connection pooling, timeouts, retries and
+response parsing are all exercised. Latency, failures and response size are
+configurable::
+
+    python -m benchmarks.fake_openai --port 9000 \\
+        --latency lognormal:0.4,0.6 --error-rate 0.01 --rate-limit-rate 0.02
+
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 uvicorn src.main:app
+
+Latency specs: ``fixed:S``, ``uniform:LO,HI``, ``exponential:MEAN`` and
+``lognormal:MEDIAN,SIGMA`` (seconds). For streamed responses the sampled
+latency is the time to the first token; later tokens follow every
+``--token-interval`` seconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Return a sampler for a latency spec such as ``lognormal:0.4,0.6``."""
+
+    kind, _, raw = spec.partition(":")
+    try:
+        params = [float(p) for p in raw.split(",")] if raw else []
+        if kind == "fixed" and len(params) == 1:
+            return lambda rng: params[0]
+        if kind == "uniform" and len(params) == 2:
+            return lambda rng: rng.uniform(params[0], params[1])
+        if kind == "exponential" and len(params) == 1:
+            return lambda rng: rng.expovariate(1 / params[0])
+        if kind == "lognormal" and len(params) == 2:
+            mu = math.log(params[0])
+            return lambda rng: rng.lognormvariate(mu, params[1])
+    except (ValueError, ZeroDivisionError) as e:
+        raise ValueError(f"Invalid latency spec {spec!r}: {e}") from e
+    raise ValueError(f"Invalid latency spec {spec!r}")
+
+
+@dataclass
+class FakeOpenAIConfig:
+    """Behaviour of the fake upstream; rates are probabilities per request."""
+
+    latency: str = "fixed:0"
+    token_interval: float = 0.0
+    response_words: int = 50
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    hang_rate: float = 0.0
+    hang_seconds: float = 60.0
+    seed: int | None = None
+
+
+@dataclass
+class FakeOpenAIStats:
+    """Counts of what the fake server answered, for assertions and reports."""
+
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    hung: int = 0
+
+
+def create_fake_app(config: FakeOpenAIConfig) -> FastAPI:
+    """Build the ASGI app; ``app.state.stats`` counts the answers given."""
+
+    app = FastAPI(title="Fake OpenAI")
+    rng = random.Random(config.seed)
+    latency = parse_latency(config.latency)
+    stats = FakeOpenAIStats()
+    app.state.stats = stats
+
+    def words(message: str) -> list[str]:
+        echo = message.split() or ["ok"]
+        return [echo[i % len(echo)] for i in range(config.response_words)]
+
+    def chunk(content: str | None, finish: str | None = None) -> str:
+        delta = {"content": content} if content is not None else {}
+        body = {
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> Response:
+        payload: dict[str, Any] = await request.json()
+        stats.requests += 1
+
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            stats.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                status_code=429,
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+        roll -= config.rate_limit_rate
+        if roll < config.error_rate:
+            stats.errors += 1
+            return JSONResponse(
+                {"error": {"message": "Internal error", "type": "server_error"}},
+                status_code=500,
+            )
+        roll -= config.error_rate
+        if roll < config.hang_rate:
+            stats.hung += 1
+            await asyncio.sleep(config.hang_seconds)
+
+        await asyncio.sleep(max(0.0, latency(rng)))
+        message = str(payload["messages"][-1]["content"])
+        reply = words(message)
+        prompt_tokens = len(message) // 4 + 1
+
+        if payload.get("stream"):
+
+            async def events() -> AsyncIterator[str]:
+                for i, word in enumerate(reply):
+                    if i and config.token_interval:
+                        await asyncio.sleep(config.token_interval)
+                    yield chunk(word if i == 0 else f" {word}")
+                yield chunk(None, finish="stop")
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(config.token_interval * max(0, len(reply) - 1))
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-fake-{stats.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(reply)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(reply),
+                    "total_tokens": prompt_tokens + len(reply),
+                },
+            }
+        )
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:0.4,0.5")
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--response-words", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    parse_latency(args.latency)
+    config = FakeOpenAIConfig(
+        latency=args.latency,
+        token_interval=args.token_interval,
+        response_words=args.response_words,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(
+        create_fake_app(config), host=args.host, port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
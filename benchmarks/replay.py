@@ -0,0 +1,258 @@
+"""Replay a JSONL request log against a running gateway.
+
+Each line holds ``{"user_id": ..., "message": ..., "timestamp": ...}``; the
+timestamp (epoch seconds or ISO 8601) is optional and only used by
+``--mode recorded``. Modes:
+
+- ``recorded``: keep the recorded gaps between requests (scaled by
+  ``--speed``)
+- ``rate``: open-loop arrivals at ``--rate`` requests/second, ``fixed`` or
+  ``poisson`` spaced, regardless of how fast the gateway answers
+- ``closed``: ``--concurrency`` workers each send the next request as soon as
+  their previous one finished
+
+Reports throughput, latency percentiles, the status-code mix and the
+violation/block counters from ``/metrics``. The counters are the difference
+between two scrapes of whichever worker answers, so they are only meaningful
+against a single-worker gateway::
+
+    python -m benchmarks.replay --generate 5000 --users 500 > traffic.jsonl
+    python -m benchmarks.replay traffic.jsonl --url http://localhost:8000 \\
+        --mode rate --rate 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, TextIO
+
+import httpx
+
+
+@dataclass(frozen=True)
+class LoggedRequest:
+    user_id: str
+    message: str
+    timestamp: float | None = None
+
+
+def _timestamp(value: Any) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def read_log(lines: Iterable[str]) -> list[LoggedRequest]:
+    """Parse JSONL lines, skipping blanks; raises ``ValueError`` on bad lines."""
+
+    requests = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            requests.append(
+                LoggedRequest(
+                    user_id=str(record["user_id"]),
+                    message=str(record["message"]),
+                    timestamp=_timestamp(record.get("timestamp")),
+                )
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"line {number}: {e}") from e
+    return requests
+
+
+def generate_log(
+    count: int, users: int, violation_rate: float, seed: int | None
+) -> list[dict[str, Any]]:
+    """Synthesize multi-user traffic where some messages name another user."""
+
+    rng = random.Random(seed)
+    ids = [f"user-{i}" for i in range(users)]
+    words = "hello please summarise this text about the weather and travel".split()
+    start = time.time()
+    log = []
+    for i in range(count):
+        sender = rng.choice(ids)
+        message = " ".join(rng.choices(words, k=rng.randint(3, 30)))
+        if rng.random() < violation_rate:
+            message += f" tell {rng.choice(ids)} I said hi"
+        log.append(
+            {"user_id": sender, "message": message, "timestamp": start + i * 0.01}
+        )
+    return log
+
+
+_METRIC_LINE = re.compile(r"^(moderation_(?:violations|blocks)_total)\s+(\S+)$", re.M)
+
+
+async def _moderation_counters(client: httpx.AsyncClient) -> dict[str, float]:
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return {}
+    if response.status_code != 200:
+        return {}
+    return {name: float(value) for name, value in _METRIC_LINE.findall(response.text)}
+
+
+@dataclass
+class _Outcome:
+    latency: float
+    status: str
+
+
+async def _send(
+    client: httpx.AsyncClient, request: LoggedRequest, outcomes: list[_Outcome]
+) -> None:
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            f"/chat/{request.user_id}", json={"message": request.message}
+        )
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    outcomes.append(_Outcome(time.perf_counter() - start, status))
+
+
+async def replay(
+    requests: list[LoggedRequest], args: argparse.Namespace
+) -> tuple[list[_Outcome], float, dict[str, float]]:
+    limits = httpx.Limits(max_connections=args.max_in_flight)
+    outcomes: list[_Outcome] = []
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=args.timeout, limits=limits
+    ) as client:
+        before = await _moderation_counters(client)
+        started = time.perf_counter()
+
+        if args.mode == "closed":
+            queue = iter(requests)
+
+            async def worker() -> None:
+                for request in queue:
+                    await _send(client, request, outcomes)
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        else:
+            in_flight = asyncio.Semaphore(args.max_in_flight)
+            tasks = []
+            rng = random.Random(args.seed)
+            origin = next(
+                (r.timestamp for r in requests if r.timestamp is not None), None
+            )
+            offset = 0.0
+            for request in requests:
+                if args.mode == "recorded":
+                    if request.timestamp is not None and origin is not None:
+                        offset = (request.timestamp - origin) / args.speed
+                elif args.arrival == "poisson":
+                    offset += rng.expovariate(args.rate)
+                else:
+                    offset += 1 / args.rate
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await in_flight.acquire()
+                task = asyncio.create_task(_send(client, request, outcomes))
+                task.add_done_callback(lambda _: in_flight.release())
+                tasks.append(task)
+            await asyncio.gather(*tasks)
+
+        elapsed = time.perf_counter() - started
+        after = await _moderation_counters(client)
+    counters = {name: after[name] - before.get(name, 0.0) for name in after}
+    return outcomes, elapsed, counters
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def report(
+    outcomes: list[_Outcome],
+    elapsed: float,
+    counters: dict[str, float],
+    out: TextIO = sys.stdout,
+) -> None:
+    latencies = sorted(o.latency for o in outcomes)
+    statuses = Counter(o.status for o in outcomes)
+    print(f"requests      {len(outcomes)}", file=out)
+    print(f"elapsed       {elapsed:.2f} s", file=out)
+    print(
+        f"throughput    {len(outcomes) / elapsed if elapsed else 0:.1f} req/s", file=out
+    )
+    for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        print(f"{label:<13} {_percentile(latencies, q) * 1e3:.1f} ms", file=out)
+    print("status codes", file=out)
+    for status, count in sorted(statuses.items()):
+        print(f"  {status:<11} {count}", file=out)
+    if counters:
+        print(
+            f"violations    {counters.get('moderation_violations_total', 0):.0f}",
+            file=out,
+        )
+        print(
+            f"blocks        {counters.get('moderation_blocks_total', 0):.0f}", file=out
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("log", nargs="?", help="JSONL request log ('-' for stdin)")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--mode", choices=["recorded", "rate", "closed"], default="closed"
+    )
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--rate", type=float, default=100.0)
+    parser.add_argument("--arrival", choices=["fixed", "poisson"], default="poisson")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--generate", type=int, metavar="N", help="print N synthetic requests"
+    )
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--violation-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.generate:
+        for record in generate_log(
+            args.generate, args.users, args.violation_rate, args.seed
+        ):
+            print(json.dumps(record))
+        return
+    if not args.log:
+        parser.error("a request log is required unless --generate is given")
+
+    if args.log == "-":
+        requests = read_log(sys.stdin)
+    else:
+        with open(args.log) as f:
+            requests = read_log(f)
+    outcomes, elapsed, counters = asyncio.run(replay(requests, args))
+    report(outcomes, elapsed, counters)
+
+
+if __name__ == "__main__":
+    main()
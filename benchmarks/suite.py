@@ -0,0 +1,297 @@
+"""Reproducible micro-benchmarks for the moderation and repository hot paths.
+
+Covers ``ModerationService.check_content_violation`` over growing registries
+and message lengths, every ``UserRepository`` method against a temporary
+SQLite file (and Postgres when ``--postgres-url`` is given), and the full
+``POST /chat/{user_id}`` handler in-process with ``MockOpenAIClient``.
+
+Results are written as JSON so two commits can be compared::
+
+    python -m benchmarks.suite --output before.json
+    git checkout my-branch
+    python -m benchmarks.suite --output after.json --compare before.json
+
+``--compare`` exits with status 1 when a median got slower than
+``--threshold`` (default 20 %). Everything runs offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+Results = dict[str, dict[str, float]]
+
+
+async def _measure(
+    fn: Callable[[], Awaitable[object]], rounds: int, inner: int = 1
+) -> dict[str, float]:
+    """Time ``rounds`` batches of ``inner`` calls after a short warm-up."""
+
+    for _ in range(min(rounds, 5)):
+        await fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(inner):
+            await fn()
+        samples.append((time.perf_counter() - start) / inner)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+    }
+
+
+def _report(name: str, stats: dict[str, float], results: Results) -> None:
+    results[name] = stats
+    print(f"{name:<58} {stats['median'] * 1e6:>12.1f} {stats['min'] * 1e6:>12.1f}")
+
+
+async def _repository(url: str) -> Any:
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    from src.db.models import Base
+    from src.repository.user_repository import UserRepository
+
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    return engine, UserRepository(factory)
+
+
+async def _seed(repository: Any, count: int, prefix: str = "user") -> None:
+    from sqlalchemy import insert
+
+    from src.db.models import User
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": f"{prefix}-{i:07d}",
+            "violation_count": 0,
+            "is_blocked": False,
+            "blocked_until": None,
+            "last_violation": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+    async with repository._session_factory() as session:
+        for start in range(0, count, 5000):
+            await session.execute(insert(User), rows[start : start + 5000])
+        await session.commit()
+
+
+async def bench_content_check(
+    url: str, sizes: list[int], lengths: list[int], rounds: int, results: Results
+) -> None:
+    from src.services.moderation import ModerationService
+
+    for size in sizes:
+        engine, repository = await _repository(url)
+        await _seed(repository, size)
+        await repository.user_ids.load()
+        service = ModerationService(repository)
+        for length in lengths:
+            message = ("hello there, nothing to see in this message " * length)[:length]
+
+            async def check() -> bool:
+                return await service.check_content_violation(message, "sender")
+
+            stats = await _measure(check, rounds, inner=20)
+            _report(f"content_check[users={size},chars={length}]", stats, results)
+        await engine.dispose()
+
+
+async def bench_repository(label: str, url: str, rounds: int, results: Results) -> None:
+    engine, repository = await _repository(url)
+    await _seed(repository, 10_000)
+    await repository.user_ids.load()
+    counter = iter(range(10**9))
+
+    async def new_user() -> object:
+        return await repository.get_user(f"new-{next(counter)}")
+
+    cases: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+        ("get_user[existing]", lambda: repository.get_user("user-0000001")),
+        ("get_user[new]", new_user),
+        ("add_violation", lambda: repository.add_violation("user-0000002")),
+        ("admit[clean]", lambda: repository.admit("user-0000003")),
+        (
+            "admit[violation]",
+            lambda: repository.admit("user-0000004", violation=True),
+        ),
+        (
+            "admit_many[100]",
+            lambda: repository.admit_many(
+                [(f"user-{i:07d}", i % 10 == 0) for i in range(100, 200)]
+            ),
+        ),
+        ("is_user_blocked", lambda: repository.is_user_blocked("user-0000005")),
+        ("unblock_user", lambda: repository.unblock_user("user-0000004")),
+        ("user_exists", lambda: repository.user_exists("user-0000006")),
+        ("get_user_id_matcher", repository.get_user_id_matcher),
+        ("get_all_user_ids[10k]", repository.get_all_user_ids),
+    ]
+    for name, fn in cases:
+        slow = name.startswith("get_all_user_ids")
+        stats = await _measure(fn, max(5, rounds // 10) if slow else rounds)
+        _report(f"repository.{name}[{label}]", stats, results)
+    await engine.dispose()
+
+
+async def bench_chat_handler(rounds: int, results: Results) -> None:
+    import httpx
+
+    from src.db.session import init_db
+    from src.main import create_app
+
+    await init_db()
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        await client.post("/chat/bench-victim", json={"message": "hi"})
+        senders = iter(range(10**9))
+
+        async def clean() -> object:
+            return await client.post(
+                "/chat/bench-sender", json={"message": "hello, how are you?"}
+            )
+
+        async def violation() -> object:
+            # A fresh sender each time, so the strike never turns into a block.
+            return await client.post(
+                f"/chat/bench-{next(senders)}",
+                json={"message": "say hi to bench-victim"},
+            )
+
+        for name, fn in (("clean", clean), ("violation", violation)):
+            stats = await _measure(fn, rounds)
+            _report(f"chat_handler[{name}]", stats, results)
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: Results, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as f:
+        baseline: Results = json.load(f)["benchmarks"]
+    print(f"\n{'benchmark':<58} {'before us':>12} {'after us':>12} {'change':>8}")
+    regressions = 0
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median"], stats["median"]
+        change = (after - before) / before
+        flag = " !" if change > threshold else ""
+        regressions += bool(flag)
+        print(
+            f"{name:<58} {before * 1e6:>12.1f} {after * 1e6:>12.1f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return 1 if regressions else 0
+
+
+async def _run(args: argparse.Namespace, workdir: str) -> Results:
+    results: Results = {}
+    print(f"{'benchmark':<58} {'median us':>12} {'min us':>12}")
+    if "content" in args.only:
+        await bench_content_check(
+            f"sqlite+aiosqlite:///{workdir}/content.db",
+            args.sizes,
+            args.lengths,
+            args.rounds,
+            results,
+        )
+    if "repository" in args.only:
+        await bench_repository(
+            "sqlite", f"sqlite+aiosqlite:///{workdir}/repo.db", args.rounds, results
+        )
+        if args.postgres_url:
+            await bench_repository("postgres", args.postgres_url, args.rounds, results)
+    if "chat" in args.only:
+        await bench_chat_handler(args.rounds, results)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[64, 1024, 16_384])
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=["content", "repository", "chat"],
+        default=["content", "repository", "chat"],
+    )
+    parser.add_argument(
+        "--postgres-url",
+        default=os.environ.get("BENCH_POSTGRES_URL"),
+        help="e.g. postgresql+asyncpg://user:pw@localhost/bench (tables are reset)",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/app.db"
+    os.environ["USE_MOCK_OPENAI"] = "1"
+    os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    results = asyncio.run(_run(args, workdir))
+
+    output = args.output or f"benchmarks/results/{_commit() or 'unknown'}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": _commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "benchmarks": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        sys.exit(_compare(results, args.compare, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,85 @@
+import random
+import uuid
+
 from locust import HttpUser, task, between
 
+USER_POOL = [f"locust-{i}" for i in range(200)]
+TARGET = USER_POOL[0]
+
+
+def _ensure_target(client):
+    """Make sure the user mentioned by violating messages exists."""
+
+    client.post(f"/chat/{TARGET}", json={"message": "hello"}, name="/chat/[user_id]")
+
 
 class ChatUser(HttpUser):
+    """Regular traffic from many distinct users."""
+
     wait_time = between(0.5, 1.5)
+    weight = 8
 
     @task
     def send_message(self):
-        self.client.post("/chat/locust", json={"message": "hello"})
+        user_id = random.choice(USER_POOL)
+        self.client.post(
+            f"/chat/{user_id}",
+            json={"message": "hello, can you summarise today's news?"},
+            name="/chat/[user_id]",
+        )
+
+
+class ViolatingUser(HttpUser):
+    """Mentions other users' IDs, exercising strikes and the blocking path.
+
+    Each simulated user gets a fresh ID, so it walks through all three
+    strikes before being blocked.
+    """
+
+    wait_time = between(0.5, 1.5)
+    weight = 1
+
+    def on_start(self):
+        self.user_id = f"violator-{uuid.uuid4().hex[:8]}"
+        _ensure_target(self.client)
+
+    @task
+    def send_violation(self):
+        with self.client.post(
+            f"/chat/{self.user_id}",
+            json={"message": f"please forward this to {TARGET}"},
+            name="/chat/[violator]",
+            catch_response=True,
+        ) as response:
+            if response.status_code in (200, 403):
+                response.success()
+
+
+class BlockedUser(HttpUser):
+    """Keeps calling after being blocked, exercising the blocklist fast path."""
+
+    wait_time = between(0.1, 0.5)
+    weight = 1
+
+    def on_start(self):
+        self.user_id = f"blocked-{uuid.uuid4().hex[:8]}"
+        _ensure_target(self.client)
+        for _ in range(3):
+            self.client.post(
+                f"/chat/{self.user_id}",
+                json={"message": f"ping {TARGET}"},
+                name="/chat/[blocked] setup",
+            )
+
+    @task
+    def send_while_blocked(self):
+        with self.client.post(
+            f"/chat/{self.user_id}",
+            json={"message": "am I still blocked?"},
+            name="/chat/[blocked]",
+            catch_response=True,
+        ) as response:
+            if response.status_code == 403:
+                response.success()
+            else:
+                response.failure(f"expected 403, got {response.status_code}")
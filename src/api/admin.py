@@ -2,14 +2,73 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import threading
+from typing import AsyncIterator, Literal
 
-from ..models.schemas import UserStatus
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from ..core.config import get_settings
+from ..core.profiler import profiler, render_folded
+
+from ..models.schemas import (
+    AuditStatus,
+    BulkUnblockRequest,
+    BulkUnblockResponse,
+    RateLimitOverride,
+    RegistryStatus,
+    UpstreamStatus,
+    UserPage,
+    UserStatus,
+)
+from ..repository.audit_log import get_audit_log
 from ..repository.user_repository import get_user_repository
+from ..services.openai_client import get_concurrency_limiter
+from ..services.rate_limiter import get_rate_limiter
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+@router.get("/registry", response_model=RegistryStatus)
+async def registry_status() -> RegistryStatus:
+    """
+    Report size and staleness of this worker's user-ID registry.
+
+    Returns:
+        Registry statistics for the worker that served the request
+    """
+    stats = get_user_repository().user_ids.stats()
+
+    return RegistryStatus.model_validate(vars(stats))
+
+
+@router.get("/upstream", response_model=UpstreamStatus)
+async def upstream_status() -> UpstreamStatus:
+    """
+    Report the adaptive concurrency limit and load-shedding counters.
+
+    Returns:
+        Limiter statistics for the worker that served the request
+    """
+    stats = get_concurrency_limiter().stats()
+
+    return UpstreamStatus.model_validate(vars(stats))
+
+
+@router.get("/audit", response_model=AuditStatus)
+async def audit_status() -> AuditStatus:
+    """
+    Report the audit log queue, including events dropped under backpressure.
+
+    Returns:
+        Audit statistics for the worker that served the request
+    """
+    stats = get_audit_log().stats()
+
+    return AuditStatus.model_validate(vars(stats))
+
+
 @router.put("/unblock/{user_id}", response_model=UserStatus)
 async def unblock_user(user_id: str) -> UserStatus:
     """
@@ -39,3 +98,171 @@ async def unblock_user(user_id: str) -> UserStatus:
     user_status = await user_store.unblock_user(user_id)
 
     return UserStatus.model_validate(vars(user_status))
+
+
+@router.post("/unblock", response_model=BulkUnblockResponse)
+async def unblock_users(selection: BulkUnblockRequest) -> BulkUnblockResponse:
+    """
+    Unblock many users at once with a single set-based update.
+
+    Args:
+        selection: User IDs and/or a cut-off for when users were blocked
+
+    Returns:
+        How many users were unblocked, and which
+    """
+    unblocked = await get_user_repository().unblock_users(
+        selection.user_ids, selection.blocked_before
+    )
+
+    return BulkUnblockResponse(unblocked=len(unblocked), user_ids=unblocked)
+
+
+@router.get("/users", response_model=UserPage)
+async def list_users(
+    user_status: Literal["blocked", "violating"] = Query(
+        "blocked", alias="status", description="Blocked users, or any with strikes"
+    ),
+    after: str | None = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> UserPage:
+    """
+    List blocked or violating users in ID order, one keyset page at a time.
+
+    Args:
+        user_status: ``blocked`` or ``violating`` (any strikes, blocked or not)
+        after: ``next_cursor`` of the previous page
+        limit: Page size
+
+    Returns:
+        The page and the cursor of the next one
+    """
+    users = await get_user_repository().list_users(
+        user_status == "blocked", after, limit
+    )
+    items = [UserStatus.model_validate(vars(user)) for user in users]
+    next_cursor = items[-1].user_id if len(items) == limit else None
+
+    return UserPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/users/export", response_class=StreamingResponse)
+async def export_users(
+    user_status: Literal["blocked", "violating"] = Query(
+        "blocked", alias="status", description="Blocked users, or any with strikes"
+    ),
+) -> StreamingResponse:
+    """
+    Stream blocked or violating users as newline-delimited JSON.
+
+    Users are read page by page, so memory use does not grow with the table.
+
+    Args:
+        user_status: ``blocked`` or ``violating`` (any strikes, blocked or not)
+
+    Returns:
+        One ``UserStatus`` JSON object per line
+    """
+    users = get_user_repository().iter_users(user_status == "blocked")
+
+    async def lines() -> AsyncIterator[str]:
+        async for user in users:
+            yield UserStatus.model_validate(vars(user)).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.put("/rate-limit/{user_id}", response_model=RateLimitOverride)
+async def set_rate_limit(
+    user_id: str, override: RateLimitOverride
+) -> RateLimitOverride:
+    """
+    Give a user their own chat rate limit instead of the global one.
+
+    The user's bucket starts full at the new burst size.
+
+    Args:
+        user_id: Unique identifier for the user
+        override: Rate and burst to apply
+
+    Returns:
+        The override now in effect
+    """
+    await get_rate_limiter().set_override(user_id, override.per_minute, override.burst)
+
+    return override
+
+
+@router.delete("/rate-limit/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_rate_limit(user_id: str) -> Response:
+    """
+    Return a user to the global chat rate limit.
+
+    Args:
+        user_id: Unique identifier for the user
+    """
+    await get_rate_limiter().clear_override(user_id)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="How long to sample"),
+    interval: float = Query(
+        0.005, ge=0.001, le=1.0, description="Seconds between samples"
+    ),
+) -> PlainTextResponse:
+    """
+    Sample this worker's event loop for a while and return folded stacks.
+
+    Live traffic keeps being served while sampling; the output can be fed to
+    ``flamegraph.pl`` or opened in speedscope. Disabled unless
+    ``PROFILER_ENABLED`` is set.
+
+    Args:
+        seconds: Sampling duration, at most ``PROFILER_MAX_SECONDS``
+        interval: Seconds between two samples
+
+    Returns:
+        One ``frame;frame;... count`` line per distinct stack
+
+    Raises:
+        HTTPException: If profiling is disabled, the duration is too long or
+            another profile is running
+    """
+    settings = get_settings()
+    if not settings.profiler_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Profiler disabled",
+                "code": "PROFILER_DISABLED",
+                "details": "Set PROFILER_ENABLED to allow profiling",
+            },
+        )
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "error": "Profile too long",
+                "code": "PROFILE_TOO_LONG",
+                "details": f"seconds must be at most {settings.profiler_max_seconds}",
+            },
+        )
+
+    try:
+        stacks = await asyncio.to_thread(
+            profiler.sample, threading.get_ident(), seconds, interval
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "Profile already running",
+                "code": "PROFILE_RUNNING",
+                "details": str(e),
+            },
+        ) from e
+
+    return PlainTextResponse(render_folded(stacks))
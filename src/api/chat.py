@@ -2,42 +2,79 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+from collections import Counter
+from typing import AsyncGenerator, AsyncIterator, Awaitable
+
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 
-from ..models.schemas import ChatRequest, ChatResponse
+from ..core.config import get_settings
+from ..core.metrics import STAGE_SECONDS
+from ..models.schemas import (
+    BatchChatItem,
+    BatchChatRequest,
+    BatchChatResponse,
+    BatchChatResult,
+    ChatRequest,
+    ChatResponse,
+    ErrorResponse,
+)
 from ..services.moderation import get_moderation_service
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.concurrency_limiter import UpstreamOverloaded
 from ..services.openai_client import get_openai_client
-from ..repository.user_repository import get_user_repository
+from ..services.rate_limiter import RateLimitExceeded, get_rate_limiter
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+_RATE_LIMIT = STAGE_SECONDS.labels("rate_limit")
+_UPSTREAM = STAGE_SECONDS.labels("upstream")
+_UPSTREAM_FIRST_DELTA = STAGE_SECONDS.labels("upstream_first_delta")
 
-@router.post("/{user_id}", response_model=ChatResponse)
-async def send_message(user_id: str, request: ChatRequest) -> ChatResponse:
-    """
-    Send a message to OpenAI via the chat gateway.
+# Failures raised by the OpenAI client stack that map to 502/503 responses.
+_UPSTREAM_ERRORS = (httpx.HTTPError, ValueError, UpstreamOverloaded, CircuitOpenError)
 
-    Args:
-        user_id: Unique identifier for the user
-        request: Chat request containing the message
+_BLOCKED_DETAIL = {
+    "error": "User is blocked",
+    "code": "USER_BLOCKED",
+    "details": "You have been temporarily blocked due to policy violations. Try again later or contact support.",
+}
 
-    Returns:
-        Chat response from OpenAI
 
-    Raises:
-        HTTPException: If user is blocked or other errors occur
-    """
-    moderation_service = get_moderation_service()
-    openai_client = get_openai_client()
-    user_store = get_user_repository()
+def _rate_limited(e: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error": "Too many requests",
+            "code": "RATE_LIMITED",
+            "details": str(e),
+        },
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
-    # Ensure user exists in database (creates if needed)
-    await user_store.get_user(user_id)
 
-    # Process message for violations and blocking
+async def _admit(user_id: str, cost: int = 1) -> None:
+    """Charge ``cost`` requests to the user's rate limit or raise 429."""
+
+    try:
+        with _RATE_LIMIT.time():
+            await get_rate_limiter().acquire(user_id, cost)
+    except RateLimitExceeded as e:
+        raise _rate_limited(e) from e
+
+
+async def _moderate(user_id: str, message: str) -> None:
+    """Run moderation and raise 403 if the user was already blocked."""
+
+    moderation_service = get_moderation_service()
+
+    # Upsert the user, check blocking and record violations in one transaction
     has_violation, is_blocked = await moderation_service.process_message(
-        request.message, user_id
+        message, user_id
     )
 
     # Block access only if the user was already blocked *before* this request.
@@ -45,38 +82,243 @@ async def send_message(user_id: str, request: ChatRequest) -> ChatResponse:
     # the response (has_violation is True and is_blocked is True).
     if is_blocked and not has_violation:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error": "User is blocked",
-                "code": "USER_BLOCKED",
-                "details": "You have been temporarily blocked due to policy violations. Try again later or contact support.",
-            },
+            status_code=status.HTTP_403_FORBIDDEN, detail=_BLOCKED_DETAIL
         )
 
     # If violation detected but not blocked yet, still allow the message
     # (this follows the 3-strike policy - violations 1 and 2 don't block)
 
-    try:
-        # Forward message to OpenAI
-        response_content = await openai_client.chat_completion(request.message)
 
-        return ChatResponse(response=response_content, user_id=user_id)
+def _upstream_error(e: Exception) -> HTTPException:
+    """Map an OpenAI client failure to a 502 (or 503 when shed) response."""
 
-    except httpx.HTTPError as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={
                 "error": "OpenAI service unavailable",
-                "code": "OPENAI_ERROR",
+                "code": "OPENAI_CIRCUIT_OPEN",
                 "details": str(e),
             },
-        ) from e
-    except ValueError as e:
-        raise HTTPException(
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, UpstreamOverloaded):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "Service overloaded",
+                "code": "UPSTREAM_OVERLOADED",
+                "details": str(e),
+            },
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, httpx.HTTPError):
+        return HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail={
-                "error": "Invalid response from OpenAI",
-                "code": "OPENAI_RESPONSE_ERROR",
+                "error": "OpenAI service unavailable",
+                "code": "OPENAI_ERROR",
                 "details": str(e),
             },
-        ) from e
+        )
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail={
+            "error": "Invalid response from OpenAI",
+            "code": "OPENAI_RESPONSE_ERROR",
+            "details": str(e),
+        },
+    )
+
+
+@router.post("", response_model=BatchChatResponse)
+async def send_batch(request: BatchChatRequest) -> BatchChatResponse:
+    """
+    Send many messages, possibly from different users, in one call.
+
+    The whole batch is moderated against one user-ID registry snapshot and all
+    strikes are recorded in a single transaction. Allowed items are forwarded
+    to OpenAI with at most ``BATCH_CONCURRENCY`` calls in flight.
+
+    Args:
+        request: Items to process, in order
+
+    Returns:
+        One result per item, in request order. Each item counts against its
+        user's rate limit and items beyond what is left of it carry status
+        429; blocked items carry 403 and failed upstream calls 502, mirroring
+        the single-message endpoint.
+    """
+    moderation_service = get_moderation_service()
+    openai_client = get_openai_client()
+    rate_limiter = get_rate_limiter()
+    semaphore = asyncio.Semaphore(max(1, get_settings().batch_concurrency))
+
+    # Each item costs one request; a user's first items take what is left of
+    # their budget in one charge and only the rest are rate limited.
+    budget: dict[str, int] = {}
+    limited: dict[str, ErrorResponse] = {}
+    for user_id, cost in Counter(item.user_id for item in request.items).items():
+        budget[user_id], wait = await rate_limiter.acquire_up_to(user_id, cost)
+        if budget[user_id] < cost:
+            limited[user_id] = ErrorResponse.model_validate(
+                _rate_limited(RateLimitExceeded(wait)).detail
+            )
+    over_limit: set[int] = set()
+    for index, item in enumerate(request.items):
+        if budget[item.user_id] > 0:
+            budget[item.user_id] -= 1
+        else:
+            over_limit.add(index)
+    admitted = [
+        item for index, item in enumerate(request.items) if index not in over_limit
+    ]
+
+    decisions = iter(
+        await moderation_service.process_batch(
+            [(item.message, item.user_id) for item in admitted]
+        )
+    )
+
+    async def forward(user_id: str, message: str) -> BatchChatResult:
+        try:
+            async with semaphore:
+                with _UPSTREAM.time():
+                    content = await openai_client.chat_completion(message)
+        except _UPSTREAM_ERRORS as e:
+            error = _upstream_error(e)
+            return BatchChatResult(
+                user_id=user_id,
+                status_code=error.status_code,
+                error=ErrorResponse.model_validate(error.detail),
+            )
+        return BatchChatResult(user_id=user_id, status_code=200, response=content)
+
+    async def blocked(user_id: str) -> BatchChatResult:
+        return BatchChatResult(
+            user_id=user_id,
+            status_code=status.HTTP_403_FORBIDDEN,
+            error=ErrorResponse.model_validate(_BLOCKED_DETAIL),
+        )
+
+    async def rate_limited(user_id: str) -> BatchChatResult:
+        return BatchChatResult(
+            user_id=user_id,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            error=limited[user_id],
+        )
+
+    def result(index: int, item: BatchChatItem) -> Awaitable[BatchChatResult]:
+        if index in over_limit:
+            return rate_limited(item.user_id)
+        has_violation, is_blocked = next(decisions)
+        if is_blocked and not has_violation:
+            return blocked(item.user_id)
+        return forward(item.user_id, item.message)
+
+    results = await asyncio.gather(
+        *(result(index, item) for index, item in enumerate(request.items))
+    )
+    return BatchChatResponse(results=list(results))
+
+
+@router.post("/{user_id}", response_model=ChatResponse)
+async def send_message(user_id: str, request: ChatRequest) -> ChatResponse:
+    """
+    Send a message to OpenAI via the chat gateway.
+
+    Args:
+        user_id: Unique identifier for the user
+        request: Chat request containing the message
+
+    Returns:
+        Chat response from OpenAI
+
+    Raises:
+        HTTPException: If user is rate limited, blocked or other errors occur
+    """
+    openai_client = get_openai_client()
+
+    await _admit(user_id)
+    await _moderate(user_id, request.message)
+
+    try:
+        # Forward message to OpenAI
+        with _UPSTREAM.time():
+            response_content = await openai_client.chat_completion(request.message)
+
+        return ChatResponse(response=response_content, user_id=user_id)
+
+    except _UPSTREAM_ERRORS as e:
+        raise _upstream_error(e) from e
+
+
+def _sse(data: str, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {data}\n\n"
+
+
+async def _close(stream: AsyncGenerator[str, None]) -> None:
+    # ``BackgroundTask`` would run the bare ``aclose`` method in a thread.
+    await stream.aclose()
+
+
+@router.post("/{user_id}/stream")
+async def stream_message(user_id: str, request: ChatRequest) -> StreamingResponse:
+    """
+    Stream an OpenAI response as Server-Sent Events.
+
+    Runs the same moderation and blocking checks as ``send_message``. Each
+    event carries ``{"delta": "..."}``; the stream ends with ``data: [DONE]``.
+    Upstream failures before the first token are reported as 502, later ones
+    as an ``error`` event.
+
+    Args:
+        user_id: Unique identifier for the user
+        request: Chat request containing the message
+
+    Returns:
+        ``text/event-stream`` response forwarding content deltas
+
+    Raises:
+        HTTPException: If user is rate limited, blocked or OpenAI fails
+            before responding
+    """
+    openai_client = get_openai_client()
+
+    await _admit(user_id)
+    await _moderate(user_id, request.message)
+
+    deltas = openai_client.chat_completion_stream(request.message)
+    try:
+        with _UPSTREAM_FIRST_DELTA.time():
+            first = await anext(deltas, None)
+    except _UPSTREAM_ERRORS as e:
+        await deltas.aclose()
+        raise _upstream_error(e) from e
+    except BaseException:
+        await deltas.aclose()
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            if first is not None:
+                yield _sse(json.dumps({"delta": first}))
+            async for delta in deltas:
+                yield _sse(json.dumps({"delta": delta}))
+        except _UPSTREAM_ERRORS as e:
+            yield _sse(json.dumps(_upstream_error(e).detail), event="error")
+            return
+        finally:
+            await deltas.aclose()
+        yield _sse("[DONE]")
+
+    # The upstream stream holds a concurrency slot and a pooled connection.
+    # Closing it again after the response also covers a client that went
+    # away before ``events`` was started or finished.
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_close, deltas),
+    )
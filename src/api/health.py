@@ -0,0 +1,36 @@
+"""Liveness and readiness probes."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from ..core.lifecycle import Lifecycle
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def live() -> dict[str, str]:
+    """
+    Report that the worker's event loop is responsive.
+
+    Returns:
+        Always ``{"status": "ok"}`` while the process is serving
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(request: Request) -> JSONResponse:
+    """
+    Report whether this worker should receive traffic.
+
+    Returns:
+        **200** once warm-up has finished; **503** while starting or draining
+    """
+    lifecycle: Lifecycle = request.app.state.lifecycle
+    if lifecycle.ready:
+        return JSONResponse({"status": "ready"})
+    state = "draining" if lifecycle.draining else "starting"
+    return JSONResponse({"status": state}, status_code=503)
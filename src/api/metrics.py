@@ -0,0 +1,67 @@
+"""Prometheus metrics endpoint and request instrumentation."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """
+    Expose this worker's metrics in the Prometheus text format.
+
+    Returns:
+        All registered metrics
+    """
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+class MetricsMiddleware:
+    """Count requests and time them until the response headers are sent.
+
+    Requests are labelled with the route template (``/chat/{user_id}``), not
+    the raw path, so user IDs do not create new series.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                self._observe(scope, time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS.labels(scope["method"], _route(scope), str(status)).inc()
+
+    @staticmethod
+    def _observe(scope: Scope, elapsed: float) -> None:
+        HTTP_REQUEST_SECONDS.labels(scope["method"], _route(scope)).observe(elapsed)
+
+
+def _route(scope: Scope) -> str:
+    route: Any = scope.get("route")
+    return str(route.path) if route is not None else "unmatched"
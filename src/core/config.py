@@ -2,9 +2,20 @@
 
 from __future__ import annotations
 
+import importlib.util
 from functools import lru_cache
+from typing import Literal
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator
+
+
+class OpenAIBackend(BaseModel):
+    """One OpenAI-compatible endpoint and the key used against it."""
+
+    base_url: str
+    api_key: str = ""
+    rpm: int | None = Field(None, description="Requests per minute budget")
+    tpm: int | None = Field(None, description="Tokens per minute budget")
 
 
 class Settings(BaseSettings):
@@ -13,17 +24,116 @@ class Settings(BaseSettings):
     openai_api_key: str = Field("", alias="OPENAI_API_KEY")
     block_minutes: int = Field(60 * 24, alias="BLOCK_MINUTES")
     use_mock_openai: bool = Field(False, alias="USE_MOCK_OPENAI")
+    mock_openai_token_delay: float = Field(0.0, alias="MOCK_OPENAI_TOKEN_DELAY")
     openai_timeout: float = Field(30.0, alias="OPENAI_TIMEOUT")
     openai_retries: int = Field(3, alias="OPENAI_RETRIES")
+    openai_base_url: str = Field("https://api.openai.com/v1", alias="OPENAI_BASE_URL")
+    openai_backends: list[OpenAIBackend] = Field([], alias="OPENAI_BACKENDS")
+    openai_max_connections: int = Field(100, alias="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive: int = Field(20, alias="OPENAI_MAX_KEEPALIVE")
+    openai_http2: bool = Field(False, alias="OPENAI_HTTP2")
+    openai_backend_failure_threshold: int = Field(
+        3, alias="OPENAI_BACKEND_FAILURE_THRESHOLD"
+    )
+    openai_backend_cooldown_seconds: float = Field(
+        30.0, alias="OPENAI_BACKEND_COOLDOWN_SECONDS"
+    )
+    openai_retry_budget: float = Field(10.0, alias="OPENAI_RETRY_BUDGET")
+    openai_retry_backoff: float = Field(0.5, alias="OPENAI_RETRY_BACKOFF")
+    openai_circuit_failure_rate: float = Field(0.5, alias="OPENAI_CIRCUIT_FAILURE_RATE")
+    openai_circuit_window: int = Field(20, alias="OPENAI_CIRCUIT_WINDOW")
+    openai_circuit_min_calls: int = Field(10, alias="OPENAI_CIRCUIT_MIN_CALLS")
+    openai_circuit_open_seconds: float = Field(
+        30.0, alias="OPENAI_CIRCUIT_OPEN_SECONDS"
+    )
+    openai_concurrency_initial: int = Field(32, alias="OPENAI_CONCURRENCY_INITIAL")
+    openai_concurrency_min: int = Field(4, alias="OPENAI_CONCURRENCY_MIN")
+    openai_concurrency_max: int = Field(256, alias="OPENAI_CONCURRENCY_MAX")
+    openai_queue_size: int = Field(256, alias="OPENAI_QUEUE_SIZE")
+    openai_queue_timeout: float = Field(2.0, alias="OPENAI_QUEUE_TIMEOUT")
+    openai_latency_target: float = Field(10.0, alias="OPENAI_LATENCY_TARGET")
+    batch_concurrency: int = Field(8, alias="BATCH_CONCURRENCY")
+    openai_coalesce: bool = Field(False, alias="OPENAI_COALESCE")
+    openai_cache: Literal["", "memory", "disk"] = Field("", alias="OPENAI_CACHE")
+    openai_cache_ttl_seconds: float = Field(300.0, alias="OPENAI_CACHE_TTL_SECONDS")
+    openai_cache_max_bytes: int = Field(
+        16 * 1024 * 1024, alias="OPENAI_CACHE_MAX_BYTES"
+    )
+    openai_cache_path: str = Field(
+        "completion_cache.sqlite3", alias="OPENAI_CACHE_PATH"
+    )
+    user_registry_sync_seconds: float = Field(5.0, alias="USER_REGISTRY_SYNC_SECONDS")
+    user_registry_overlap_seconds: float = Field(
+        5.0, alias="USER_REGISTRY_OVERLAP_SECONDS"
+    )
+    user_write_behind: bool = Field(False, alias="USER_WRITE_BEHIND")
+    user_write_behind_interval_ms: float = Field(
+        50.0, alias="USER_WRITE_BEHIND_INTERVAL_MS"
+    )
+    user_write_behind_max_batch: int = Field(500, alias="USER_WRITE_BEHIND_MAX_BATCH")
+    block_sweep_max_interval_seconds: float = Field(
+        60.0, alias="BLOCK_SWEEP_MAX_INTERVAL_SECONDS"
+    )
+    audit_log_path: str | None = Field(None, alias="AUDIT_LOG_PATH")
+    audit_log_max_bytes: int = Field(10 * 1024 * 1024, alias="AUDIT_LOG_MAX_BYTES")
+    audit_log_backup_count: int = Field(5, alias="AUDIT_LOG_BACKUP_COUNT")
+    audit_log_database: bool = Field(False, alias="AUDIT_LOG_DATABASE")
+    audit_queue_size: int = Field(10_000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(500, alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval_ms: float = Field(200.0, alias="AUDIT_FLUSH_INTERVAL_MS")
+    audit_message_chars: int = Field(200, alias="AUDIT_MESSAGE_CHARS")
+    blocklist_max_size: int = Field(10_000, alias="BLOCKLIST_MAX_SIZE")
+    blocklist_recheck_seconds: float = Field(5.0, alias="BLOCKLIST_RECHECK_SECONDS")
+    metrics_enabled: bool = Field(True, alias="METRICS_ENABLED")
+    event_loop_lag_interval: float = Field(0.5, alias="EVENT_LOOP_LAG_INTERVAL")
+    server_timing_enabled: bool = Field(True, alias="SERVER_TIMING_ENABLED")
+    request_timing_log: bool = Field(False, alias="REQUEST_TIMING_LOG")
+    profiler_enabled: bool = Field(False, alias="PROFILER_ENABLED")
+    profiler_max_seconds: float = Field(60.0, alias="PROFILER_MAX_SECONDS")
+    rate_limit_backend: Literal["memory", "database"] = Field(
+        "memory", alias="RATE_LIMIT_BACKEND"
+    )
+    rate_limit_per_minute: int = Field(0, alias="RATE_LIMIT_PER_MINUTE")
+    rate_limit_burst: int = Field(20, alias="RATE_LIMIT_BURST")
     database_url: str = Field(
         "postgresql+asyncpg://user:pass@db/chatdb", alias="DATABASE_URL"
     )
+    db_create_schema_on_startup: bool = Field(
+        False, alias="DB_CREATE_SCHEMA_ON_STARTUP"
+    )
+    web_concurrency: int = Field(1, alias="WEB_CONCURRENCY")
+    warmup_db_connections: int = Field(2, alias="WARMUP_DB_CONNECTIONS")
+    warmup_upstream_connections: int = Field(2, alias="WARMUP_UPSTREAM_CONNECTIONS")
+    warmup_timeout_seconds: float = Field(10.0, alias="WARMUP_TIMEOUT_SECONDS")
+    shutdown_drain_seconds: float = Field(30.0, alias="SHUTDOWN_DRAIN_SECONDS")
+    database_replica_url: str | None = Field(None, alias="DATABASE_REPLICA_URL")
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_pre_ping: bool = Field(False, alias="DB_POOL_PRE_PING")
+    db_pool_recycle: int = Field(-1, alias="DB_POOL_RECYCLE")
+    db_statement_cache_size: int = Field(100, alias="DB_STATEMENT_CACHE_SIZE")
 
     class Config:
         # env_file = ".env"  # removed – environment is fully controlled outside
         case_sensitive = True
         extra = "ignore"
 
+    @field_validator("openai_http2")
+    @classmethod
+    def _http2_available(cls, enabled: bool) -> bool:
+        # httpx only imports h2 when the first HTTP/2 client is built.
+        if enabled and importlib.util.find_spec("h2") is None:
+            raise ValueError("OPENAI_HTTP2 requires the h2 package: httpx[http2]")
+        return enabled
+
+    def upstream_backends(self) -> list[OpenAIBackend]:
+        """Configured backends, or the single ``OPENAI_BASE_URL`` default."""
+
+        return self.openai_backends or [
+            OpenAIBackend(base_url=self.openai_base_url, api_key=self.openai_api_key)
+        ]
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,89 @@
+"""Worker readiness and draining of in-flight chat requests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class Lifecycle:
+    """Whether this worker should get traffic, and how much it is serving.
+
+    A worker becomes ready once its warm-up has finished and stops being
+    ready when it starts draining for shutdown.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+
+    def start_draining(self) -> None:
+        """Report not ready and refuse new chats from now on."""
+
+        self.ready = False
+        self.draining = True
+
+    async def drain(self, timeout: float, poll: float = 0.05) -> int:
+        """Refuse new chats and wait up to ``timeout`` for running ones.
+
+        Returns how many were still running at the deadline.
+        """
+
+        self.start_draining()
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(poll)
+        return self.in_flight
+
+
+_DRAINING_BODY = json.dumps(
+    {
+        "detail": {
+            "error": "Server is shutting down",
+            "code": "SHUTTING_DOWN",
+            "details": "Retry the request; it will be served by another worker",
+        }
+    }
+).encode()
+
+
+class DrainMiddleware:
+    """Count requests under ``prefix`` and refuse new ones while draining.
+
+    Refused requests get **503** with ``Retry-After`` and ``Connection:
+    close``, so clients reconnect, usually to another worker. Streaming
+    responses count until their last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp, state: Lifecycle, prefix: str = "/chat") -> None:
+        self.app = app
+        self._prefix = prefix
+        self._state = state
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self._prefix):
+            await self.app(scope, receive, send)
+            return
+        if self._state.draining:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"retry-after", b"1"),
+                        (b"connection", b"close"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": _DRAINING_BODY})
+            return
+        self._state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._state.in_flight -= 1
@@ -0,0 +1,347 @@
+"""Prometheus metrics rendered in the text exposition format.
+
+A deliberately small, dependency-free implementation: the gateway runs a
+single event loop per process, so metric updates are plain dict and list
+operations without locks. Hot paths bind label values once via ``labels()``
+and then pay for a ``bisect`` and two additions per observation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Iterator
+
+# Latency buckets in seconds, from sub-millisecond DB work to slow upstreams.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]: ...
+
+    def render(self) -> str:
+        header = (
+            f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        )
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class _LabelledMetric(_Metric):
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        super().__init__(name, documentation)
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str) -> Any:
+        """Return the child for ``values``, creating it on first use."""
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any: ...
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_LabelledMetric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """Current value, read from ``function`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, function: Callable[[], float] | None = None
+    ) -> None:
+        super().__init__(name, documentation)
+        self._function = function
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._function = function
+
+    def samples(self) -> Iterator[str]:
+        value = self._function() if self._function is not None else self.value
+        yield f"{self.name} {_format_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: _HistogramChild) -> None:
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        """Observe the duration of a ``with`` block."""
+
+        return _Timer(self)
+
+
+class Histogram(_LabelledMetric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip((*self._bounds, math.inf), child.counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*values, _format_value(bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Collection of metrics rendered together by ``GET /metrics``."""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+REGISTRY = Registry()
+
+
+def _register(metric: Any) -> Any:
+    REGISTRY.register(metric)
+    return metric
+
+
+HTTP_REQUESTS: Counter = _register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_SECONDS: Histogram = _register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time until the response headers were sent, by route.",
+        ("method", "route"),
+    )
+)
+STAGE_SECONDS: Histogram = _register(
+    Histogram(
+        "chat_stage_duration_seconds",
+        "Time spent in each stage of handling a chat request.",
+        ("stage",),
+    )
+)
+UPSTREAM_RESPONSES: Counter = _register(
+    Counter(
+        "openai_responses_total",
+        "OpenAI HTTP responses by status code, or 'error' for transport failures.",
+        ("status",),
+    )
+)
+UPSTREAM_RETRIES: Counter = _register(
+    Counter("openai_retries_total", "OpenAI calls retried after a failure.")
+)
+COMPLETION_CACHE_REQUESTS: Counter = _register(
+    Counter(
+        "completion_cache_requests_total",
+        "Completion cache lookups by result: hit or miss.",
+        ("result",),
+    )
+)
+COALESCED_REQUESTS: Counter = _register(
+    Counter(
+        "openai_coalesced_requests_total",
+        "Completions served by joining an identical request already in flight.",
+    )
+)
+VIOLATIONS: Counter = _register(
+    Counter("moderation_violations_total", "Strikes recorded against users.")
+)
+BLOCKS: Counter = _register(
+    Counter("moderation_blocks_total", "Users blocked after reaching the limit.")
+)
+AUDIT_EVENTS: Counter = _register(
+    Counter(
+        "audit_events_total",
+        "Audit events by outcome: written, dropped (queue full) or failed.",
+        ("outcome",),
+    )
+)
+AUDIT_QUEUE: Gauge = _register(
+    Gauge("audit_queue_depth", "Audit events waiting to be written.")
+)
+DB_POOL_SIZE: Gauge = _register(
+    Gauge("db_pool_size", "Configured size of the database connection pool.")
+)
+DB_POOL_CHECKED_OUT: Gauge = _register(
+    Gauge("db_pool_checked_out", "Database connections currently in use.")
+)
+DB_POOL_OVERFLOW: Gauge = _register(
+    Gauge("db_pool_overflow", "Connections open beyond the pool size.")
+)
+DB_POOL_CHECKOUTS: Counter = _register(
+    Counter("db_pool_checkouts_total", "Database connections handed to sessions.")
+)
+EVENT_LOOP_LAG: Histogram = _register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "How late the event loop woke up a periodic timer.",
+    )
+)
+
+
+def observe_pool(pool: Any) -> None:
+    """Export connection usage of a SQLAlchemy pool.
+
+    Pools without a fixed size (``NullPool``, ``StaticPool``) only report
+    checkouts.
+    """
+
+    from sqlalchemy import event
+
+    for gauge, method in (
+        (DB_POOL_SIZE, "size"),
+        (DB_POOL_CHECKED_OUT, "checkedout"),
+        (DB_POOL_OVERFLOW, "overflow"),
+    ):
+        gauge.set_function(getattr(pool, method, None))
+
+    checkouts = DB_POOL_CHECKOUTS.labels()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(*args: object) -> None:
+        checkouts.inc()
+
+
+async def monitor_event_loop(interval: float) -> None:
+    """Record event-loop lag every ``interval`` seconds until cancelled."""
+
+    lag = EVENT_LOOP_LAG.labels()
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag.observe(max(0.0, time.perf_counter() - start - interval))
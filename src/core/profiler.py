@@ -0,0 +1,63 @@
+"""Sampling profiler producing folded stacks for flame graphs."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+
+def _fold(frame: FrameType | None) -> str:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Sample the stack of one thread at a fixed interval.
+
+    Sampling runs on a separate thread, so the profiled thread (normally the
+    one running the event loop) keeps serving traffic; its cost is one stack
+    walk per ``interval``. Only one profile may run at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def sample(self, thread_id: int, seconds: float, interval: float) -> Counter[str]:
+        """Return how often each folded stack of ``thread_id`` was seen.
+
+        Raises:
+            RuntimeError: If another profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            stacks: Counter[str] = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[_fold(frame)] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+
+def render_folded(stacks: Counter[str]) -> str:
+    """Render samples in the folded format read by flamegraph.pl and speedscope."""
+
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+profiler = SamplingProfiler()
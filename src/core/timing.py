@@ -0,0 +1,138 @@
+"""Per-request span timing surfaced as a ``Server-Timing`` header."""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Iterator, ParamSpec, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Span name -> [total seconds, calls] for the request being served.
+_spans: ContextVar[dict[str, list[float]] | None] = ContextVar(
+    "request_spans", default=None
+)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the duration of the block to span ``name`` of the current request.
+
+    Outside a request (or with timing disabled) this costs one context
+    variable lookup. Repeated spans with the same name are summed.
+    """
+
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = spans.setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - start
+        entry[1] += 1
+
+
+def timed(
+    name: str,
+) -> Callable[
+    [Callable[P, Coroutine[Any, Any, T]]], Callable[P, Coroutine[Any, Any, T]]
+]:
+    """Decorate a coroutine function so each call is recorded as span ``name``."""
+
+    def decorator(
+        fn: Callable[P, Coroutine[Any, Any, T]],
+    ) -> Callable[P, Coroutine[Any, Any, T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if _spans.get() is None:
+                return await fn(*args, **kwargs)
+            with span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _header(spans: dict[str, list[float]], total: float) -> str:
+    entries = [
+        f"{name};dur={seconds * 1e3:.2f}" for name, (seconds, _) in spans.items()
+    ]
+    entries.append(f"total;dur={total * 1e3:.2f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Collect spans per request and report them in ``Server-Timing``.
+
+    Only spans finished before the response headers are sent appear in the
+    header; with ``log=True`` every request also produces one JSON log line
+    with all spans, including those of a streamed body.
+    """
+
+    def __init__(self, app: ASGIApp, header: bool = True, log: bool = False) -> None:
+        self.app = app
+        self.header = header
+        self.log = log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: dict[str, list[float]] = {}
+        token = _spans.set(spans)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    header = _header(spans, time.perf_counter() - start)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", header.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _spans.reset(token)
+            if self.log:
+                self._log(scope, status, spans, time.perf_counter() - start)
+
+    @staticmethod
+    def _log(
+        scope: Scope, status: int, spans: dict[str, list[float]], total: float
+    ) -> None:
+        route: Any = scope.get("route")
+        logger.info(
+            json.dumps(
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route.path if route is not None else None,
+                    "status": status,
+                    "total_ms": round(total * 1e3, 3),
+                    "spans": {
+                        name: {"ms": round(seconds * 1e3, 3), "calls": int(calls)}
+                        for name, (seconds, calls) in spans.items()
+                    },
+                }
+            )
+        )
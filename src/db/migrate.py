@@ -0,0 +1,35 @@
+"""One-shot schema setup, run once per deployment rather than per worker::
+
+    python -m src.db.migrate
+
+Creates missing tables and indexes in ``DATABASE_URL``; existing tables are
+left as they are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from .session import dispose_engines, init_db
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate() -> None:
+    """Bring the schema up to date and release the connections used."""
+
+    try:
+        await init_db()
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
+    logger.info("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,17 @@ from __future__ import annotations
 
 from datetime import datetime
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Boolean, DateTime
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 
 
 class Base(DeclarativeBase):
@@ -21,5 +31,58 @@ class User(Base):
     last_violation: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Only blocked users are ever looked up by expiry, so index just them.
+        Index(
+            "ix_users_blocked_until",
+            "blocked_until",
+            postgresql_where=text("is_blocked"),
+            sqlite_where=text("is_blocked = 1"),
+        ),
+        # Admin listings page through users with strikes (blocked ones
+        # included) in ID order.
+        Index(
+            "ix_users_violating",
+            "user_id",
+            postgresql_where=text("violation_count > 0"),
+            sqlite_where=text("violation_count > 0"),
+        ),
+    )
+
+
+class RateLimit(Base):
+    """Per-user token bucket shared by all workers, plus optional overrides."""
+
+    __tablename__ = "rate_limits"
+
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    per_minute: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    burst: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    tokens: Mapped[float] = mapped_column(Float)
+    updated_at: Mapped[float] = mapped_column(Float)
+    allowed: Mapped[bool] = mapped_column(Boolean, default=True)
+
+
+class ViolationEvent(Base):
+    """Append-only audit record of a moderation decision."""
+
+    __tablename__ = "violation_events"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(32))
+    user_id: Mapped[str] = mapped_column(String)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    violation_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    blocked_until: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_violation_events_user_id_occurred_at", "user_id", "occurred_at"),
+    )
@@ -1,20 +1,150 @@
 from __future__ import annotations
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+from typing import Any
 
-from ..core.config import get_settings
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
+from ..core.config import Settings, get_settings
+from ..core.metrics import observe_pool
 
-_settings = get_settings()
-engine = create_async_engine(_settings.database_url, echo=False)
-async_session_maker = async_sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
-)
 
+def engine_options(url: str, settings: Settings) -> dict[str, Any]:
+    """Pool and driver options from ``settings`` that apply to ``url``.
 
-async def init_db() -> None:
-    """Create database tables."""
+    In-memory SQLite keeps its single shared connection, so only pre-ping
+    applies to it; the asyncpg statement cache size only applies to asyncpg.
+    """
+
+    parsed = make_url(url)
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return options
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.db_statement_cache_size
+        }
+    return options
+
+
+def create_engine(url: str, settings: Settings | None = None) -> AsyncEngine:
+    """Create an async engine for ``url`` using the configured pool options."""
+
+    settings = settings or get_settings()
+    return create_async_engine(url, echo=False, **engine_options(url, settings))
+
+
+# Engines are built on first use, inside the worker process, so importing the
+# app has no side effects and forking before startup is safe.
+_engine: AsyncEngine | None = None
+_session_maker: async_sessionmaker[AsyncSession] | None = None
+_replica_engine: AsyncEngine | None = None
+_replica_session_maker: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """Return the primary engine, creating it on first use."""
+
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_engine(settings.database_url, settings)
+        observe_pool(_engine.pool)
+    return _engine
+
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Return the session factory for the primary."""
+
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(
+            get_engine(), expire_on_commit=False, class_=AsyncSession
+        )
+    return _session_maker
+
+
+def get_replica_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Return the factory for reads that tolerate replication lag.
+
+    Without ``DATABASE_REPLICA_URL`` this is the primary's factory.
+    """
+
+    global _replica_engine, _replica_session_maker
+    if _replica_session_maker is None:
+        settings = get_settings()
+        if not settings.database_replica_url:
+            return get_session_maker()
+        _replica_engine = create_engine(settings.database_replica_url, settings)
+        _replica_session_maker = async_sessionmaker(
+            _replica_engine, expire_on_commit=False, class_=AsyncSession
+        )
+    return _replica_session_maker
+
+
+async def warm_up(connections: int) -> None:
+    """Open up to ``connections`` pooled connections to each database.
+
+    The connections are opened concurrently and returned to the pool, so the
+    first requests do not pay for connection setup. Never more than the pool
+    keeps idle (``DB_POOL_SIZE``).
+    """
+
+    get_replica_session_maker()
+    for engine in (_engine or get_engine(), _replica_engine):
+        if engine is None:
+            continue
+        count = min(connections, getattr(engine.pool, "size", lambda: 1)())
+        opened = await asyncio.gather(
+            *(engine.connect().start() for _ in range(count)), return_exceptions=True
+        )
+        for conn in opened:
+            if not isinstance(conn, BaseException):
+                await conn.close()
+        errors = [e for e in opened if isinstance(e, BaseException)]
+        if errors:
+            raise errors[0]
+
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of every engine created so far.
+
+    The engines stay usable and open new connections when needed again.
+    """
+
+    for engine in (_engine, _replica_engine):
+        if engine is not None:
+            await engine.dispose()
+
+
+def _create_schema(conn: Connection) -> None:
     from .models import Base
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    Base.metadata.create_all(conn)
+    # create_all skips existing tables, including indexes added to them later.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def init_db() -> None:
+    """Create missing tables and indexes on the primary."""
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(_create_schema)
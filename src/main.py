@@ -2,21 +2,112 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
-from .api import chat, admin
-from .core.config import get_settings
-from .db.session import init_db
+from .api import chat, admin, health, metrics
+from .core.config import Settings, get_settings
+from .core.lifecycle import DrainMiddleware, Lifecycle
+from .core.metrics import monitor_event_loop
+from .core.timing import ServerTimingMiddleware
+from .db.session import dispose_engines, init_db
+from .db.session import warm_up as warm_up_db
+from .repository.audit_log import get_audit_log
+from .repository.user_repository import get_user_repository
+from .services.openai_client import OpenAIClientProtocol, get_openai_client
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up(
+    settings: Settings, client: OpenAIClientProtocol, lifecycle: Lifecycle
+) -> None:
+    """Pre-open DB and upstream connections, then report ready.
+
+    Best effort: failures and timeouts are logged and the worker becomes
+    ready anyway, since requests can open connections themselves.
+    """
+
+    try:
+        async with asyncio.timeout(settings.warmup_timeout_seconds):
+            results = await asyncio.gather(
+                warm_up_db(settings.warmup_db_connections),
+                client.warm_up(settings.warmup_upstream_connections),
+                return_exceptions=True,
+            )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Warm-up failed: %s", result)
+    except TimeoutError:
+        logger.warning(
+            "Warm-up did not finish within %s s", settings.warmup_timeout_seconds
+        )
+    lifecycle.ready = True
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build per-worker resources on startup and release them on shutdown.
+
+    Nothing here runs at import time, so workers can be forked from a parent
+    that imported the app. The schema is created by ``python -m
+    src.db.migrate`` unless ``DB_CREATE_SCHEMA_ON_STARTUP`` is set. Requests
+    are served while connections are being warmed up; ``/health/ready``
+    answers **200** once that is done. On shutdown the worker reports
+    draining and clients and pools are closed; waiting for running chats is
+    the server's job (see :class:`src.serve.DrainingServer`).
+    """
+
+    settings = get_settings()
+    lifecycle: Lifecycle = app.state.lifecycle
+    if settings.db_create_schema_on_startup:
+        await init_db()
+    repository = get_user_repository()
+    await repository.start()
+    client = get_openai_client()
+
+    background = [asyncio.create_task(_warm_up(settings, client, lifecycle))]
+    if settings.metrics_enabled and settings.event_loop_lag_interval > 0:
+        background.append(
+            asyncio.create_task(monitor_event_loop(settings.event_loop_lag_interval))
+        )
+    try:
+        yield
+    finally:
+        # Under ``python -m src.serve`` draining began when the signal arrived
+        # and the server has already waited for running requests.
+        lifecycle.start_draining()
+        for task in background:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        # Each close runs even if an earlier one fails, so a failed flush of
+        # pending writes does not leak the upstream client or the pools.
+        for name, close in (
+            ("user repository", repository.aclose),
+            ("audit log", get_audit_log().aclose),
+            ("OpenAI client", client.aclose),
+            ("database engines", dispose_engines),
+        ):
+            try:
+                await close()
+            except Exception:
+                logger.exception("Closing the %s failed", name)
 
 
 def create_app() -> FastAPI:
     """Create FastAPI application."""
 
-    _ = get_settings()  # pragma: no cover
+    settings = get_settings()
 
     tags_metadata = [
         {"name": "chat", "description": "Send messages through the OpenAI proxy."},
         {"name": "admin", "description": "Administrative operations."},
+        {"name": "health", "description": "Liveness and readiness probes."},
     ]
 
     app = FastAPI(
@@ -24,16 +115,28 @@ def create_app() -> FastAPI:
         description="An intelligent chat gateway with content moderation and blocking",
         version="0.1.0",
         openapi_tags=tags_metadata,
+        lifespan=lifespan,
     )
 
-    @app.on_event("startup")
-    async def startup_event() -> None:
-        """Initialize database on startup."""
-        await init_db()
+    if settings.metrics_enabled:
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.include_router(metrics.router)
+
+    if settings.server_timing_enabled or settings.request_timing_log:
+        app.add_middleware(
+            ServerTimingMiddleware,
+            header=settings.server_timing_enabled,
+            log=settings.request_timing_log,
+        )
+
+    # Outermost, so refused requests skip the rest of the stack.
+    app.state.lifecycle = Lifecycle()
+    app.add_middleware(DrainMiddleware, state=app.state.lifecycle)
 
     # Include routers
     app.include_router(chat.router)
     app.include_router(admin.router)
+    app.include_router(health.router)
 
     return app
 
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ChatRequest(BaseModel):
@@ -19,6 +19,21 @@ class ChatResponse(BaseModel):
     user_id: str = Field(..., description="User identifier")
 
 
+class BatchChatItem(BaseModel):
+    """Single message within a batch chat request."""
+
+    user_id: str = Field(..., min_length=1, description="User identifier")
+    message: str = Field(..., description="User's chat message")
+
+
+class BatchChatRequest(BaseModel):
+    """Request schema for the batch chat endpoint."""
+
+    items: list[BatchChatItem] = Field(
+        ..., max_length=1000, description="Messages to process, in order"
+    )
+
+
 class ErrorResponse(BaseModel):
     """Error response schema."""
 
@@ -27,6 +42,21 @@ class ErrorResponse(BaseModel):
     details: str | None = Field(None, description="Additional error details")
 
 
+class BatchChatResult(BaseModel):
+    """Outcome of one batch item."""
+
+    user_id: str = Field(..., description="User identifier")
+    status_code: int = Field(..., description="HTTP status the item would get")
+    response: str | None = Field(None, description="OpenAI response on success")
+    error: ErrorResponse | None = Field(None, description="Error on failure")
+
+
+class BatchChatResponse(BaseModel):
+    """Response schema for the batch chat endpoint."""
+
+    results: list[BatchChatResult] = Field(..., description="Per-item results")
+
+
 class UserStatus(BaseModel):
     """User status data model."""
 
@@ -37,3 +67,80 @@ class UserStatus(BaseModel):
     last_violation: datetime | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class UserPage(BaseModel):
+    """One page of a keyset-paginated user listing."""
+
+    items: list[UserStatus] = Field(..., description="Users on this page")
+    next_cursor: str | None = Field(
+        None, description="Pass as `after` to get the next page; null on the last"
+    )
+
+
+class BulkUnblockRequest(BaseModel):
+    """Selection of users to unblock at once; at least one filter is required."""
+
+    user_ids: list[str] | None = Field(
+        None, max_length=10_000, description="Users to unblock and reset"
+    )
+    blocked_before: datetime | None = Field(
+        None, description="Unblock users whose blocking strike is older than this"
+    )
+
+    @model_validator(mode="after")
+    def _require_filter(self) -> BulkUnblockRequest:
+        if self.user_ids is None and self.blocked_before is None:
+            raise ValueError("user_ids or blocked_before is required")
+        return self
+
+
+class BulkUnblockResponse(BaseModel):
+    """Users affected by a bulk unblock."""
+
+    unblocked: int = Field(..., description="Number of users unblocked")
+    user_ids: list[str] = Field(..., description="IDs of the users unblocked")
+
+
+class RegistryStatus(BaseModel):
+    """In-process user-ID registry statistics."""
+
+    size: int = Field(..., description="Number of user IDs in the registry")
+    loaded: bool = Field(..., description="Whether the initial load has run")
+    watermark: datetime | None = Field(
+        None, description="Newest created_at seen by the registry"
+    )
+    staleness_seconds: float | None = Field(
+        None, description="Seconds since the last sync with the database"
+    )
+    sync_interval_seconds: float = Field(
+        ..., description="Maximum staleness before the next sync"
+    )
+
+
+class AuditStatus(BaseModel):
+    """Audit log queue statistics."""
+
+    queued: int = Field(..., description="Events waiting to be written")
+    written: int = Field(..., description="Events written by every sink")
+    dropped: int = Field(..., description="Events dropped because the queue was full")
+    failed: int = Field(..., description="Events a sink failed to write")
+
+
+class UpstreamStatus(BaseModel):
+    """Upstream concurrency limiter statistics."""
+
+    limit: int = Field(..., description="Current adaptive concurrency limit")
+    in_flight: int = Field(..., description="Upstream calls currently running")
+    queued: int = Field(..., description="Calls waiting for a slot")
+    shed: int = Field(..., description="Calls rejected with 503 so far")
+    latency_seconds: float = Field(..., description="Smoothed upstream latency")
+
+
+class RateLimitOverride(BaseModel):
+    """Per-user replacement for the global chat rate limit."""
+
+    per_minute: int = Field(
+        ..., ge=0, description="Requests refilled per minute (0 = unlimited)"
+    )
+    burst: int = Field(..., ge=1, description="Maximum requests in a burst")
@@ -0,0 +1,263 @@
+"""Append-only audit trail of moderation decisions, written off the hot path."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import BinaryIO, Literal, Protocol
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.config import get_settings
+from ..core.metrics import AUDIT_EVENTS, AUDIT_QUEUE
+from ..db.models import ViolationEvent
+
+logger = logging.getLogger(__name__)
+
+AuditKind = Literal["violation", "block", "auto_unblock", "admin_unblock"]
+
+_WRITTEN = AUDIT_EVENTS.labels("written")
+_DROPPED = AUDIT_EVENTS.labels("dropped")
+_FAILED = AUDIT_EVENTS.labels("failed")
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    kind: AuditKind
+    user_id: str
+    violation_count: int | None = None
+    blocked_until: datetime | None = None
+    message: str | None = None
+    occurred_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass(frozen=True)
+class AuditStats:
+    queued: int
+    written: int
+    dropped: int
+    failed: int
+
+
+class AuditSink(Protocol):
+    async def write(self, events: list[AuditEvent]) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class JsonlAuditSink:
+    """One JSON object per line in ``path``, rotated to ``path.1``, ``path.2``...
+
+    A batch that would grow the file beyond ``max_bytes`` starts a new one
+    (``0`` disables rotation). File I/O runs in a worker thread so the event
+    loop never waits on disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._stream: BinaryIO | None = None
+
+    async def write(self, events: list[AuditEvent]) -> None:
+        data = "".join(
+            json.dumps(asdict(event), default=str) + "\n" for event in events
+        ).encode()
+        await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        if self._stream is None:
+            self._stream = open(self._path, "ab")
+        size = self._stream.tell()
+        if self._max_bytes > 0 and size and size + len(data) > self._max_bytes:
+            self._rotate()
+            self._stream = open(self._path, "ab")
+        self._stream.write(data)
+        self._stream.flush()
+
+    def _rotate(self) -> None:
+        assert self._stream is not None
+        self._stream.close()
+        for i in range(self._backup_count - 1, 0, -1):
+            if os.path.exists(f"{self._path}.{i}"):
+                os.replace(f"{self._path}.{i}", f"{self._path}.{i + 1}")
+        if self._backup_count > 0:
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+
+    async def aclose(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            await asyncio.to_thread(stream.close)
+
+
+class DatabaseAuditSink:
+    """Multi-row inserts into ``violation_events``."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def write(self, events: list[AuditEvent]) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                insert(ViolationEvent).values([asdict(event) for event in events])
+            )
+            await session.commit()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class AuditLog:
+    """Bounded in-process queue of audit events drained by a background task.
+
+    :meth:`emit` never waits: when ``max_queue`` events are already pending
+    the new one is dropped and counted. Every ``interval`` seconds, or as
+    soon as ``batch_size`` events are pending, the task hands batches to each
+    sink; a batch any sink fails to write is counted as failed, not retried.
+    With no sinks configured, :meth:`emit` does nothing.
+    """
+
+    def __init__(
+        self,
+        sinks: list[AuditSink],
+        max_queue: int,
+        batch_size: int,
+        interval: float,
+    ) -> None:
+        self._sinks = sinks
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._interval = interval
+        self._pending: deque[AuditEvent] = deque()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._sinks)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def emit(self, event: AuditEvent) -> None:
+        """Queue ``event``; must be called from the event loop."""
+
+        if not self._sinks:
+            return
+        if len(self._pending) >= self._max_queue:
+            self._dropped += 1
+            _DROPPED.inc()
+            return
+        self._pending.append(event)
+        self._ensure_running()
+        if len(self._pending) >= self._batch_size and self._wake is not None:
+            self._wake.set()
+
+    def stats(self) -> AuditStats:
+        return AuditStats(
+            queued=len(self._pending),
+            written=self._written,
+            dropped=self._dropped,
+            failed=self._failed,
+        )
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+
+        while self._pending:
+            count = min(self._batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            failed = False
+            try:
+                for sink in self._sinks:
+                    try:
+                        await sink.write(batch)
+                    except Exception:
+                        failed = True
+                        logger.exception(
+                            "Audit sink %s lost %d events", type(sink).__name__, count
+                        )
+            except BaseException:
+                # Cancelled mid-batch: keep it for the final flush.
+                self._pending.extendleft(reversed(batch))
+                raise
+            if failed:
+                self._failed += count
+                _FAILED.inc(count)
+            else:
+                self._written += count
+                _WRITTEN.inc(count)
+
+    async def aclose(self) -> None:
+        """Stop the background task, write what is queued and close the sinks."""
+
+        task, self._task = self._task, None
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self.flush()
+        for sink in self._sinks:
+            await sink.aclose()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run(self._wake))
+
+    async def _run(self, wake: asyncio.Event) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self._interval):
+                    await wake.wait()
+            wake.clear()
+            await self.flush()
+
+
+def excerpt(message: str) -> str | None:
+    """The part of a message kept in audit events, per ``AUDIT_MESSAGE_CHARS``."""
+
+    limit = get_settings().audit_message_chars
+    return message[:limit] if limit > 0 else None
+
+
+@lru_cache(maxsize=1)
+def get_audit_log() -> AuditLog:
+    """Return this worker's audit log, with the sinks enabled in settings."""
+
+    from ..db.session import get_session_maker
+
+    settings = get_settings()
+    sinks: list[AuditSink] = []
+    if settings.audit_log_path:
+        sinks.append(
+            JsonlAuditSink(
+                settings.audit_log_path,
+                settings.audit_log_max_bytes,
+                settings.audit_log_backup_count,
+            )
+        )
+    if settings.audit_log_database:
+        sinks.append(DatabaseAuditSink(get_session_maker()))
+    audit_log = AuditLog(
+        sinks,
+        max_queue=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        interval=settings.audit_flush_interval_ms / 1000,
+    )
+    AUDIT_QUEUE.set_function(lambda: len(audit_log))
+    return audit_log
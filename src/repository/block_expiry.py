@@ -0,0 +1,144 @@
+"""Background expiry of temporary blocks."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class BlockExpirySweeper:
+    """Lift due blocks in bulk, waking exactly when the next one is due.
+
+    Upcoming ``blocked_until`` times are kept in a min-heap; the sweeper
+    sleeps until the earliest of them and then expires every due block with
+    a single ``UPDATE ... RETURNING``, calling ``on_expired`` for each user it
+    unblocked. Blocks applied by other workers are not in this worker's heap,
+    so a sweep also runs at least every ``max_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        on_expired: Callable[[str], None],
+        max_interval: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._on_expired = on_expired
+        self._max_interval = max_interval
+        self._heap: list[tuple[float, str]] = []
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def start(self) -> None:
+        """Schedule every block currently in the database and start sweeping."""
+
+        async with self._session_factory() as session:
+            rows = await session.execute(
+                select(User.user_id, User.blocked_until).where(
+                    User.is_blocked.is_(True), User.blocked_until.is_not(None)
+                )
+            )
+            for user_id, blocked_until in rows:
+                heapq.heappush(self._heap, (_timestamp(blocked_until), user_id))
+        self._ensure_running()
+
+    def schedule(self, user_id: str, blocked_until: datetime | None) -> None:
+        """Remember that ``user_id`` becomes unblocked at ``blocked_until``."""
+
+        if blocked_until is None:
+            return
+        due = _timestamp(blocked_until)
+        earliest = self._heap[0][0] if self._heap else math.inf
+        heapq.heappush(self._heap, (due, user_id))
+        self._ensure_running()
+        if due < earliest and self._wake is not None:
+            self._wake.set()
+
+    async def sweep(self) -> list[str]:
+        """Expire all due blocks now and return the affected user IDs."""
+
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            expired = list(
+                await session.scalars(
+                    update(User)
+                    .where(
+                        User.is_blocked.is_(True),
+                        User.blocked_until.is_not(None),
+                        User.blocked_until <= now,
+                    )
+                    .values(
+                        is_blocked=False,
+                        blocked_until=None,
+                        violation_count=0,
+                        updated_at=now,
+                    )
+                    .returning(User.user_id)
+                )
+            )
+            await session.commit()
+        cutoff = now.timestamp()
+        while self._heap and self._heap[0][0] <= cutoff:
+            heapq.heappop(self._heap)
+        for user_id in expired:
+            self._on_expired(user_id)
+        return expired
+
+    async def aclose(self) -> None:
+        """Stop the background task; pending expiries stay in the database."""
+
+        task, self._task = self._task, None
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run(self._wake))
+
+    async def _run(self, wake: asyncio.Event) -> None:
+        last_sweep = time.time()
+        while True:
+            now = time.time()
+            next_due = self._heap[0][0] if self._heap else math.inf
+            delay = min(next_due, last_sweep + self._max_interval) - now
+            if delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(delay):
+                        await wake.wait()
+                wake.clear()
+                continue
+            try:
+                expired = await self.sweep()
+            except Exception:
+                logger.exception("Block expiry sweep failed")
+                await asyncio.sleep(min(self._max_interval, 5.0))
+                continue
+            last_sweep = time.time()
+            if expired:
+                logger.info("Expired %d blocks", len(expired))
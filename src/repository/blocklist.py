@@ -0,0 +1,58 @@
+"""Bounded in-process cache of currently blocked users."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class Blocklist:
+    """LRU map of blocked user IDs to the wall-clock time their entry expires.
+
+    An entry lives until the user's ``blocked_until`` or ``recheck_seconds``
+    after it was cached, whichever comes first. The recheck bound is how long
+    an unblock performed by another worker process can go unnoticed here:
+    once an entry lapses the next request goes back to the database, which
+    re-populates the entry if the user is still blocked.
+    """
+
+    def __init__(self, max_size: int, recheck_seconds: float) -> None:
+        self._max_size = max_size
+        self._recheck = recheck_seconds
+        self._entries: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, user_id: str, blocked_until: datetime | None) -> None:
+        """Cache ``user_id`` as blocked until ``blocked_until``."""
+
+        if self._max_size <= 0:
+            return
+        expires = time.time() + self._recheck
+        if blocked_until is not None:
+            if blocked_until.tzinfo is None:
+                blocked_until = blocked_until.replace(tzinfo=timezone.utc)
+            expires = min(expires, blocked_until.timestamp())
+        self._entries[user_id] = expires
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, user_id: str) -> None:
+        """Forget ``user_id``, e.g. after an unblock."""
+
+        self._entries.pop(user_id, None)
+
+    def contains(self, user_id: str) -> bool:
+        """Return whether ``user_id`` is cached as blocked and not yet expired."""
+
+        expires = self._entries.get(user_id)
+        if expires is None:
+            return False
+        if time.time() >= expires:
+            del self._entries[user_id]
+            return False
+        self._entries.move_to_end(user_id)
+        return True
@@ -0,0 +1,150 @@
+"""Database-backed per-user rate limiter shared across workers."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any
+
+from sqlalchemy import Float, case, cast, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.models import RateLimit
+from ..db.session import get_session_maker
+from ..services.rate_limiter import RateLimitExceeded, retry_after
+
+
+class DatabaseRateLimiter:
+    """Token buckets stored in the ``rate_limits`` table.
+
+    Each request is a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``
+    that refills the bucket from the elapsed time, takes the tokens if enough
+    are available and reports the decision, so concurrent workers never race.
+    Per-user overrides live in the same row. ``per_minute <= 0`` disables
+    limiting for users without an override, at the cost of one primary-key
+    lookup per request instead of a write.
+    """
+
+    def __init__(
+        self,
+        per_minute: int,
+        burst: int,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self._per_minute = per_minute
+        self._burst = burst
+        self._session_factory = session_factory or get_session_maker()
+
+    async def acquire(self, user_id: str, cost: int = 1) -> None:
+        if not await self._limited(user_id):
+            return
+        allowed, tokens, per_minute = await self._take(user_id, cost)
+        if per_minute <= 0 or allowed:
+            return
+        raise RateLimitExceeded(retry_after(cost - tokens, per_minute))
+
+    async def acquire_up_to(self, user_id: str, cost: int) -> tuple[int, int]:
+        if not await self._limited(user_id):
+            return cost, 0
+        allowed, tokens, per_minute = await self._take(user_id, cost)
+        if per_minute <= 0 or allowed:
+            return cost, 0
+        taken = 0
+        if tokens >= 1:
+            # A rejected take reports what was left; another worker may have
+            # taken it since, in which case this takes nothing either.
+            allowed, left, _ = await self._take(user_id, math.floor(tokens))
+            if allowed:
+                taken, tokens = math.floor(tokens), left
+        return taken, retry_after(1 - tokens, per_minute)
+
+    async def _limited(self, user_id: str) -> bool:
+        """Whether the user has a positive rate, globally or by override."""
+
+        if self._per_minute > 0:
+            return True
+        async with self._session_factory() as session:
+            per_minute = await session.scalar(
+                select(RateLimit.per_minute).where(RateLimit.user_id == user_id)
+            )
+        return per_minute is not None and per_minute > 0
+
+    async def _take(self, user_id: str, cost: int) -> tuple[bool, float, int]:
+        """Take ``cost`` tokens if there are enough.
+
+        Returns whether they were taken, the tokens left and the user's rate.
+        """
+
+        async with self._session_factory() as session:
+            row = (
+                await session.execute(self._take_statement(session, user_id, cost))
+            ).one()
+            await session.commit()
+        per_minute = row.per_minute if row.per_minute is not None else self._per_minute
+        return row.allowed, row.tokens, per_minute
+
+    async def set_override(self, user_id: str, per_minute: int, burst: int) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                self._insert(session)
+                .values(
+                    user_id=user_id,
+                    per_minute=per_minute,
+                    burst=burst,
+                    tokens=float(burst),
+                    updated_at=time.time(),
+                    allowed=True,
+                )
+                .on_conflict_do_update(
+                    index_elements=[RateLimit.user_id],
+                    set_={
+                        "per_minute": per_minute,
+                        "burst": burst,
+                        "tokens": float(burst),
+                    },
+                )
+            )
+            await session.commit()
+
+    async def clear_override(self, user_id: str) -> None:
+        async with self._session_factory() as session:
+            await session.execute(delete(RateLimit).where(RateLimit.user_id == user_id))
+            await session.commit()
+
+    @staticmethod
+    def _insert(session: AsyncSession) -> Any:
+        bind = session.bind
+        if bind is not None and bind.dialect.name == "postgresql":
+            return postgresql.insert(RateLimit)
+        return sqlite.insert(RateLimit)
+
+    def _take_statement(self, session: AsyncSession, user_id: str, cost: int) -> Any:
+        now = time.time()
+        per_minute = func.coalesce(RateLimit.per_minute, self._per_minute)
+        burst = func.coalesce(RateLimit.burst, self._burst)
+        grown = (
+            RateLimit.tokens
+            + (now - RateLimit.updated_at) * cast(per_minute, Float) / 60.0
+        )
+        refilled = case((grown > burst, cast(burst, Float)), else_=grown)
+        allowed = refilled >= cost
+        first_allowed = self._burst >= cost
+        return (
+            self._insert(session)
+            .values(
+                user_id=user_id,
+                tokens=float(self._burst - cost if first_allowed else self._burst),
+                updated_at=now,
+                allowed=first_allowed,
+            )
+            .on_conflict_do_update(
+                index_elements=[RateLimit.user_id],
+                set_={
+                    "tokens": case((allowed, refilled - cost), else_=refilled),
+                    "updated_at": now,
+                    "allowed": allowed,
+                },
+            )
+            .returning(RateLimit.tokens, RateLimit.allowed, RateLimit.per_minute)
+        )
@@ -0,0 +1,190 @@
+"""Multi-pattern matcher used to spot user IDs inside chat messages."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Iterable
+
+# Newly registered IDs are kept in a small side trie until it grows past this
+# size (or an eighth of the main automaton), then everything is rebuilt into a
+# single Aho-Corasick automaton.
+_MIN_PENDING = 256
+
+
+class _Automaton:
+    """Trie over lowercased user IDs with optional Aho-Corasick links."""
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._dict_link: list[int] = [-1]
+        self._ids: dict[int, set[str]] = {}
+        self.size = 0
+
+    def add(self, key: str, user_id: str) -> None:
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._dict_link.append(-1)
+            node = nxt
+        self._ids.setdefault(node, set()).add(user_id)
+        self.size += 1
+
+    def build(self) -> None:
+        """Compute failure and dictionary-suffix links (BFS over the trie)."""
+
+        goto, fail, dict_link, ids = self._goto, self._fail, self._dict_link, self._ids
+        queue: deque[int] = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            dict_link[child] = -1
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(ch, 0)
+                fail[child] = target if target != child else 0
+                dict_link[child] = (
+                    fail[child] if fail[child] in ids else dict_link[fail[child]]
+                )
+                queue.append(child)
+
+    def _other(self, node: int, exclude: str | None) -> str | None:
+        for user_id in self._ids[node]:
+            if user_id != exclude:
+                return user_id
+        return None
+
+    def scan(self, text: str, exclude: str | None) -> str | None:
+        """Single pass over ``text`` using the failure links built by ``build``."""
+
+        goto, fail, dict_link, ids = self._goto, self._fail, self._dict_link, self._ids
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            node = state if state in ids else dict_link[state]
+            while node > 0:
+                found = self._other(node, exclude)
+                if found is not None:
+                    return found
+                node = dict_link[node]
+        return None
+
+    def walk(self, text: str, exclude: str | None) -> str | None:
+        """Match without failure links by walking the trie from every offset."""
+
+        goto, ids = self._goto, self._ids
+        length = len(text)
+        for start in range(length):
+            node = 0
+            pos = start
+            while pos < length:
+                nxt = goto[node].get(text[pos])
+                if nxt is None:
+                    break
+                node = nxt
+                pos += 1
+                if node in ids:
+                    found = self._other(node, exclude)
+                    if found is not None:
+                        return found
+        return None
+
+
+class UserIdMatcher:
+    """Find any registered user ID inside a message in one pass.
+
+    IDs are matched case-insensitively, like the original substring scan. New
+    IDs can be added at any time; they are searched through a small side trie
+    until enough of them accumulate to justify rebuilding the main automaton.
+    Inside a running event loop that rebuild happens in a worker thread and
+    is swapped in when done, so :meth:`add` never waits for it.
+    """
+
+    def __init__(self, user_ids: Iterable[str] = ()) -> None:
+        self._known: set[str] = set()
+        # Registration order, so a rebuild can cover a prefix of it.
+        self._ids: list[str] = []
+        for user_id in user_ids:
+            if user_id and user_id not in self._known:
+                self._known.add(user_id)
+                self._ids.append(user_id)
+        self._main = self._build(len(self._ids))
+        self._pending = _Automaton()
+        self._rebuilding: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._known
+
+    def add(self, user_id: str) -> None:
+        """Register a single user ID."""
+
+        if not user_id or user_id in self._known:
+            return
+        self._known.add(user_id)
+        self._ids.append(user_id)
+        self._pending.add(user_id.lower(), user_id)
+        if self._pending.size > max(_MIN_PENDING, self._main.size // 8):
+            self._schedule_rebuild()
+
+    def update(self, user_ids: Iterable[str]) -> None:
+        """Register many user IDs."""
+
+        for user_id in user_ids:
+            self.add(user_id)
+
+    def find(self, message: str, exclude: str | None = None) -> str | None:
+        """Return a registered ID (other than ``exclude``) found in ``message``."""
+
+        text = message.lower()
+        found = self._main.scan(text, exclude)
+        if found is None and self._pending.size:
+            found = self._pending.walk(text, exclude)
+        return found
+
+    def _schedule_rebuild(self) -> None:
+        if self._rebuilding is not None and not self._rebuilding.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            count = len(self._ids)
+            self._swap(self._build(count), count)
+            return
+        self._rebuilding = loop.create_task(self._rebuild(len(self._ids)))
+
+    async def _rebuild(self, count: int) -> None:
+        automaton = await asyncio.to_thread(self._build, count)
+        self._swap(automaton, count)
+        if self._pending.size > max(_MIN_PENDING, self._main.size // 8):
+            self._rebuilding = asyncio.create_task(self._rebuild(len(self._ids)))
+
+    def _build(self, count: int) -> _Automaton:
+        """Automaton over the first ``count`` registered IDs."""
+
+        automaton = _Automaton()
+        for user_id in self._ids[:count]:
+            automaton.add(user_id.lower(), user_id)
+        automaton.build()
+        return automaton
+
+    def _swap(self, automaton: _Automaton, count: int) -> None:
+        # IDs registered while the automaton was being built stay pending.
+        pending = _Automaton()
+        for user_id in self._ids[count:]:
+            pending.add(user_id.lower(), user_id)
+        self._main, self._pending = automaton, pending
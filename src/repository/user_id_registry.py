@@ -0,0 +1,129 @@
+"""Process-local registry of user IDs kept in sync with the users table."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.models import User
+from .user_id_matcher import UserIdMatcher
+
+
+@dataclass(frozen=True)
+class RegistryStats:
+    """Point-in-time view of the registry, used by the admin API."""
+
+    size: int
+    loaded: bool
+    watermark: datetime | None
+    staleness_seconds: float | None
+    sync_interval_seconds: float
+
+
+class UserIdRegistry:
+    """Keep a :class:`UserIdMatcher` in sync without rescanning the table.
+
+    The full ID list is read once; afterwards only rows whose ``created_at`` is
+    at or after the watermark (minus ``overlap_seconds`` to absorb commit lag
+    and clock skew between workers) are fetched, at most once every
+    ``sync_interval_seconds``. That interval is the staleness bound for users
+    created by other worker processes; users created by this process are added
+    immediately.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        sync_interval_seconds: float,
+        overlap_seconds: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._sync_interval = sync_interval_seconds
+        self._overlap = timedelta(seconds=overlap_seconds)
+        self._matcher: UserIdMatcher | None = None
+        self._watermark: datetime | None = None
+        self._last_sync: float | None = None
+        self._syncing = False
+
+    def add(self, user_id: str) -> None:
+        """Register a user created by this process."""
+
+        if self._matcher is not None:
+            self._matcher.add(user_id)
+
+    async def get_matcher(self) -> UserIdMatcher:
+        """Return the matcher, loading or refreshing it when due."""
+
+        if self._matcher is None:
+            await self.load()
+        elif not self._syncing and self._is_stale():
+            await self.sync()
+        assert self._matcher is not None
+        return self._matcher
+
+    async def load(self) -> None:
+        """Read every user ID and reset the watermark."""
+
+        self._last_sync = time.monotonic()
+        async with self._session_factory() as session:
+            rows = (await session.execute(select(User.user_id, User.created_at))).all()
+        self._matcher = UserIdMatcher(row.user_id for row in rows)
+        self._advance([row.created_at for row in rows])
+
+    async def sync(self) -> int:
+        """Pull users created since the watermark; return how many were seen."""
+
+        if self._matcher is None or self._watermark is None:
+            await self.load()
+            return len(self._matcher or ())
+        self._syncing = True
+        self._last_sync = time.monotonic()
+        try:
+            since = self._watermark - self._overlap
+            async with self._session_factory() as session:
+                rows = (
+                    await session.execute(
+                        select(User.user_id, User.created_at).where(
+                            User.created_at >= since
+                        )
+                    )
+                ).all()
+        finally:
+            self._syncing = False
+        self._matcher.update(row.user_id for row in rows)
+        self._advance([row.created_at for row in rows])
+        return len(rows)
+
+    def stats(self) -> RegistryStats:
+        staleness = None
+        if self._last_sync is not None:
+            staleness = time.monotonic() - self._last_sync
+        return RegistryStats(
+            size=len(self._matcher or ()),
+            loaded=self._matcher is not None,
+            watermark=self._watermark,
+            staleness_seconds=staleness,
+            sync_interval_seconds=self._sync_interval,
+        )
+
+    def _is_stale(self) -> bool:
+        return (
+            self._last_sync is None
+            or time.monotonic() - self._last_sync >= self._sync_interval
+        )
+
+    def _advance(self, created: list[datetime]) -> None:
+        if not created:
+            if self._watermark is None:
+                self._watermark = datetime.now(timezone.utc)
+            return
+        newest = max(
+            ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+            for ts in created
+        )
+        if self._watermark is None or newest > self._watermark:
+            self._watermark = newest
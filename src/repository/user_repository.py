@@ -3,28 +3,108 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Set
+from typing import Any, AsyncIterator, Set
 
-from sqlalchemy import select
+from sqlalchemy import and_, case, null, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ..core.config import get_settings
+from ..core.metrics import BLOCKS
+from ..core.timing import timed
 from ..db.models import User
-from ..db.session import async_session_maker
+from ..db.session import get_replica_session_maker, get_session_maker
+from .audit_log import AuditEvent, AuditLog, get_audit_log
+from .block_expiry import BlockExpirySweeper
+from .blocklist import Blocklist
+from .user_id_matcher import UserIdMatcher
+from .user_id_registry import UserIdRegistry
+from .write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
 
+def _is_due(blocked_until: datetime | None, now: datetime) -> bool:
+    if blocked_until is None:
+        return False
+    if blocked_until.tzinfo is None:
+        blocked_until = blocked_until.replace(tzinfo=timezone.utc)
+    return blocked_until <= now
+
+
+@dataclass(frozen=True)
+class Admission:
+    """Outcome of :meth:`UserRepository.admit` for a single chat request."""
+
+    user_id: str
+    violation_count: int
+    is_blocked: bool
+    blocked_until: datetime | None
+    was_blocked: bool
+    violation_recorded: bool
+
+
 class UserRepository:
-    """User violation tracking backed by a database."""
+    """User violation tracking backed by a database.
+
+    Writes and reads that must see them use ``session_factory`` (the primary).
+    Read-only lookups that tolerate replication lag -- block checks, clean
+    admissions, existence checks and the user-ID registry -- use
+    ``read_session_factory``, which defaults to the configured read replica
+    (or to ``session_factory`` when one is passed explicitly).
+    """
 
     def __init__(
-        self, session_factory: async_sessionmaker[AsyncSession] | None = None
+        self,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+        audit: AuditLog | None = None,
     ) -> None:
-        self._session_factory = session_factory or async_session_maker
+        self._session_factory = session_factory or get_session_maker()
+        self._read_session_factory = read_session_factory or (
+            session_factory or get_replica_session_maker()
+        )
         self._settings = get_settings()
+        self.audit = audit if audit is not None else get_audit_log()
+        self.user_ids = UserIdRegistry(
+            self._read_session_factory,
+            sync_interval_seconds=self._settings.user_registry_sync_seconds,
+            overlap_seconds=self._settings.user_registry_overlap_seconds,
+        )
+        self.blocklist = Blocklist(
+            max_size=self._settings.blocklist_max_size,
+            recheck_seconds=self._settings.blocklist_recheck_seconds,
+        )
+        self.block_expiry = BlockExpirySweeper(
+            self._session_factory,
+            on_expired=self._block_expired,
+            max_interval=self._settings.block_sweep_max_interval_seconds,
+        )
+        # Registrations of new users that can be written later, in batches.
+        self.write_behind: WriteBehindQueue | None = None
+        if self._settings.user_write_behind:
+            self.write_behind = WriteBehindQueue(
+                self._flush_registrations,
+                interval=self._settings.user_write_behind_interval_ms / 1000,
+                max_batch=self._settings.user_write_behind_max_batch,
+            )
+
+    async def start(self) -> None:
+        """Load the user-ID registry and start expiring blocks in the background."""
+
+        await self.user_ids.load()
+        await self.block_expiry.start()
+
+    async def aclose(self) -> None:
+        """Stop background work and write out any deferred registrations."""
 
+        await self.block_expiry.aclose()
+        if self.write_behind is not None:
+            await self.write_behind.aclose()
+
+    @timed("repo.get_user")
     async def get_user(self, user_id: str) -> User:
         async with self._session_factory() as session:
             user = await session.get(User, user_id)
@@ -39,68 +119,258 @@ class UserRepository:
                     created_at=now,
                     updated_at=now,
                 )
+                if self.write_behind is not None:
+                    self._defer_registration(user_id)
+                    return user
                 session.add(user)
                 await session.commit()
                 await session.refresh(user)
+                self._register_user_id(user_id)
             assert user is not None
             return user
 
+    @timed("repo.add_violation")
     async def add_violation(self, user_id: str) -> User:
+        """Atomically record a strike, creating the user when needed.
+
+        The counter is incremented by a single ``UPDATE ... SET violation_count
+        = violation_count + 1 ... RETURNING`` so concurrent strikes are never
+        lost, and the block is logged only by the strike that reaches the limit.
+        """
+        now = datetime.now(timezone.utc)
         async with self._session_factory() as session:
-            user = await session.get(User, user_id)
-            if user is None:
-                now = datetime.now(timezone.utc)
-                user = User(
-                    user_id=user_id,
-                    violation_count=0,
-                    is_blocked=False,
-                    blocked_until=None,
-                    last_violation=None,
-                    created_at=now,
-                    updated_at=now,
+            await session.execute(
+                self._insert_statement(session, [user_id], now).on_conflict_do_nothing(
+                    index_elements=[User.user_id]
                 )
-                session.add(user)
+            )
+            user: User = (
+                await session.scalars(
+                    self._strike_statement(now)
+                    .where(User.user_id == user_id)
+                    .returning(User),
+                    execution_options={"populate_existing": True},
+                )
+            ).one()
+            await session.commit()
 
-            now = datetime.now(timezone.utc)
-            user.violation_count += 1
-            user.last_violation = now
-            user.updated_at = now
+        self._register_user_id(user_id)
+        if user.is_blocked:
+            self.blocklist.add(user_id, user.blocked_until)
+        if user.violation_count == 3:
+            self._record_block(user_id, user.blocked_until, user.violation_count)
+        return user
 
-            if user.violation_count >= 3:
-                user.is_blocked = True
-                user.blocked_until = now + timedelta(
-                    minutes=self._settings.block_minutes
-                )
-                blocked_until_str = (
-                    str(user.blocked_until) if user.blocked_until else ""
+    @timed("repo.admit")
+    async def admit(self, user_id: str, violation: bool = False) -> Admission:
+        """Upsert the user, expire a due block and record a strike in one go.
+
+        Runs inside a single transaction: one ``INSERT ... ON CONFLICT ...
+        RETURNING`` statement creates the user or clears an expired block, and
+        only when ``violation`` is set and the user is not blocked a second
+        ``UPDATE ... RETURNING`` increments the strike counter. The strike is
+        conditional on the row still being unblocked, so concurrent requests
+        cannot push a user past the limit or trigger the block twice.
+
+        A request without a violation from a known user is decided with a
+        single ``SELECT``; a block that is due counts as lifted, and the
+        :class:`~.block_expiry.BlockExpirySweeper` writes the expiry later. In
+        write-behind mode a new user's row is queued too.
+        """
+        now = datetime.now(timezone.utc)
+        if not violation:
+            admission = await self._admit_read_only(user_id, now)
+            if admission is not None:
+                return admission
+        async with self._session_factory() as session:
+            row = (
+                await session.execute(self._upsert_statement(session, [user_id], now))
+            ).one()
+            admission = Admission(
+                user_id=user_id,
+                violation_count=row.violation_count,
+                is_blocked=row.is_blocked,
+                blocked_until=row.blocked_until,
+                was_blocked=row.is_blocked,
+                violation_recorded=False,
+            )
+            if violation and not row.is_blocked:
+                strike = (
+                    await session.execute(
+                        self._strike_statement(now)
+                        .where(User.user_id == user_id, User.is_blocked.is_(False))
+                        .returning(
+                            User.violation_count, User.is_blocked, User.blocked_until
+                        )
+                    )
+                ).one_or_none()
+                if strike is None:
+                    # A concurrent request blocked the user after our upsert.
+                    admission = Admission(
+                        user_id=user_id,
+                        violation_count=row.violation_count,
+                        is_blocked=True,
+                        blocked_until=row.blocked_until,
+                        was_blocked=True,
+                        violation_recorded=False,
+                    )
+                else:
+                    admission = Admission(
+                        user_id=user_id,
+                        violation_count=strike.violation_count,
+                        is_blocked=strike.is_blocked,
+                        blocked_until=strike.blocked_until,
+                        was_blocked=False,
+                        violation_recorded=True,
+                    )
+            await session.commit()
+
+        self._register_user_id(user_id)
+        if admission.is_blocked:
+            self.blocklist.add(user_id, admission.blocked_until)
+        if admission.violation_recorded and admission.is_blocked:
+            self._record_block(
+                user_id, admission.blocked_until, admission.violation_count
+            )
+        return admission
+
+    async def _admit_read_only(self, user_id: str, now: datetime) -> Admission | None:
+        """Decide a clean request with one ``SELECT``, or ``None`` if it must write.
+
+        Only a user without a row (outside write-behind mode) needs the
+        synchronous path.
+        """
+        async with self._read_session_factory() as session:
+            row = (
+                await session.execute(
+                    select(
+                        User.violation_count, User.is_blocked, User.blocked_until
+                    ).where(User.user_id == user_id)
                 )
-                logger.info(
-                    "User '%s' blocked until %s (%d strikes)",
-                    user_id,
-                    blocked_until_str,
-                    user.violation_count,
+            ).one_or_none()
+        if row is None and self.write_behind is None:
+            return None
+        if row is None or (row.is_blocked and _is_due(row.blocked_until, now)):
+            if row is None:
+                self._defer_registration(user_id)
+            return Admission(
+                user_id=user_id,
+                violation_count=0,
+                is_blocked=False,
+                blocked_until=None,
+                was_blocked=False,
+                violation_recorded=False,
+            )
+        if row.is_blocked:
+            self.blocklist.add(user_id, row.blocked_until)
+        return Admission(
+            user_id=user_id,
+            violation_count=row.violation_count,
+            is_blocked=row.is_blocked,
+            blocked_until=row.blocked_until,
+            was_blocked=row.is_blocked,
+            violation_recorded=False,
+        )
+
+    def _defer_registration(self, user_id: str) -> None:
+        assert self.write_behind is not None
+        self.write_behind.add(user_id)
+        self._register_user_id(user_id)
+
+    async def _flush_registrations(self, user_ids: list[str]) -> None:
+        """Insert queued users in one statement; existing rows are left alone."""
+
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            await session.execute(
+                self._insert_statement(session, user_ids, now).on_conflict_do_nothing(
+                    index_elements=[User.user_id]
                 )
+            )
+            await session.commit()
+
+    @timed("repo.admit_many")
+    async def admit_many(self, requests: list[tuple[str, bool]]) -> list[Admission]:
+        """Admit a batch of ``(user_id, violation)`` requests in one transaction.
 
+        All users are upserted with a single multi-row statement and all
+        strikes are applied with a single ``UPDATE``; items are evaluated in
+        order, so a user's strike that reaches the limit blocks the rest of
+        that user's items in the batch.
+        """
+        if not requests:
+            return []
+        now = datetime.now(timezone.utc)
+        block_until = now + timedelta(minutes=self._settings.block_minutes)
+        user_ids = list(dict.fromkeys(user_id for user_id, _ in requests))
+
+        async with self._session_factory() as session:
+            rows = (
+                await session.execute(self._upsert_statement(session, user_ids, now))
+            ).all()
+            counts = {row.user_id: row.violation_count for row in rows}
+            blocked = {row.user_id: row.is_blocked for row in rows}
+            until = {row.user_id: row.blocked_until for row in rows}
+            increments: dict[str, int] = {}
+            admissions: list[Admission] = []
+            for user_id, violation in requests:
+                was_blocked = blocked[user_id]
+                if violation and not was_blocked:
+                    counts[user_id] += 1
+                    increments[user_id] = increments.get(user_id, 0) + 1
+                    if counts[user_id] >= 3:
+                        blocked[user_id] = True
+                        until[user_id] = block_until
+                admissions.append(
+                    Admission(
+                        user_id=user_id,
+                        violation_count=counts[user_id],
+                        is_blocked=blocked[user_id],
+                        blocked_until=until[user_id],
+                        was_blocked=was_blocked,
+                        violation_recorded=violation and not was_blocked,
+                    )
+                )
+            if increments:
+                await session.execute(
+                    self._strike_statement(
+                        now, case(increments, value=User.user_id, else_=0)
+                    ).where(
+                        User.user_id.in_(list(increments)),
+                        User.is_blocked.is_(False),
+                    )
+                )
             await session.commit()
-            await session.refresh(user)
-            assert user is not None
-            return user
 
+        for user_id in user_ids:
+            self._register_user_id(user_id)
+            if blocked[user_id]:
+                self.blocklist.add(user_id, until[user_id])
+                if user_id in increments and counts[user_id] >= 3:
+                    self._record_block(user_id, until[user_id], counts[user_id])
+        return admissions
+
+    @timed("repo.is_user_blocked")
     async def is_user_blocked(self, user_id: str) -> bool:
-        async with self._session_factory() as session:
-            user = await session.get(User, user_id)
-            if user is None or not user.is_blocked:
-                return False
-            if user.blocked_until:
-                ts = user.blocked_until
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-                if datetime.now(timezone.utc) >= ts:
-                    await self._auto_unblock_user(session, user)
-                    await session.commit()
-                    return False
-            return True
+        """Read-only block check; due blocks are lifted by the sweeper."""
 
+        async with self._read_session_factory() as session:
+            row = (
+                await session.execute(
+                    select(User.is_blocked, User.blocked_until).where(
+                        User.user_id == user_id
+                    )
+                )
+            ).one_or_none()
+        if row is None or not row.is_blocked:
+            return False
+        if _is_due(row.blocked_until, datetime.now(timezone.utc)):
+            self.blocklist.discard(user_id)
+            return False
+        self.blocklist.add(user_id, row.blocked_until)
+        return True
+
+    @timed("repo.unblock_user")
     async def unblock_user(self, user_id: str) -> User:
         async with self._session_factory() as session:
             user = await session.get(User, user_id)
@@ -122,30 +392,207 @@ class UserRepository:
             user.updated_at = datetime.now(timezone.utc)
             await session.commit()
             await session.refresh(user)
+            self._register_user_id(user_id)
+            self.blocklist.discard(user_id)
+            self.audit.emit(AuditEvent("admin_unblock", user_id, violation_count=0))
             assert user is not None
             return user
 
-    async def get_all_user_ids(self) -> Set[str]:
+    @timed("repo.unblock_users")
+    async def unblock_users(
+        self,
+        user_ids: list[str] | None = None,
+        blocked_before: datetime | None = None,
+    ) -> list[str]:
+        """Unblock many users with one ``UPDATE`` and return their IDs.
+
+        ``user_ids`` resets the listed users, like :meth:`unblock_user` does
+        for one; ``blocked_before`` selects blocked users whose blocking
+        strike (``last_violation``) is older than that. Given both, a user
+        must match both. Unknown IDs are ignored.
+        """
+        if user_ids is None and blocked_before is None:
+            raise ValueError("user_ids or blocked_before is required")
+        now = datetime.now(timezone.utc)
+        statement = update(User).values(
+            is_blocked=False, blocked_until=None, violation_count=0, updated_at=now
+        )
+        if user_ids is not None:
+            statement = statement.where(User.user_id.in_(user_ids))
+        if blocked_before is not None:
+            statement = statement.where(
+                User.is_blocked.is_(True), User.last_violation < blocked_before
+            )
         async with self._session_factory() as session:
+            unblocked = list(await session.scalars(statement.returning(User.user_id)))
+            await session.commit()
+        for user_id in unblocked:
+            self.blocklist.discard(user_id)
+            self.audit.emit(AuditEvent("admin_unblock", user_id, violation_count=0))
+        return sorted(unblocked)
+
+    @timed("repo.list_users")
+    async def list_users(
+        self, blocked_only: bool = True, after: str | None = None, limit: int = 100
+    ) -> list[User]:
+        """Return up to ``limit`` users with strikes, ordered by ID after ``after``.
+
+        Keyset pagination: pass the last ID of a page as ``after`` to get the
+        next one. ``blocked_only`` narrows the listing to blocked users.
+        """
+        statement = (
+            select(User)
+            .where(User.violation_count > 0)
+            .order_by(User.user_id)
+            .limit(limit)
+        )
+        if blocked_only:
+            statement = statement.where(User.is_blocked.is_(True))
+        if after is not None:
+            statement = statement.where(User.user_id > after)
+        async with self._read_session_factory() as session:
+            return list(await session.scalars(statement))
+
+    async def iter_users(
+        self, blocked_only: bool = True, page_size: int = 1000
+    ) -> AsyncIterator[User]:
+        """Yield every listed user, reading one keyset page at a time."""
+
+        after: str | None = None
+        while True:
+            page = await self.list_users(blocked_only, after, page_size)
+            for user in page:
+                yield user
+            if len(page) < page_size:
+                return
+            after = page[-1].user_id
+
+    @timed("repo.get_all_user_ids")
+    async def get_all_user_ids(self) -> Set[str]:
+        async with self._read_session_factory() as session:
             result = await session.scalars(select(User.user_id))
-            return set(result.all())
+            user_ids = set(result.all())
+        if self.write_behind is not None:
+            user_ids |= self.write_behind.keys()
+        return user_ids
+
+    @timed("repo.get_user_id_matcher")
+    async def get_user_id_matcher(self) -> UserIdMatcher:
+        """Return the matcher over all user IDs, syncing it when due."""
+
+        return await self.user_ids.get_matcher()
 
+    @timed("repo.user_exists")
     async def user_exists(self, user_id: str) -> bool:
-        async with self._session_factory() as session:
+        if self.write_behind is not None and user_id in self.write_behind:
+            return True
+        async with self._read_session_factory() as session:
             result = await session.get(User, user_id)
             return result is not None
 
-    async def _auto_unblock_user(self, session: AsyncSession, user: User) -> None:
-        user.is_blocked = False
-        user.blocked_until = None
-        user.violation_count = 0
-        user.updated_at = datetime.now(timezone.utc)
+    def _insert_statement(
+        self, session: AsyncSession, user_ids: list[str], now: datetime
+    ) -> Any:
+        bind = session.bind
+        insert = (
+            postgresql.insert
+            if bind is not None and bind.dialect.name == "postgresql"
+            else sqlite.insert
+        )
+        return insert(User).values(
+            [
+                {
+                    "user_id": user_id,
+                    "violation_count": 0,
+                    "is_blocked": False,
+                    "blocked_until": None,
+                    "last_violation": None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for user_id in user_ids
+            ]
+        )
+
+    def _upsert_statement(
+        self, session: AsyncSession, user_ids: list[str], now: datetime
+    ) -> Any:
+        expired = and_(
+            User.is_blocked.is_(True),
+            User.blocked_until.is_not(None),
+            User.blocked_until <= now,
+        )
+        return (
+            self._insert_statement(session, user_ids, now)
+            .on_conflict_do_update(
+                index_elements=[User.user_id],
+                set_={
+                    "is_blocked": case((expired, False), else_=User.is_blocked),
+                    "blocked_until": case((expired, null()), else_=User.blocked_until),
+                    "violation_count": case((expired, 0), else_=User.violation_count),
+                    "updated_at": case((expired, now), else_=User.updated_at),
+                },
+            )
+            .returning(
+                User.user_id,
+                User.violation_count,
+                User.is_blocked,
+                User.blocked_until,
+            )
+        )
+
+    def _strike_statement(self, now: datetime, increment: Any = 1) -> Any:
+        new_count = User.violation_count + increment
+        reaches_limit = new_count >= 3
+        return update(User).values(
+            violation_count=new_count,
+            last_violation=now,
+            updated_at=now,
+            is_blocked=case((reaches_limit, True), else_=User.is_blocked),
+            blocked_until=case(
+                (
+                    reaches_limit,
+                    now + timedelta(minutes=self._settings.block_minutes),
+                ),
+                else_=User.blocked_until,
+            ),
+        )
+
+    def _record_block(
+        self, user_id: str, blocked_until: datetime | None, violation_count: int
+    ) -> None:
+        BLOCKS.inc()
+        self.block_expiry.schedule(user_id, blocked_until)
+        self.audit.emit(
+            AuditEvent(
+                "block",
+                user_id,
+                violation_count=violation_count,
+                blocked_until=blocked_until,
+            )
+        )
+        logger.info(
+            "User '%s' blocked until %s (%d strikes)",
+            user_id,
+            str(blocked_until or ""),
+            violation_count,
+        )
+
+    def _block_expired(self, user_id: str) -> None:
+        self.blocklist.discard(user_id)
+        self.audit.emit(AuditEvent("auto_unblock", user_id, violation_count=0))
+
+    def _register_user_id(self, user_id: str) -> None:
+        self.user_ids.add(user_id)
 
 
-_user_repository = UserRepository()
+_user_repository: UserRepository | None = None
 
 
 def get_user_repository() -> UserRepository:  # noqa: D401
-    """Return singleton UserRepository instance."""
+    """Return singleton UserRepository instance, creating it on first use."""
 
+    global _user_repository
+    if _user_repository is None:
+        _user_repository = UserRepository()
     return _user_repository
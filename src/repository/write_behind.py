@@ -0,0 +1,97 @@
+"""Batched, deferred writes for bookkeeping that does not drive decisions."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from itertools import islice
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Coalesce keyed writes and flush them in batches from a background task.
+
+    Keys added while a write for them is already pending are merged. A flush
+    runs every ``interval`` seconds, or as soon as ``max_batch`` keys are
+    pending, and hands at most ``max_batch`` keys to ``flush`` at a time. A
+    batch whose flush fails or is cancelled is put back, so nothing is lost
+    until :meth:`aclose` has drained the queue.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[str]], Awaitable[None]],
+        interval: float,
+        max_batch: int,
+    ) -> None:
+        self._flush = flush
+        self._interval = interval
+        self._max_batch = max_batch
+        self._pending: dict[str, None] = {}
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pending
+
+    def keys(self) -> set[str]:
+        return set(self._pending)
+
+    def add(self, key: str) -> None:
+        """Queue a write for ``key``; must be called from the event loop."""
+
+        self._pending[key] = None
+        self._ensure_running()
+        if len(self._pending) >= self._max_batch and self._wake is not None:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Write everything pending now, batch by batch."""
+
+        while self._pending:
+            batch = list(islice(self._pending, self._max_batch))
+            for key in batch:
+                del self._pending[key]
+            try:
+                await self._flush(batch)
+            except BaseException:
+                # Keys queued meanwhile stay; the failed batch goes back first.
+                self._pending = {**dict.fromkeys(batch), **self._pending}
+                raise
+
+    async def aclose(self) -> None:
+        """Stop the background task and write whatever is still pending."""
+
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self.flush()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run(self._wake))
+
+    async def _run(self, wake: asyncio.Event) -> None:
+        while True:
+            # asyncio.timeout, unlike wait_for, never swallows a cancellation
+            # that races with the event being set.
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self._interval):
+                    await wake.wait()
+            wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    "Write-behind flush failed; %d writes pending", len(self)
+                )
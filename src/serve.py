@@ -0,0 +1,150 @@
+"""Production launcher for one or more uvicorn workers::
+
+    python -m src.serve --host 0.0.0.0 --port 8000 --workers 4 --migrate
+
+``--workers`` defaults to ``WEB_CONCURRENCY``. Each worker imports
+``src.main:app`` and builds its own engine, repository and OpenAI client in
+the lifespan handler, so nothing is shared across processes. ``--migrate``
+brings the schema up to date once, in this process, before any worker starts;
+deployments with several replicas should run ``python -m src.db.migrate`` as
+a separate step instead. Importing the app has no side effects, so other
+pre-fork servers (e.g. gunicorn with ``uvicorn.workers.UvicornWorker``) work
+as well.
+
+On the first ``SIGTERM`` or ``SIGINT`` a worker keeps its port open for up
+to ``SHUTDOWN_DRAIN_SECONDS`` while ``/health/ready`` reports draining, new
+``/chat`` requests get **503** and running ones finish; only then does
+uvicorn stop accepting connections and shut the app down.
+
+All workers share one port, so ``/metrics`` and the admin status endpoints
+answer for whichever worker accepts the connection; run one worker per
+container when those numbers need to be complete.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import socket
+import sys
+from types import FrameType
+
+import uvicorn
+from uvicorn.importer import import_from_string
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import Multiprocess
+
+from .core.config import get_settings
+from .core.lifecycle import Lifecycle
+
+logger = logging.getLogger(__name__)
+
+# How long uvicorn itself waits for requests still open after draining, e.g.
+# chats that outlived SHUTDOWN_DRAIN_SECONDS, before cancelling them.
+_GRACE_SECONDS = 5
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains chats before it stops accepting connections.
+
+    Plain uvicorn closes its listening socket as soon as a signal arrives, so
+    a load balancer never sees the worker as draining. Here the first signal
+    puts the app's :class:`~.core.lifecycle.Lifecycle` into draining and
+    waits up to ``drain_seconds`` for running chats; uvicorn's own shutdown
+    starts after that. A second signal skips the wait.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: float) -> None:
+        super().__init__(config)
+        self._drain_seconds = drain_seconds
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._exit_requested = False
+        self._drain_task: asyncio.Task[None] | None = None
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        self._loop = asyncio.get_running_loop()
+        await super().startup(sockets)
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if self._loop is None or self._exit_requested or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        # Runs in the signal handler; start draining from the event loop.
+        self._exit_requested = True
+        self._loop.call_soon_threadsafe(self._start_draining, sig)
+
+    def _lifecycle(self) -> Lifecycle | None:
+        app = self.config.app
+        if isinstance(app, str):
+            app = import_from_string(app)
+        return getattr(getattr(app, "state", None), "lifecycle", None)
+
+    def _start_draining(self, sig: int) -> None:
+        lifecycle = self._lifecycle()
+        if lifecycle is None:
+            super().handle_exit(sig, None)
+            return
+        logger.info("Draining for up to %s s", self._drain_seconds)
+        self._drain_task = asyncio.create_task(self._drain(lifecycle, sig))
+
+    async def _drain(self, lifecycle: Lifecycle, sig: int) -> None:
+        remaining = await lifecycle.drain(self._drain_seconds)
+        if remaining:
+            logger.warning("Shutting down with %d chats still running", remaining)
+        if not self.should_exit:
+            super().handle_exit(sig, None)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--migrate", action="store_true", help="create missing tables first"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    workers = args.workers or settings.web_concurrency
+    if workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if workers > 1 and settings.metrics_enabled:
+        logger.warning(
+            "%d workers share port %d: /metrics and admin status endpoints "
+            "report whichever worker answers, not totals",
+            workers,
+            args.port,
+        )
+
+    if args.migrate:
+        from .db.migrate import migrate
+
+        asyncio.run(migrate())
+
+    config = uvicorn.Config(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+        timeout_graceful_shutdown=_GRACE_SECONDS,
+    )
+    # uvicorn.run() would build a plain Server; mirror its worker handling.
+    server = DrainingServer(config, drain_seconds=settings.shutdown_drain_seconds)
+    if workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+        if not server.started:
+            sys.exit(STARTUP_FAILURE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Circuit breaker guarding calls to the OpenAI API."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from enum import Enum
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"OpenAI circuit open, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding window of recent calls.
+
+    While closed, the outcome of each call is kept in a window of
+    ``window_size`` calls; once at least ``min_calls`` are recorded and the
+    share of failures reaches ``failure_rate`` the circuit opens. An open
+    circuit rejects calls for ``open_seconds``, then lets a single probe
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+    ) -> None:
+        self._failure_rate = failure_rate
+        self._min_calls = min_calls
+        self._open_seconds = open_seconds
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        self.state = CircuitState.CLOSED
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` if the call must not be attempted."""
+
+        now = time.monotonic()
+        if self.state is CircuitState.OPEN:
+            remaining = self._opened_at + self._open_seconds - now
+            if remaining > 0:
+                raise CircuitOpenError(max(1, math.ceil(remaining)))
+            self.state = CircuitState.HALF_OPEN
+            self._probe_started = None
+        if self.state is CircuitState.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) expires.
+            if (
+                self._probe_started is not None
+                and now - self._probe_started < self._open_seconds
+            ):
+                raise CircuitOpenError(1)
+            self._probe_started = now
+
+    def abandon_call(self) -> None:
+        """Forget a call admitted by :meth:`before_call` that never started."""
+
+        if self.state is CircuitState.HALF_OPEN:
+            self._probe_started = None
+
+    def record_success(self) -> None:
+        if self.state is CircuitState.OPEN:
+            return
+        if self.state is CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self._outcomes.clear()
+            return
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self.state is CircuitState.OPEN:
+            return
+        if self.state is CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        calls = len(self._outcomes)
+        failures = calls - sum(self._outcomes)
+        if calls >= self._min_calls and failures / calls >= self._failure_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
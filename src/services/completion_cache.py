@@ -0,0 +1,141 @@
+"""Storage backends for cached OpenAI completions."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+
+class CompletionCacheBackend(Protocol):
+    """Key/value store with TTL and size-bounded LRU eviction."""
+
+    async def get(self, key: str) -> str | None:  # noqa: D401
+        """Return the cached value, or ``None`` on a miss or expired entry."""
+        ...
+
+    async def set(self, key: str, value: str) -> None:  # noqa: D401
+        """Store ``value`` under ``key``, evicting old entries if needed."""
+        ...
+
+    def close(self) -> None:
+        """Release the storage; the cache is not used afterwards."""
+        ...
+
+
+class MemoryCompletionCache:
+    """In-process LRU cache bounded by the total size of cached values."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str, int]] = OrderedDict()
+        self.size_bytes = 0
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value, size = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            self.size_bytes -= size
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self._max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size_bytes -= old[2]
+        self._entries[key] = (time.monotonic() + self._ttl, value, size)
+        self.size_bytes += size
+        while self.size_bytes > self._max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted
+
+    def close(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+
+class SqliteCompletionCache:
+    """Disk-backed LRU cache in a local SQLite file that survives restarts.
+
+    SQLite calls run in a worker thread so disk I/O never blocks the event
+    loop; a single connection is shared and guarded by a lock.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._lock = asyncio.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_completions_last_used"
+            " ON completions (last_used)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    async def get(self, key: str) -> str | None:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value)
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM completions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if now >= row[1]:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute(
+            "UPDATE completions SET last_used = ? WHERE key = ?", (now, key)
+        )
+        self._conn.commit()
+        return str(row[0])
+
+    def _set(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self._max_bytes:
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self._ttl, now),
+            )
+            self._conn.execute("DELETE FROM completions WHERE expires_at <= ?", (now,))
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()[0]
+            if total > self._max_bytes:
+                # Drop least recently used rows until the total fits again.
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS kept"
+                    "  FROM completions) WHERE kept > ?)",
+                    (self._max_bytes,),
+                )
@@ -0,0 +1,177 @@
+"""Adaptive concurrency limiting and load shedding for upstream calls."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+import httpx
+
+
+class UpstreamOverloaded(Exception):
+    """Raised when a call is shed instead of waiting for a concurrency slot."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Upstream overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether ``error``, or an error it was raised from, signals overload.
+
+    Only timeouts, **429** and **5xx** count; a request the upstream rejected
+    on its merits says nothing about how loaded it is.
+    """
+
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(cause, httpx.TimeoutException):
+            return True
+        if isinstance(cause, httpx.HTTPStatusError):
+            status = cause.response.status_code
+            return status == 429 or status >= 500
+        cause = cause.__cause__
+    return False
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Point-in-time view of the limiter, used by the admin API."""
+
+    limit: int
+    in_flight: int
+    queued: int
+    shed: int
+    latency_seconds: float
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit with a bounded, deadline-aware wait queue.
+
+    Every call that finishes within ``latency_target`` seconds grows the limit
+    by ``1 / limit`` (about +1 per window of calls); an overload failure (see
+    :func:`is_overload`) or a slow call multiplies it by ``backoff``, while
+    other failures leave it alone. Callers beyond the limit wait in FIFO order;
+    when ``max_queue`` callers are already waiting, or a caller has waited
+    ``queue_timeout`` seconds, it is shed with :class:`UpstreamOverloaded`.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        latency_target: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self._limit = float(initial_limit)
+        self._min = min_limit
+        self._max = max_limit
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._latency_target = latency_target
+        self._backoff = backoff
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._latency = 0.0
+        self.in_flight = 0
+        self.shed = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self._min, int(self._limit))
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            limit=self.limit,
+            in_flight=self.in_flight,
+            queued=len(self._waiters),
+            shed=self.shed,
+            latency_seconds=self._latency,
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Callable[[], None]]:
+        """Hold a concurrency slot for the duration of the block.
+
+        The latency sample is the time until the block calls the function it
+        is given, e.g. on the first chunk of a stream, or else until it ends.
+        """
+
+        await self._enter()
+        start = time.monotonic()
+        recorded = False
+
+        def responded() -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                self._record(time.monotonic() - start, ok=True)
+
+        try:
+            yield responded
+        except Exception as e:
+            if not recorded and is_overload(e):
+                recorded = True
+                self._record(time.monotonic() - start, ok=False)
+            raise
+        else:
+            responded()
+        finally:
+            self._release()
+
+    async def _enter(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self._max_queue:
+            self._shed()
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self._queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            self._shed()
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as we gave up; pass it on.
+            self._release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _shed(self) -> None:
+        self.shed += 1
+        raise UpstreamOverloaded(max(1, math.ceil(self._latency)))
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _record(self, latency: float, ok: bool) -> None:
+        self._latency = (
+            latency if not self._latency else (0.9 * self._latency + 0.1 * latency)
+        )
+        if ok and latency <= self._latency_target:
+            self._limit = min(self._max, self._limit + 1 / self._limit)
+        else:
+            self._limit = max(self._min, self._limit * self._backoff)
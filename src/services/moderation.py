@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
-from ..repository.user_repository import get_user_repository, UserRepository
+from ..core.metrics import STAGE_SECONDS, VIOLATIONS
+from ..core.timing import timed
+from ..repository.audit_log import AuditEvent, excerpt
+from ..repository.user_repository import Admission, get_user_repository, UserRepository
+
+_BLOCK_CHECK = STAGE_SECONDS.labels("block_check")
+_CONTENT_CHECK = STAGE_SECONDS.labels("content_check")
+_USER_UPSERT = STAGE_SECONDS.labels("user_upsert")
+_BATCH_CONTENT_CHECK = STAGE_SECONDS.labels("batch_content_check")
+_BATCH_USER_UPSERT = STAGE_SECONDS.labels("batch_user_upsert")
+_VIOLATIONS = VIOLATIONS.labels()
 
 
 class ModerationService:
@@ -11,26 +21,81 @@ class ModerationService:
     def __init__(self, store: UserRepository | None = None) -> None:
         self._user_store = store or get_user_repository()
 
+    @timed("moderation.content_check")
     async def check_content_violation(self, message: str, sender_id: str) -> bool:
-        all_user_ids = await self._user_store.get_all_user_ids()
-        other_user_ids = all_user_ids - {sender_id}
-        message_lower = message.lower()
-        for user_id in other_user_ids:
-            if user_id.lower() in message_lower:
-                return True
-        return False
+        matcher = await self._user_store.get_user_id_matcher()
+        return matcher.find(message, exclude=sender_id) is not None
 
+    @timed("moderation")
     async def process_message(self, message: str, user_id: str) -> tuple[bool, bool]:
-        if await self._user_store.is_user_blocked(user_id):
+        # Known-blocked users are rejected without touching the database.
+        with _BLOCK_CHECK.time():
+            known_blocked = self._user_store.blocklist.contains(user_id)
+        if known_blocked:
             return False, True
 
-        has_violation = await self.check_content_violation(message, user_id)
+        with _CONTENT_CHECK.time():
+            has_violation = await self.check_content_violation(message, user_id)
+        with _USER_UPSERT.time():
+            admission = await self._user_store.admit(user_id, violation=has_violation)
+        if admission.violation_recorded:
+            _VIOLATIONS.inc()
+            self._audit_violation(admission, message)
+        return self._decision(admission)
+
+    @timed("moderation")
+    async def process_batch(
+        self, items: list[tuple[str, str]]
+    ) -> list[tuple[bool, bool]]:
+        """Moderate ``(message, user_id)`` pairs against one registry snapshot.
+
+        Returns ``(has_violation, is_blocked)`` per item, in order, with all
+        bookkeeping done in a single repository transaction.
+        """
+        with _BATCH_CONTENT_CHECK.time():
+            matcher = await self._user_store.get_user_id_matcher()
+            decisions: list[tuple[bool, bool] | None] = []
+            pending: list[tuple[str, bool]] = []
+            messages: list[str] = []
+            for message, user_id in items:
+                if self._user_store.blocklist.contains(user_id):
+                    decisions.append((False, True))
+                    continue
+                decisions.append(None)
+                pending.append(
+                    (user_id, matcher.find(message, exclude=user_id) is not None)
+                )
+                messages.append(message)
+
+        with _BATCH_USER_UPSERT.time():
+            recorded = await self._user_store.admit_many(pending)
+        _VIOLATIONS.inc(sum(a.violation_recorded for a in recorded))
+        for admission, message in zip(recorded, messages):
+            if admission.violation_recorded:
+                self._audit_violation(admission, message)
+        admissions = iter(recorded)
+        return [decision or self._decision(next(admissions)) for decision in decisions]
+
+    def _audit_violation(self, admission: Admission, message: str) -> None:
+        audit = self._user_store.audit
+        if audit.enabled:
+            audit.emit(
+                AuditEvent(
+                    "violation",
+                    admission.user_id,
+                    violation_count=admission.violation_count,
+                    message=excerpt(message),
+                )
+            )
+
+    @staticmethod
+    def _decision(admission: Admission) -> tuple[bool, bool]:
+        if admission.was_blocked:
+            return False, True
 
-        if has_violation:
-            user_status = await self._user_store.add_violation(user_id)
-            violation_count = int(getattr(user_status, "violation_count", 0))
-            status_blocked = getattr(user_status, "is_blocked", False)
-            if status_blocked and violation_count != 3:
+        if admission.violation_recorded:
+            violation_count = admission.violation_count
+            if admission.is_blocked and violation_count != 3:
                 return True, True
             if violation_count < 3:
                 return True, False
@@ -3,11 +3,82 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Protocol, Any
+from typing import AsyncGenerator, AsyncIterator, Protocol, Any
 import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
 import httpx
 
 from ..core.config import get_settings
+from ..core.metrics import (
+    COALESCED_REQUESTS,
+    COMPLETION_CACHE_REQUESTS,
+    STAGE_SECONDS,
+    UPSTREAM_RESPONSES,
+    UPSTREAM_RETRIES,
+)
+from ..core.timing import timed
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limiter import AdaptiveConcurrencyLimiter, UpstreamOverloaded
+from .upstream_pool import UpstreamBackend, UpstreamPool
+from .completion_cache import (
+    CompletionCacheBackend,
+    MemoryCompletionCache,
+    SqliteCompletionCache,
+)
+
+# Statuses worth retrying: timeouts, rate limiting and server-side failures.
+RETRYABLE_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+_ATTEMPT = STAGE_SECONDS.labels("upstream_attempt")
+_RETRY_BACKOFF = STAGE_SECONDS.labels("retry_backoff")
+_RETRIES = UPSTREAM_RETRIES.labels()
+_CACHE_HITS = COMPLETION_CACHE_REQUESTS.labels("hit")
+_CACHE_MISSES = COMPLETION_CACHE_REQUESTS.labels("miss")
+_COALESCED = COALESCED_REQUESTS.labels()
+
+CHAT_MODEL = "gpt-3.5-turbo"
+MAX_TOKENS = 150
+TEMPERATURE = 0.7
+
+
+def build_chat_payload(message: str) -> dict[str, Any]:
+    """Return the ``/chat/completions`` request body for ``message``."""
+
+    return {
+        "model": CHAT_MODEL,
+        "messages": [{"role": "user", "content": message}],
+        "max_tokens": MAX_TOKENS,
+        "temperature": TEMPERATURE,
+    }
+
+
+def payload_key(message: str) -> str:
+    """Return a stable hash of the full request payload for ``message``."""
+
+    body = json.dumps(build_chat_payload(message), sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
 
 
 # Public protocol for both real and mock clients – keeps static type checkers
@@ -21,22 +92,73 @@ class OpenAIClientProtocol(Protocol):
         """Return the assistant response as plain text."""
         ...
 
+    def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """Yield the assistant response as it is generated."""
+        ...
+
+    async def warm_up(self, connections: int) -> None:
+        """Open up to ``connections`` upstream connections ahead of traffic."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release connections and other resources."""
+        ...
+
 
 class OpenAIClient(OpenAIClientProtocol):
     """Async client for OpenAI API calls."""
 
-    def __init__(self) -> None:
-        """Initialize the OpenAI client."""
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        """Initialize the OpenAI client.
+
+        Args:
+            transport: Optional httpx transport shared by all backends, used
+                to point the client at local stand-in servers in tests
+        """
         self._settings = get_settings()
-        self._base_url = "https://api.openai.com/v1"
         self._timeout = self._settings.openai_timeout
         self._retries = self._settings.openai_retries
-        self._client = httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout)
+        self._retry_budget = self._settings.openai_retry_budget
+        self._retry_backoff = self._settings.openai_retry_backoff
+        self._breaker = CircuitBreaker(
+            failure_rate=self._settings.openai_circuit_failure_rate,
+            window_size=self._settings.openai_circuit_window,
+            min_calls=self._settings.openai_circuit_min_calls,
+            open_seconds=self._settings.openai_circuit_open_seconds,
+        )
+        self._pool = UpstreamPool(
+            self._settings.upstream_backends(),
+            timeout=self._timeout,
+            max_connections=self._settings.openai_max_connections,
+            max_keepalive=self._settings.openai_max_keepalive,
+            http2=self._settings.openai_http2,
+            failure_threshold=self._settings.openai_backend_failure_threshold,
+            cooldown_seconds=self._settings.openai_backend_cooldown_seconds,
+            transport=transport,
+        )
 
     async def aclose(self) -> None:
-        """Close the underlying HTTP client."""
-        await self._client.aclose()
+        """Close the underlying HTTP clients."""
+        await self._pool.aclose()
+
+    async def warm_up(self, connections: int) -> None:
+        """Open keep-alive connections to every backend."""
+        await self._pool.warm_up(connections)
 
+    @staticmethod
+    def _headers(backend: UpstreamBackend) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {backend.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _estimate_tokens(message: str) -> int:
+        """Rough prompt size (~4 characters per token) plus the completion cap."""
+
+        return len(message) // 4 + MAX_TOKENS
+
+    @timed("openai")
     async def chat_completion(self, message: str) -> str:
         """
         Send chat completion request to OpenAI.
@@ -44,43 +166,301 @@ class OpenAIClient(OpenAIClientProtocol):
         Args:
             message: User message to send to OpenAI
 
+        Only transport errors and retryable statuses are retried, honouring
+        ``Retry-After`` or backing off with jitter, within a total per-request
+        retry budget.
+
         Returns:
             OpenAI response content
 
         Raises:
             httpx.HTTPError: If API request fails
+            CircuitOpenError: If recent failures have opened the circuit
         """
-        headers = {
-            "Authorization": f"Bearer {self._settings.openai_api_key}",
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "model": "gpt-3.5-turbo",
-            "messages": [{"role": "user", "content": message}],
-            "max_tokens": 150,
-            "temperature": 0.7,
-        }
+        payload = build_chat_payload(message)
+        estimate = self._estimate_tokens(message)
+        deadline = time.monotonic() + self._retry_budget
 
         for attempt in range(1, self._retries + 1):
+            backend = self._admit(estimate)
+            healthy: bool | None = None
+            used = estimate
+            retry_after: float | None = None
             try:
-                response = await self._client.post(
-                    "/chat/completions", headers=headers, json=payload
-                )
+                with _ATTEMPT.time():
+                    response = await backend.client.post(
+                        "/chat/completions",
+                        headers=self._headers(backend),
+                        json=payload,
+                    )
+                UPSTREAM_RESPONSES.labels(str(response.status_code)).inc()
+                if response.status_code in RETRYABLE_STATUSES:
+                    retry_after = _retry_after(response)
                 response.raise_for_status()
-
-                data: dict[str, Any] = response.json()
-                return str(data["choices"][0]["message"]["content"]).strip()
-
-            except httpx.HTTPError as e:
-                if attempt == self._retries:
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRYABLE_STATUSES:
+                    # The upstream is up; the request itself was rejected.
+                    healthy = True
+                    self._breaker.record_success()
                     raise httpx.HTTPError(f"OpenAI API request failed: {e}") from e
-                await asyncio.sleep(2 ** (attempt - 1))
-            except (KeyError, IndexError) as e:
-                raise ValueError(f"Unexpected OpenAI response format: {e}") from e
+                healthy = False
+                error: httpx.HTTPError = e
+            except httpx.TransportError as e:
+                UPSTREAM_RESPONSES.labels("error").inc()
+                healthy = False
+                error = e
+            else:
+                healthy = True
+                self._breaker.record_success()
+                try:
+                    data: dict[str, Any] = response.json()
+                    used = int(data.get("usage", {}).get("total_tokens", estimate))
+                    return str(data["choices"][0]["message"]["content"]).strip()
+                except (KeyError, IndexError) as e:
+                    raise ValueError(f"Unexpected OpenAI response format: {e}") from e
+            finally:
+                self._pool.release(backend, healthy, used - estimate)
+
+            self._breaker.record_failure()
+            delay = self._retry_delay(attempt, retry_after)
+            if attempt == self._retries or time.monotonic() + delay > deadline:
+                raise httpx.HTTPError(f"OpenAI API request failed: {error}") from error
+            _RETRIES.inc()
+            with _RETRY_BACKOFF.time():
+                await asyncio.sleep(delay)
 
         raise httpx.HTTPError("OpenAI API request failed")
 
+    def _admit(self, estimate: int) -> UpstreamBackend:
+        """Pass the circuit breaker and reserve a backend for one attempt."""
+
+        self._breaker.before_call()
+        try:
+            return self._pool.acquire(estimate)
+        except UpstreamOverloaded:
+            # No request goes out, so a half-open probe slot must not be held.
+            self._breaker.abandon_call()
+            raise
+
+    def _retry_delay(self, attempt: int, retry_after: float | None) -> float:
+        """Honour ``Retry-After`` or back off exponentially with full jitter."""
+
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, self._retry_backoff * 2 ** (attempt - 1))
+
+    async def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """
+        Stream a chat completion from OpenAI.
+
+        Server-sent event lines are parsed as they arrive, so the first token
+        reaches the caller without waiting for the full body. Streams are not
+        retried once started.
+
+        Args:
+            message: User message to send to OpenAI
+
+        Yields:
+            Content deltas in order
+
+        Raises:
+            httpx.HTTPError: If API request fails
+            ValueError: If a stream event cannot be parsed
+        """
+        payload = {**build_chat_payload(message), "stream": True}
+        estimate = self._estimate_tokens(message)
+
+        backend = self._admit(estimate)
+        healthy: bool | None = None
+        try:
+            async with backend.client.stream(
+                "POST",
+                "/chat/completions",
+                headers=self._headers(backend),
+                json=payload,
+            ) as response:
+                UPSTREAM_RESPONSES.labels(str(response.status_code)).inc()
+                response.raise_for_status()
+                healthy = True
+                self._breaker.record_success()
+                async for delta in self._stream_deltas(response):
+                    yield delta
+        except httpx.HTTPStatusError as e:
+            healthy = e.response.status_code not in RETRYABLE_STATUSES
+            if healthy:
+                self._breaker.record_success()
+            else:
+                self._breaker.record_failure()
+            raise
+        except httpx.TransportError:
+            UPSTREAM_RESPONSES.labels("error").inc()
+            healthy = False
+            self._breaker.record_failure()
+            raise
+        finally:
+            self._pool.release(backend, healthy)
+
+    @staticmethod
+    async def _stream_deltas(response: httpx.Response) -> AsyncIterator[str]:
+        """Parse ``data:`` lines of an SSE body into content deltas."""
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                return
+            try:
+                delta = json.loads(data)["choices"][0]["delta"]
+            except (KeyError, IndexError, json.JSONDecodeError) as e:
+                raise ValueError(f"Unexpected OpenAI stream event: {e}") from e
+            content = delta.get("content")
+            if content:
+                yield str(content)
+
+
+class LimitedOpenAIClient:
+    """Run upstream calls under an :class:`AdaptiveConcurrencyLimiter`.
+
+    Calls beyond the current limit wait in the limiter's queue or are shed
+    with :class:`~.concurrency_limiter.UpstreamOverloaded`. A stream holds its
+    slot until it is fully consumed, but its latency is measured to the first
+    delta.
+    """
+
+    def __init__(
+        self, client: OpenAIClientProtocol, limiter: AdaptiveConcurrencyLimiter
+    ) -> None:
+        self._client = client
+        self._limiter = limiter
+
+    async def chat_completion(self, message: str) -> str:  # noqa: D401
+        """Return the upstream response once a slot is available."""
+
+        async with self._limiter.acquire():
+            return await self._client.chat_completion(message)
+
+    async def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """Stream the upstream response once a slot is available."""
+
+        async with self._limiter.acquire() as responded:
+            async for delta in self._client.chat_completion_stream(message):
+                responded()
+                yield delta
+
+    async def warm_up(self, connections: int) -> None:
+        await self._client.warm_up(connections)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class CachedOpenAIClient:
+    """Serve repeated prompts from a completion cache.
+
+    Wraps any :class:`OpenAIClientProtocol` implementation. The cache key is a
+    hash of the full request payload, so changing the model or sampling
+    parameters never returns a stale answer. Failures are not cached.
+    """
+
+    def __init__(
+        self, client: OpenAIClientProtocol, backend: CompletionCacheBackend
+    ) -> None:
+        self._client = client
+        self._backend = backend
+
+    async def chat_completion(self, message: str) -> str:  # noqa: D401
+        """Return a cached response or fetch and cache a fresh one."""
+
+        key = payload_key(message)
+        cached = await self._backend.get(key)
+        if cached is not None:
+            _CACHE_HITS.inc()
+            return cached
+        _CACHE_MISSES.inc()
+        response = await self._client.chat_completion(message)
+        await self._backend.set(key, response)
+        return response
+
+    async def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """Replay a cached response or stream and cache a fresh one."""
+
+        key = payload_key(message)
+        cached = await self._backend.get(key)
+        if cached is not None:
+            _CACHE_HITS.inc()
+            yield cached
+            return
+        _CACHE_MISSES.inc()
+        parts: list[str] = []
+        async for delta in self._client.chat_completion_stream(message):
+            parts.append(delta)
+            yield delta
+        await self._backend.set(key, "".join(parts).strip())
+
+    async def warm_up(self, connections: int) -> None:
+        await self._client.warm_up(connections)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        self._backend.close()
+
+
+class CoalescingOpenAIClient:
+    """Share one upstream call between identical concurrent requests.
+
+    The first caller for a payload starts the upstream request as a separate
+    task; callers arriving while it is in flight wait on the same task and get
+    its result or exception. A cancelled caller only stops waiting; the task is
+    cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self, client: OpenAIClientProtocol) -> None:
+        self._client = client
+        self._in_flight: dict[str, tuple[asyncio.Task[str], list[int]]] = {}
+
+    def _forget(self, key: str, flight: tuple[asyncio.Task[str], list[int]]) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    async def chat_completion(self, message: str) -> str:  # noqa: D401
+        """Return the shared upstream response for ``message``."""
+
+        key = payload_key(message)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            task = asyncio.create_task(self._client.chat_completion(message))
+            flight = (task, [0])
+            self._in_flight[key] = flight
+            task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            _COALESCED.inc()
+
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                # Unlist the task first so a caller arriving before the
+                # cancellation lands starts a fresh request.
+                self._forget(key, flight)
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """Streams are per caller and bypass coalescing."""
+
+        return self._client.chat_completion_stream(message)
+
+    async def warm_up(self, connections: int) -> None:
+        await self._client.warm_up(connections)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
 
 # ---------------------------------------------------------------------------
 # Mock implementation — used during development/testing to avoid real API calls
@@ -95,11 +475,50 @@ class MockOpenAIClient:
     making real OpenAI requests would be expensive.
     """
 
+    def __init__(self, token_delay: float = 0.0) -> None:
+        self._token_delay = token_delay
+
+    @timed("openai")
     async def chat_completion(self, message: str) -> str:  # noqa: D401
         """Return a deterministic mock response without external calls."""
 
+        if self._token_delay:
+            await asyncio.sleep(self._token_delay * len(self._tokens(message)))
         return f"[MOCK] Echo: {message}"
 
+    async def chat_completion_stream(self, message: str) -> AsyncGenerator[str, None]:
+        """Yield the mock response word by word, ``token_delay`` apart."""
+
+        for token in self._tokens(message):
+            if self._token_delay:
+                await asyncio.sleep(self._token_delay)
+            yield token
+
+    async def warm_up(self, connections: int) -> None:
+        """Nothing to connect to."""
+
+    async def aclose(self) -> None:
+        """Nothing to release."""
+
+    @staticmethod
+    def _tokens(message: str) -> list[str]:
+        return re.findall(r"\S+\s*", f"[MOCK] Echo: {message}")
+
+
+@lru_cache(maxsize=1)
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    """Return the process-wide limiter for upstream OpenAI calls."""
+
+    settings = get_settings()
+    return AdaptiveConcurrencyLimiter(
+        initial_limit=settings.openai_concurrency_initial,
+        min_limit=settings.openai_concurrency_min,
+        max_limit=settings.openai_concurrency_max,
+        max_queue=settings.openai_queue_size,
+        queue_timeout=settings.openai_queue_timeout,
+        latency_target=settings.openai_latency_target,
+    )
+
 
 @lru_cache(maxsize=1)
 def get_openai_client() -> OpenAIClientProtocol:  # noqa: D401
@@ -118,8 +537,30 @@ def get_openai_client() -> OpenAIClientProtocol:  # noqa: D401
 
     settings = get_settings()
 
+    client: OpenAIClientProtocol
     # The attribute is added to ``Settings`` in ``core.config``.
     if getattr(settings, "use_mock_openai", False):  # pragma: no cover
-        return MockOpenAIClient()
-
-    return OpenAIClient()
+        client = MockOpenAIClient(settings.mock_openai_token_delay)
+    else:
+        client = OpenAIClient()
+
+    client = LimitedOpenAIClient(client, get_concurrency_limiter())
+
+    if settings.openai_coalesce:
+        client = CoalescingOpenAIClient(client)
+
+    backend: CompletionCacheBackend
+    if settings.openai_cache == "memory":
+        backend = MemoryCompletionCache(
+            settings.openai_cache_max_bytes, settings.openai_cache_ttl_seconds
+        )
+    elif settings.openai_cache == "disk":
+        backend = SqliteCompletionCache(
+            settings.openai_cache_path,
+            settings.openai_cache_max_bytes,
+            settings.openai_cache_ttl_seconds,
+        )
+    else:
+        return client
+
+    return CachedOpenAIClient(client, backend)
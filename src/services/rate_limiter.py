@@ -0,0 +1,128 @@
+"""Per-user token-bucket rate limiting for chat requests."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Protocol
+
+from ..core.config import get_settings
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a user has no request budget left."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Rate limit exceeded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def retry_after(missing: float, per_minute: int) -> int:
+    """Whole seconds until ``missing`` tokens have been refilled."""
+
+    if per_minute <= 0:
+        return 60
+    return max(1, math.ceil(missing * 60 / per_minute))
+
+
+class RateLimiter(Protocol):
+    """Contract shared by the in-memory and database-backed limiters."""
+
+    async def acquire(self, user_id: str, cost: int = 1) -> None:  # noqa: D401
+        """Take ``cost`` tokens or raise :class:`RateLimitExceeded`."""
+        ...
+
+    async def acquire_up_to(self, user_id: str, cost: int) -> tuple[int, int]:
+        """Take as many of ``cost`` tokens as are available.
+
+        Returns how many were taken and, if that is fewer than ``cost``, the
+        whole seconds until the next token (``0`` otherwise).
+        """
+        ...
+
+    async def set_override(
+        self, user_id: str, per_minute: int, burst: int
+    ) -> None:  # noqa: D401
+        """Use a user-specific rate instead of the global one."""
+        ...
+
+    async def clear_override(self, user_id: str) -> None:  # noqa: D401
+        """Return the user to the global rate."""
+        ...
+
+
+class MemoryRateLimiter:
+    """Token buckets held in process memory, for single-process deployments.
+
+    Buckets are kept for at most ``max_users`` users (least recently seen are
+    dropped, which simply refills them). ``per_minute <= 0`` disables limiting
+    for users without an override.
+    """
+
+    def __init__(self, per_minute: int, burst: int, max_users: int = 100_000) -> None:
+        self._per_minute = per_minute
+        self._burst = burst
+        self._max_users = max_users
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._overrides: dict[str, tuple[int, int]] = {}
+
+    async def acquire(self, user_id: str, cost: int = 1) -> None:
+        per_minute, tokens, now = self._refill(user_id)
+        if per_minute <= 0:
+            return
+        allowed = tokens >= cost
+        self._store(user_id, tokens - cost if allowed else tokens, now)
+        if not allowed:
+            raise RateLimitExceeded(retry_after(cost - tokens, per_minute))
+
+    async def acquire_up_to(self, user_id: str, cost: int) -> tuple[int, int]:
+        per_minute, tokens, now = self._refill(user_id)
+        if per_minute <= 0:
+            return cost, 0
+        taken = min(cost, math.floor(tokens))
+        self._store(user_id, tokens - taken, now)
+        if taken == cost:
+            return cost, 0
+        return taken, retry_after(1 - (tokens - taken), per_minute)
+
+    def _refill(self, user_id: str) -> tuple[int, float, float]:
+        """The user's rate, the tokens in their bucket and the current time."""
+
+        per_minute, burst = self._overrides.get(
+            user_id, (self._per_minute, self._burst)
+        )
+        now = time.monotonic()
+        if per_minute <= 0:
+            return per_minute, 0.0, now
+        tokens, updated = self._buckets.pop(user_id, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * per_minute / 60)
+        return per_minute, tokens, now
+
+    def _store(self, user_id: str, tokens: float, now: float) -> None:
+        self._buckets[user_id] = (tokens, now)
+        if len(self._buckets) > self._max_users:
+            self._buckets.popitem(last=False)
+
+    async def set_override(self, user_id: str, per_minute: int, burst: int) -> None:
+        self._overrides[user_id] = (per_minute, burst)
+        self._buckets.pop(user_id, None)
+
+    async def clear_override(self, user_id: str) -> None:
+        self._overrides.pop(user_id, None)
+        self._buckets.pop(user_id, None)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Return the configured per-user rate limiter."""
+
+    settings = get_settings()
+    if settings.rate_limit_backend == "database":
+        from ..repository.rate_limit_repository import DatabaseRateLimiter
+
+        return DatabaseRateLimiter(
+            per_minute=settings.rate_limit_per_minute, burst=settings.rate_limit_burst
+        )
+    return MemoryRateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst)
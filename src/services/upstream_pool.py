@@ -0,0 +1,192 @@
+"""Pool of OpenAI-compatible backends with per-key rate budgets."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+
+import httpx
+
+from ..core.config import OpenAIBackend
+from .concurrency_limiter import UpstreamOverloaded
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    ``per_minute=None`` means unlimited. The level may go negative when a
+    request turns out to cost more than was reserved up front.
+    """
+
+    def __init__(self, per_minute: int | None) -> None:
+        self._capacity = float(per_minute) if per_minute else math.inf
+        self._rate = self._capacity / 60.0
+        self._level = self._capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._capacity != math.inf:
+            self._level = min(
+                self._capacity, self._level + (now - self._updated) * self._rate
+            )
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self._level
+
+    def fraction(self) -> float:
+        return 1.0 if self._capacity == math.inf else self.available() / self._capacity
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= amount
+
+    def seconds_until(self, amount: float) -> float:
+        """Return how long until ``amount`` tokens are available."""
+
+        missing = amount - self.available()
+        return 0.0 if missing <= 0 else missing / self._rate
+
+
+class UpstreamBackend:
+    """One base URL + API key pair with its own connection pool and budgets."""
+
+    def __init__(
+        self,
+        config: OpenAIBackend,
+        timeout: float,
+        limits: httpx.Limits,
+        http2: bool,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = config.base_url
+        self.api_key = config.api_key
+        self.client = httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            transport=transport,
+        )
+        self.requests = TokenBucket(config.rpm)
+        self.tokens = TokenBucket(config.tpm)
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def has_budget(self, tokens: int) -> bool:
+        return self.requests.available() >= 1 and self.tokens.available() >= tokens
+
+    def wait_seconds(self, tokens: int) -> float:
+        return max(self.requests.seconds_until(1), self.tokens.seconds_until(tokens))
+
+
+class UpstreamPool:
+    """Route each request to the least-loaded backend that has budget left.
+
+    Ties on in-flight requests go to the backend with the shortest failure
+    streak, then to the one with the most request budget remaining.
+
+    Healthy backends are preferred; a backend is marked unhealthy for
+    ``cooldown_seconds`` after ``failure_threshold`` consecutive failures and
+    is only used again if no healthy backend has budget. When no backend has
+    budget the request is rejected with
+    :class:`~.concurrency_limiter.UpstreamOverloaded`.
+    """
+
+    def __init__(
+        self,
+        backends: list[OpenAIBackend],
+        timeout: float,
+        max_connections: int,
+        max_keepalive: int,
+        http2: bool,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive
+        )
+        self.backends = [
+            UpstreamBackend(config, timeout, limits, http2, transport)
+            for config in backends
+        ]
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown_seconds
+
+    async def aclose(self) -> None:
+        for backend in self.backends:
+            await backend.client.aclose()
+
+    async def warm_up(self, connections: int) -> None:
+        """Open up to ``connections`` keep-alive connections to every backend.
+
+        Sends that many concurrent ``GET /models`` requests per backend; only
+        the connection and TLS handshakes matter, not the answers. Failures
+        are logged and otherwise ignored.
+        """
+
+        async def touch(backend: UpstreamBackend) -> None:
+            try:
+                await backend.client.get(
+                    "/models", headers={"Authorization": f"Bearer {backend.api_key}"}
+                )
+            except httpx.HTTPError as e:
+                logger.warning("Warm-up request to %s failed: %s", backend.base_url, e)
+
+        await asyncio.gather(
+            *(touch(b) for b in self.backends for _ in range(connections))
+        )
+
+    def acquire(self, tokens: int) -> UpstreamBackend:
+        """Reserve one request and ``tokens`` tokens on the best backend."""
+
+        now = time.monotonic()
+        funded = [b for b in self.backends if b.has_budget(tokens)]
+        candidates = [b for b in funded if b.healthy(now)] or funded
+        if not candidates:
+            wait = min(b.wait_seconds(tokens) for b in self.backends)
+            raise UpstreamOverloaded(max(1, math.ceil(wait)))
+        backend = min(
+            candidates,
+            key=lambda b: (
+                b.in_flight,
+                b.consecutive_failures,
+                -b.requests.fraction(),
+            ),
+        )
+        backend.requests.take(1)
+        backend.tokens.take(tokens)
+        backend.in_flight += 1
+        return backend
+
+    def release(
+        self, backend: UpstreamBackend, ok: bool | None, extra_tokens: int = 0
+    ) -> None:
+        """Return the slot, record health and settle the token reservation.
+
+        ``ok=None`` means the call ended without a health signal (for example
+        it was cancelled) and leaves the failure streak untouched.
+        """
+
+        backend.in_flight -= 1
+        if extra_tokens:
+            backend.tokens.take(extra_tokens)
+        if ok is None:
+            return
+        if ok:
+            backend.consecutive_failures = 0
+            return
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self._failure_threshold:
+            backend.unhealthy_until = time.monotonic() + self._cooldown
@@ -4,10 +4,12 @@ import os
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from src.db.models import Base
 from src.repository.user_repository import UserRepository
+from src.services.rate_limiter import get_rate_limiter
 
 os.environ.setdefault("OPENAI_API_KEY", "test-key-dummy")
 
@@ -24,11 +26,31 @@ async def session_factory():
     await engine.dispose()
 
 
+@pytest.fixture
+def statements(session_factory):
+    """SQL statements executed on the test database, in order.
+
+    Statements are recorded for the whole test; clear the list after setup.
+    """
+
+    executed: list[str] = []
+    engine = session_factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope="function")
 async def user_store(session_factory):
     """Alias fixture returning UserRepository to keep test names unchanged."""
 
-    return UserRepository(session_factory)
+    store = UserRepository(session_factory)
+    yield store
+    await store.aclose()
 
 
 @pytest.fixture(autouse=True)
@@ -41,3 +63,10 @@ async def patch_user_store(user_store):
         ),
     ):
         yield
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
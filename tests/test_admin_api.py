@@ -38,3 +38,41 @@ class TestAdminAPI:
             gst.return_value = store
             resp = self.client.put("/admin/unblock/x")
             assert resp.status_code == 404
+
+    def test_registry_status(self):
+        from src.repository.user_id_registry import RegistryStats
+
+        with patch("src.api.admin.get_user_repository") as gst:
+            store = Mock()
+            store.user_ids.stats.return_value = RegistryStats(
+                size=2,
+                loaded=True,
+                watermark=None,
+                staleness_seconds=0.5,
+                sync_interval_seconds=5.0,
+            )
+            gst.return_value = store
+            resp = self.client.get("/admin/registry")
+            assert resp.status_code == 200
+            assert resp.json()["size"] == 2
+
+    def test_rate_limit_override(self):
+        from src.services.rate_limiter import MemoryRateLimiter
+
+        limiter = MemoryRateLimiter(per_minute=60, burst=20)
+        with patch("src.api.admin.get_rate_limiter", return_value=limiter):
+            resp = self.client.put(
+                "/admin/rate-limit/u1", json={"per_minute": 0, "burst": 1}
+            )
+            assert resp.status_code == 200
+            assert resp.json() == {"per_minute": 0, "burst": 1}
+            assert limiter._overrides["u1"] == (0, 1)
+
+            resp = self.client.delete("/admin/rate-limit/u1")
+            assert resp.status_code == 204
+            assert "u1" not in limiter._overrides
+
+            resp = self.client.put(
+                "/admin/rate-limit/u1", json={"per_minute": 10, "burst": 0}
+            )
+            assert resp.status_code == 422
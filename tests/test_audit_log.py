@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from src.db.models import User, ViolationEvent
+from src.repository.audit_log import (
+    AuditEvent,
+    AuditLog,
+    DatabaseAuditSink,
+    JsonlAuditSink,
+)
+from src.repository.user_repository import UserRepository
+from src.services.moderation import ModerationService
+
+pytestmark = pytest.mark.asyncio
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.events: list[AuditEvent] = []
+
+    async def write(self, events):
+        self.events.extend(events)
+
+    async def aclose(self):
+        pass
+
+
+class FailingSink(ListSink):
+    async def write(self, events):
+        raise OSError("disk full")
+
+
+async def test_emit_drops_when_queue_is_full():
+    sink = ListSink()
+    audit = AuditLog([sink], max_queue=2, batch_size=10, interval=10)
+    for i in range(5):
+        audit.emit(AuditEvent("violation", f"u{i}"))
+    assert audit.stats().dropped == 3
+    await audit.aclose()
+    assert [e.user_id for e in sink.events] == ["u0", "u1"]
+    assert audit.stats().written == 2
+
+
+async def test_background_flush_and_failures():
+    sink, failing = ListSink(), FailingSink()
+    audit = AuditLog([sink], max_queue=100, batch_size=2, interval=10)
+    audit.emit(AuditEvent("block", "a"))
+    audit.emit(AuditEvent("block", "b"))
+    await asyncio.sleep(0.01)  # batch_size reached: flushed without waiting
+    assert len(sink.events) == 2
+    await audit.aclose()
+
+    audit = AuditLog([sink, failing], max_queue=100, batch_size=10, interval=10)
+    audit.emit(AuditEvent("block", "c"))
+    await audit.aclose()
+    assert audit.stats().failed == 1
+    assert audit.stats().written == 0
+
+
+async def test_disabled_without_sinks():
+    audit = AuditLog([], max_queue=1, batch_size=1, interval=1)
+    audit.emit(AuditEvent("block", "a"))
+    assert not audit.enabled
+    assert audit.stats().queued == 0
+
+
+async def test_jsonl_sink_rotates(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = JsonlAuditSink(str(path), max_bytes=300, backup_count=2)
+    for i in range(6):
+        await sink.write([AuditEvent("violation", f"user-{i}", message="x" * 50)])
+    await sink.aclose()
+
+    assert (tmp_path / "audit.jsonl.1").exists()
+    assert (tmp_path / "audit.jsonl.2").exists()
+    assert not (tmp_path / "audit.jsonl.3").exists()
+    last = json.loads(path.read_text().splitlines()[-1])
+    assert last["user_id"] == "user-5"
+    assert last["kind"] == "violation"
+
+
+async def test_jsonl_sink_rotates_by_bytes(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = JsonlAuditSink(str(path), max_bytes=400, backup_count=5)
+    for i in range(6):
+        await sink.write([AuditEvent("violation", f"user-{i}", message="ü" * 40)])
+    await sink.aclose()
+
+    files = [path, *(tmp_path / f"audit.jsonl.{i}" for i in range(1, 6))]
+    sizes = [f.stat().st_size for f in files if f.exists()]
+    assert len(sizes) > 1
+    assert all(size <= 400 for size in sizes)
+    assert json.loads(path.read_text().splitlines()[-1])["message"] == "ü" * 40
+
+
+async def test_database_sink_uses_one_insert(session_factory, statements):
+    sink = DatabaseAuditSink(session_factory)
+    await sink.write([AuditEvent("block", f"u{i}") for i in range(50)])
+    assert len(statements) == 1
+
+    async with session_factory() as session:
+        assert len((await session.scalars(select(ViolationEvent))).all()) == 50
+
+
+async def test_moderation_decisions_are_audited(session_factory):
+    sink = ListSink()
+    audit = AuditLog([sink], max_queue=100, batch_size=100, interval=10)
+    store = UserRepository(session_factory, audit=audit)
+    service = ModerationService(store)
+    await store.get_user("bob")
+
+    for _ in range(3):
+        await service.process_message("say hi to bob", "alice")
+    async with session_factory() as session:
+        user = await session.get(User, "alice")
+        assert user is not None
+        user.blocked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await session.commit()
+    await store.block_expiry.sweep()
+    await store.unblock_user("alice")
+    await store.aclose()
+    await audit.aclose()
+
+    kinds = [e.kind for e in sink.events]
+    # The block is recorded inside the strike that causes it.
+    assert kinds == [
+        "violation",
+        "violation",
+        "block",
+        "violation",
+        "auto_unblock",
+        "admin_unblock",
+    ]
+    assert sink.events[0].message == "say hi to bob"
+    assert sink.events[3].violation_count == 3
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.db.models import User
+from src.repository.block_expiry import BlockExpirySweeper
+from src.repository.user_repository import UserRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _block(store: UserRepository, user_id: str, until: datetime) -> None:
+    for _ in range(3):
+        await store.add_violation(user_id)
+    async with store._session_factory() as session:
+        user = await session.get(User, user_id)
+        assert user is not None
+        user.blocked_until = until
+        await session.commit()
+
+
+async def test_sweep_expires_due_blocks_in_one_statement(
+    session_factory, user_store: UserRepository, statements
+):
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    future = datetime.now(timezone.utc) + timedelta(hours=1)
+    for user_id in ("a", "b"):
+        await _block(user_store, user_id, past)
+    await _block(user_store, "c", future)
+
+    expired: list[str] = []
+    sweeper = BlockExpirySweeper(session_factory, expired.append, max_interval=60)
+    statements.clear()
+    assert sorted(await sweeper.sweep()) == ["a", "b"]
+
+    assert len(statements) == 1
+    assert sorted(expired) == ["a", "b"]
+    a = await user_store.get_user("a")
+    c = await user_store.get_user("c")
+    assert (a.is_blocked, a.blocked_until, a.violation_count) == (False, None, 0)
+    assert c.is_blocked is True
+
+
+async def test_wakes_when_earliest_block_is_due(
+    session_factory, user_store: UserRepository
+):
+    expired = asyncio.Event()
+    sweeper = BlockExpirySweeper(
+        session_factory, lambda user_id: expired.set(), max_interval=3600
+    )
+    await sweeper.start()
+    try:
+        until = datetime.now(timezone.utc) + timedelta(milliseconds=100)
+        await _block(user_store, "dana", until)
+        sweeper.schedule("dana", until)
+        async with asyncio.timeout(2):
+            await expired.wait()
+        assert len(sweeper) == 0
+    finally:
+        await sweeper.aclose()
+    assert (await user_store.get_user("dana")).is_blocked is False
+
+
+async def test_start_schedules_existing_blocks(
+    session_factory, user_store: UserRepository
+):
+    await _block(user_store, "eve", datetime.now(timezone.utc) + timedelta(hours=1))
+    sweeper = BlockExpirySweeper(session_factory, lambda _: None, max_interval=60)
+    await sweeper.start()
+    try:
+        assert len(sweeper) == 1
+    finally:
+        await sweeper.aclose()
+
+
+async def test_blocks_are_scheduled_and_lifted_from_blocklist(
+    user_store: UserRepository,
+):
+    for _ in range(3):
+        await user_store.add_violation("fay")
+    assert user_store.blocklist.contains("fay")
+    assert len(user_store.block_expiry) == 1
+
+    await _block(user_store, "fay", datetime.now(timezone.utc) - timedelta(seconds=1))
+    await user_store.block_expiry.sweep()
+    assert not user_store.blocklist.contains("fay")
+
+
+async def test_block_checks_do_not_write(user_store: UserRepository, statements):
+    await _block(user_store, "gus", datetime.now(timezone.utc) - timedelta(minutes=1))
+    statements.clear()
+    assert await user_store.is_user_blocked("gus") is False
+    admission = await user_store.admit("gus")
+
+    assert admission.is_blocked is False
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    # The expiry itself is left to the sweeper.
+    assert (await user_store.get_user("gus")).is_blocked is True
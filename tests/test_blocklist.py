@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.repository.blocklist import Blocklist
+from src.services.moderation import ModerationService
+
+
+def test_entry_expires_at_blocked_until():
+    blocklist = Blocklist(max_size=10, recheck_seconds=60)
+    blocklist.add("a", datetime.now(timezone.utc) + timedelta(minutes=5))
+    blocklist.add("b", datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert blocklist.contains("a") is True
+    assert blocklist.contains("b") is False
+    assert len(blocklist) == 1
+
+
+def test_entry_expires_after_recheck_bound():
+    blocklist = Blocklist(max_size=10, recheck_seconds=0)
+    blocklist.add("a", None)
+    assert blocklist.contains("a") is False
+
+
+def test_lru_eviction():
+    blocklist = Blocklist(max_size=2, recheck_seconds=60)
+    blocklist.add("a", None)
+    blocklist.add("b", None)
+    assert blocklist.contains("a")
+    blocklist.add("c", None)
+    assert blocklist.contains("a")
+    assert not blocklist.contains("b")
+    assert blocklist.contains("c")
+
+
+@pytest.mark.asyncio
+async def test_blocked_user_rejected_without_db(user_store, statements):
+    service = ModerationService(user_store)
+    for _ in range(3):
+        await user_store.add_violation("mallory")
+
+    statements.clear()
+    assert await service.process_message("hello", "mallory") == (False, True)
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_unblock_invalidates_cache(user_store):
+    service = ModerationService(user_store)
+    for _ in range(3):
+        await user_store.add_violation("mallory")
+    assert user_store.blocklist.contains("mallory")
+
+    await user_store.unblock_user("mallory")
+    assert await service.process_message("hello", "mallory") == (False, False)
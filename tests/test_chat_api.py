@@ -1,3 +1,6 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -47,3 +50,130 @@ class TestChatAPI:
             openai.return_value = openai_inst
             resp = self.client.post("/chat/u1", json={"message": "hi"})
             assert resp.status_code == 502
+
+    def test_chat_stream(self):
+        from src.services.openai_client import MockOpenAIClient
+
+        with (
+            patch("src.api.chat.get_moderation_service") as mod,
+            patch("src.api.chat.get_openai_client") as openai,
+        ):
+            mod_inst = Mock()
+            mod_inst.process_message = AsyncMock(return_value=(False, False))
+            mod.return_value = mod_inst
+            openai.return_value = MockOpenAIClient()
+
+            resp = self.client.post("/chat/u1/stream", json={"message": "hi"})
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/event-stream")
+            events = [e for e in resp.text.split("\n\n") if e]
+            assert events[-1] == "data: [DONE]"
+            import json
+
+            text = "".join(json.loads(e[len("data: ") :])["delta"] for e in events[:-1])
+            assert text == "[MOCK] Echo: hi"
+
+    def test_chat_stream_blocked(self):
+        with patch("src.api.chat.get_moderation_service") as mod:
+            mod_inst = Mock()
+            mod_inst.process_message = AsyncMock(return_value=(False, True))
+            mod.return_value = mod_inst
+            resp = self.client.post("/chat/u1/stream", json={"message": "hi"})
+            assert resp.status_code == 403
+
+    def test_chat_stream_upstream_failure(self):
+        import httpx
+
+        async def failing(message):
+            raise httpx.HTTPError("boom")
+            yield ""
+
+        with (
+            patch("src.api.chat.get_moderation_service") as mod,
+            patch("src.api.chat.get_openai_client") as openai,
+        ):
+            mod_inst = Mock()
+            mod_inst.process_message = AsyncMock(return_value=(False, False))
+            mod.return_value = mod_inst
+            openai.return_value.chat_completion_stream = failing
+            resp = self.client.post("/chat/u1/stream", json={"message": "hi"})
+            assert resp.status_code == 502
+
+    def test_chat_overloaded(self):
+        from src.services.concurrency_limiter import UpstreamOverloaded
+
+        with (
+            patch("src.api.chat.get_moderation_service") as mod,
+            patch("src.api.chat.get_openai_client") as openai,
+        ):
+            mod_inst = Mock()
+            mod_inst.process_message = AsyncMock(return_value=(False, False))
+            mod.return_value = mod_inst
+            openai.return_value.chat_completion = AsyncMock(
+                side_effect=UpstreamOverloaded(3)
+            )
+            resp = self.client.post("/chat/u1", json={"message": "hi"})
+            assert resp.status_code == 503
+            assert resp.headers["retry-after"] == "3"
+            assert resp.json()["detail"]["code"] == "UPSTREAM_OVERLOADED"
+
+    def test_chat_rate_limited(self):
+        from src.services.rate_limiter import MemoryRateLimiter
+
+        with (
+            patch("src.api.chat.get_moderation_service") as mod,
+            patch("src.api.chat.get_openai_client") as openai,
+            patch(
+                "src.api.chat.get_rate_limiter",
+                return_value=MemoryRateLimiter(per_minute=6, burst=2),
+            ),
+        ):
+            mod.return_value.process_message = AsyncMock(return_value=(False, False))
+            openai.return_value.chat_completion = AsyncMock(return_value="ok")
+
+            codes = [
+                self.client.post("/chat/u1", json={"message": "hi"}).status_code
+                for _ in range(2)
+            ]
+            resp = self.client.post("/chat/u1", json={"message": "hi"})
+            assert codes == [200, 200]
+            assert resp.status_code == 429
+            assert resp.headers["retry-after"] == "10"
+            assert resp.json()["detail"]["code"] == "RATE_LIMITED"
+            # Other users have their own bucket.
+            assert (
+                self.client.post("/chat/u2", json={"message": "hi"}).status_code == 200
+            )
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_closes_upstream_when_client_leaves():
+    from src.api.chat import stream_message
+    from src.models.schemas import ChatRequest
+
+    closed = asyncio.Event()
+
+    async def endless(message):
+        try:
+            while True:
+                yield "x"
+        finally:
+            closed.set()
+
+    with (
+        patch("src.api.chat.get_moderation_service") as mod,
+        patch("src.api.chat.get_openai_client") as openai,
+    ):
+        mod.return_value.process_message = AsyncMock(return_value=(False, False))
+        openai.return_value.chat_completion_stream = endless
+        response = await stream_message("u1", ChatRequest(message="hi"))
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    # The client is gone before the body is sent.
+    await response({"type": "http"}, receive, send)
+    assert closed.is_set()
@@ -0,0 +1,106 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from src.services.concurrency_limiter import UpstreamOverloaded
+from src.services.openai_client import OpenAIClient
+
+
+def test_opens_on_failure_rate_and_recovers_after_probe():
+    breaker = CircuitBreaker(
+        failure_rate=0.5, window_size=4, min_calls=4, open_seconds=0
+    )
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    breaker.before_call()
+    assert breaker.state is CircuitState.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_open_circuit_fails_fast():
+    breaker = CircuitBreaker(
+        failure_rate=0.5, window_size=2, min_calls=1, open_seconds=30
+    )
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 30
+
+
+def make_client(handler):
+    return OpenAIClient(transport=httpx.MockTransport(handler))
+
+
+OK_BODY = {"choices": [{"message": {"content": "ok"}}]}
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": "bad"})
+
+    client = make_client(handler)
+    with pytest.raises(httpx.HTTPError):
+        await client.chat_completion("hi")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured():
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json=OK_BODY),
+        ]
+    )
+    client = make_client(lambda request: next(responses))
+    with patch("src.services.openai_client.asyncio.sleep", AsyncMock()) as sleep:
+        assert await client.chat_completion("hi") == "ok"
+    sleep.assert_awaited_once_with(2.0)
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_stops_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, headers={"Retry-After": "60"})
+
+    client = make_client(handler)
+    with patch("src.services.openai_client.asyncio.sleep", AsyncMock()) as sleep:
+        with pytest.raises(httpx.HTTPError):
+            await client.chat_completion("hi")
+    assert len(calls) == 1
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_overloaded_pool_does_not_hold_the_probe():
+    client = make_client(lambda request: httpx.Response(200, json=OK_BODY))
+    client._breaker = breaker = CircuitBreaker(
+        failure_rate=0.5, window_size=1, min_calls=1, open_seconds=30
+    )
+    breaker.before_call()
+    breaker.record_failure()
+    breaker._opened_at -= 30
+
+    with (
+        patch.object(client._pool, "acquire", side_effect=UpstreamOverloaded(1)),
+        pytest.raises(UpstreamOverloaded),
+    ):
+        await client.chat_completion("hi")
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    assert await client.chat_completion("hi") == "ok"
+    assert breaker.state is CircuitState.CLOSED
+    await client.aclose()
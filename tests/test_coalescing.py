@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from src.core.metrics import COALESCED_REQUESTS
+from src.services.openai_client import CoalescingOpenAIClient
+
+pytestmark = pytest.mark.asyncio
+
+
+class SlowClient:
+    def __init__(self, fail: bool = False) -> None:
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+        self._fail = fail
+
+    async def chat_completion(self, message: str) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self._fail:
+            raise RuntimeError("upstream down")
+        return f"re: {message}"
+
+
+async def test_identical_requests_share_one_call():
+    inner = SlowClient()
+    client = CoalescingOpenAIClient(inner)
+    coalesced = COALESCED_REQUESTS.labels()
+    before = coalesced.value
+    tasks = [asyncio.create_task(client.chat_completion("hi")) for _ in range(5)]
+    other = asyncio.create_task(client.chat_completion("bye"))
+    await asyncio.sleep(0)
+    inner.release.set()
+
+    assert await asyncio.gather(*tasks) == ["re: hi"] * 5
+    assert await other == "re: bye"
+    assert inner.calls == 2
+    assert coalesced.value - before == 4
+
+
+async def test_exception_reaches_every_waiter():
+    inner = SlowClient(fail=True)
+    client = CoalescingOpenAIClient(inner)
+    tasks = [asyncio.create_task(client.chat_completion("hi")) for _ in range(3)]
+    await asyncio.sleep(0)
+    inner.release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert inner.calls == 1
+
+
+async def test_leader_cancellation_does_not_affect_followers():
+    inner = SlowClient()
+    client = CoalescingOpenAIClient(inner)
+    leader = asyncio.create_task(client.chat_completion("hi"))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(client.chat_completion("hi"))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    inner.release.set()
+
+    assert await follower == "re: hi"
+    assert leader.cancelled()
+    assert inner.cancelled is False
+
+
+async def test_upstream_cancelled_when_all_waiters_leave():
+    inner = SlowClient()
+    client = CoalescingOpenAIClient(inner)
+    only = asyncio.create_task(client.chat_completion("hi"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+    assert inner.cancelled is True
+
+
+async def test_caller_after_cancellation_starts_a_fresh_call():
+    inner = SlowClient()
+    client = CoalescingOpenAIClient(inner)
+    only = asyncio.create_task(client.chat_completion("hi"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    # The late caller runs after the last waiter cancelled the shared task but
+    # before that task has finished; it must not join it.
+    only.cancel()
+    late = asyncio.create_task(client.chat_completion("hi"))
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+    inner.release.set()
+
+    assert await late == "re: hi"
+    assert inner.calls == 2
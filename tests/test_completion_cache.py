@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.metrics import COMPLETION_CACHE_REQUESTS
+from src.services.completion_cache import MemoryCompletionCache, SqliteCompletionCache
+from src.services.openai_client import CachedOpenAIClient, MockOpenAIClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_cached_client_counts_hits_and_misses():
+    inner = MockOpenAIClient()
+    inner.chat_completion = AsyncMock(side_effect=lambda m: f"re: {m}")  # type: ignore[method-assign]
+    client = CachedOpenAIClient(inner, MemoryCompletionCache(1024, 60))
+    hits = COMPLETION_CACHE_REQUESTS.labels("hit")
+    misses = COMPLETION_CACHE_REQUESTS.labels("miss")
+    before = (hits.value, misses.value)
+
+    assert await client.chat_completion("hello") == "re: hello"
+    assert await client.chat_completion("hello") == "re: hello"
+    assert await client.chat_completion("other") == "re: other"
+    assert inner.chat_completion.await_count == 2
+    assert (hits.value - before[0], misses.value - before[1]) == (1, 2)
+
+
+async def test_memory_cache_ttl_and_byte_bound():
+    cache = MemoryCompletionCache(max_bytes=10, ttl_seconds=60)
+    await cache.set("a", "12345")
+    await cache.set("b", "12345")
+    assert await cache.get("a") == "12345"
+    await cache.set("c", "12345")
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "12345"
+    assert cache.size_bytes == 10
+
+    expired = MemoryCompletionCache(max_bytes=10, ttl_seconds=0)
+    await expired.set("a", "x")
+    assert await expired.get("a") is None
+
+
+async def test_sqlite_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SqliteCompletionCache(path, max_bytes=10, ttl_seconds=60)
+    await cache.set("a", "12345")
+    await cache.set("b", "12345")
+    assert await cache.get("a") == "12345"
+    await cache.set("c", "12345")
+    assert await cache.get("b") is None
+    cache.close()
+
+    reopened = SqliteCompletionCache(path, max_bytes=10, ttl_seconds=60)
+    assert await reopened.get("a") == "12345"
+    assert await reopened.get("c") == "12345"
+    reopened.close()
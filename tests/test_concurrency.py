@@ -0,0 +1,81 @@
+"""Concurrent strike counting through the chat endpoints and the repository."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.db.models import Base, User
+from src.main import create_app
+from src.repository.user_repository import UserRepository
+
+pytestmark = pytest.mark.asyncio
+
+REQUESTS = 200
+
+
+@pytest.fixture
+async def file_store(tmp_path):
+    # A file database gives every session its own connection, unlike the
+    # shared in-memory connection used by the other tests.
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'race.db'}",
+        connect_args={"timeout": 30},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    store = UserRepository(
+        async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    )
+    yield store
+    await store.aclose()
+    await engine.dispose()
+
+
+async def _violate(client: httpx.AsyncClient, endpoint: str) -> int:
+    if endpoint == "single":
+        response = await client.post("/chat/mallory", json={"message": "hi bob"})
+        return response.status_code
+    response = await client.post(
+        "/chat", json={"items": [{"user_id": "mallory", "message": "hi bob"}]}
+    )
+    return response.json()["results"][0]["status_code"]
+
+
+@pytest.mark.parametrize("endpoint", ["single", "batch"])
+async def test_concurrent_violations_count_exactly(file_store, endpoint):
+    # Strikes go through admit() for single messages and admit_many() for
+    # batches; both must let exactly three violating requests through.
+    await file_store.get_user("bob")
+    transport = httpx.ASGITransport(app=create_app())
+
+    with (
+        patch("src.repository.user_repository._user_repository", file_store),
+        patch("src.api.chat.get_openai_client") as openai,
+    ):
+        openai.return_value.chat_completion = AsyncMock(return_value="ok")
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            codes = await asyncio.gather(
+                *(_violate(client, endpoint) for _ in range(REQUESTS))
+            )
+
+    assert codes.count(200) == 3
+    assert codes.count(403) == REQUESTS - 3
+
+    async with file_store._session_factory() as session:
+        user = await session.get(User, "mallory")
+    assert user is not None
+    assert user.violation_count == 3
+    assert user.is_blocked is True
+
+
+async def test_concurrent_add_violation_loses_no_strikes(file_store):
+    await asyncio.gather(*(file_store.add_violation("eve") for _ in range(50)))
+    async with file_store._session_factory() as session:
+        user = await session.get(User, "eve")
+    assert user is not None
+    assert user.violation_count == 50
@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.services.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    UpstreamOverloaded,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_limiter(**overrides):
+    options = dict(
+        initial_limit=2,
+        min_limit=1,
+        max_limit=10,
+        max_queue=2,
+        queue_timeout=1.0,
+        latency_target=1.0,
+    )
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+async def hold(limiter, release):
+    async with limiter.acquire():
+        await release.wait()
+
+
+async def test_queue_full_sheds_immediately():
+    limiter = make_limiter()
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(limiter, release)) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert limiter.stats().in_flight == 2
+    assert limiter.stats().queued == 2
+
+    with pytest.raises(UpstreamOverloaded) as exc:
+        async with limiter.acquire():
+            pass
+    assert exc.value.retry_after >= 1
+    assert limiter.shed == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.stats().in_flight == 0
+
+
+async def test_queued_call_shed_after_deadline():
+    limiter = make_limiter(initial_limit=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(UpstreamOverloaded):
+        async with limiter.acquire():
+            pass
+    assert limiter.stats().queued == 0
+
+    release.set()
+    await holder
+
+
+async def test_cancelled_waiter_leaves_queue():
+    limiter = make_limiter(initial_limit=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, release))
+    waiter = asyncio.create_task(hold(limiter, asyncio.Event()))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats().queued == 0
+    release.set()
+    await holder
+    assert limiter.stats().in_flight == 0
+
+
+async def test_aimd_adjusts_limit():
+    limiter = make_limiter(initial_limit=4, backoff=0.5)
+    for _ in range(8):
+        async with limiter.acquire():
+            pass
+    assert limiter.limit == 5
+
+    with pytest.raises(httpx.HTTPError):
+        async with limiter.acquire():
+            raise httpx.HTTPError("failed") from httpx.ReadTimeout("slow")
+    assert limiter.limit == 2
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://upstream/chat/completions")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError("failed", request=request, response=response)
+
+
+async def test_only_overload_failures_shrink_the_limit():
+    limiter = make_limiter(initial_limit=4, backoff=0.5)
+    for error in (_status_error(400), ValueError("bad response")):
+        with pytest.raises(Exception):
+            async with limiter.acquire():
+                raise httpx.HTTPError("failed") from error
+    assert limiter.limit == 4
+
+    with pytest.raises(httpx.HTTPError):
+        async with limiter.acquire():
+            raise httpx.HTTPError("failed") from _status_error(429)
+    assert limiter.limit == 2
+
+
+async def test_stream_latency_is_time_to_first_chunk():
+    limiter = make_limiter(initial_limit=4, latency_target=0.05, backoff=0.5)
+    async with limiter.acquire() as responded:
+        responded()
+        await asyncio.sleep(0.1)
+    assert limiter.limit == 4
+    assert limiter.stats().latency_seconds < 0.05
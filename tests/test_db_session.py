@@ -0,0 +1,96 @@
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import get_settings
+from src.db import session as db_session
+from src.db.migrate import migrate
+from src.db.models import Base
+from src.db.session import create_engine, engine_options
+from src.repository.user_repository import UserRepository
+
+
+def test_pool_options_for_postgres():
+    settings = get_settings().model_copy(
+        update={
+            "db_pool_size": 7,
+            "db_max_overflow": 3,
+            "db_pool_pre_ping": True,
+            "db_pool_recycle": 1800,
+            "db_statement_cache_size": 0,
+        }
+    )
+    options = engine_options("postgresql+asyncpg://u:p@db/chat", settings)
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 1800
+    assert options["connect_args"] == {"statement_cache_size": 0}
+
+
+def test_pool_options_for_sqlite():
+    settings = get_settings().model_copy(update={"db_pool_size": 3})
+    assert "pool_size" not in engine_options("sqlite+aiosqlite://", settings)
+    file_options = engine_options("sqlite+aiosqlite:////tmp/app.db", settings)
+    assert file_options["pool_size"] == 3
+    assert "connect_args" not in file_options
+
+
+def test_create_engine_applies_pool_size(tmp_path):
+    settings = get_settings().model_copy(
+        update={"db_pool_size": 3, "db_max_overflow": 0}
+    )
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db", settings)
+    assert engine.pool.size() == 3  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_use_read_session_factory(session_factory):
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    read_factory = async_sessionmaker(
+        replica, expire_on_commit=False, class_=AsyncSession
+    )
+    store = UserRepository(session_factory, read_factory)
+    try:
+        # Written to the primary only, as if the replica had not caught up.
+        for _ in range(3):
+            await store.add_violation("alice")
+        assert (await store.get_user("alice")).is_blocked is True
+        assert await store.user_exists("alice") is False
+        assert await store.get_all_user_ids() == set()
+        store.blocklist.discard("alice")
+        assert await store.is_user_blocked("alice") is False
+    finally:
+        await store.aclose()
+        await replica.dispose()
+
+
+def test_importing_the_app_creates_no_engine():
+    code = (
+        "import src.main, src.db.session as s, src.repository.user_repository as r; "
+        "assert s._engine is None and r._user_repository is None"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.asyncio
+async def test_migrate_adds_missing_indexes(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP INDEX ix_users_blocked_until"))
+    monkeypatch.setattr(db_session, "_engine", engine)
+
+    await migrate()
+
+    async with engine.connect() as conn:
+        indexes = await conn.run_sync(
+            lambda sync: {i["name"] for i in inspect(sync).get_indexes("users")}
+        )
+    assert "ix_users_blocked_until" in indexes
+    await engine.dispose()
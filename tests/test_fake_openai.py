@@ -0,0 +1,63 @@
+import random
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from benchmarks.fake_openai import FakeOpenAIConfig, create_fake_app, parse_latency
+from src.services.openai_client import OpenAIClient
+
+
+def _client(config: FakeOpenAIConfig) -> tuple[OpenAIClient, object]:
+    app = create_fake_app(config)
+    return OpenAIClient(transport=httpx.ASGITransport(app=app)), app.state.stats
+
+
+@pytest.mark.asyncio
+async def test_completion_through_real_client():
+    client, stats = _client(FakeOpenAIConfig(response_words=3))
+    assert await client.chat_completion("hello world") == "hello world hello"
+    assert stats.requests == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_through_real_client():
+    client, _ = _client(FakeOpenAIConfig(response_words=4))
+    deltas = [d async for d in client.chat_completion_stream("a b")]
+    assert deltas == ["a", " b", " a", " b"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_after_header():
+    client, stats = _client(
+        FakeOpenAIConfig(rate_limit_rate=1.0, retry_after=0.25, seed=1)
+    )
+    with patch("src.services.openai_client.asyncio.sleep", AsyncMock()) as sleep:
+        with pytest.raises(httpx.HTTPError):
+            await client.chat_completion("hi")
+    assert stats.rate_limited == 3
+    sleep.assert_awaited_with(0.25)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported():
+    client, stats = _client(FakeOpenAIConfig(error_rate=1.0))
+    with patch("src.services.openai_client.asyncio.sleep", AsyncMock()):
+        with pytest.raises(httpx.HTTPError):
+            await client.chat_completion("hi")
+    assert stats.errors == 3
+    await client.aclose()
+
+
+def test_latency_specs():
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.5")(rng) == 0.5
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("lognormal:0.3,0.5")(rng) > 0
+    assert parse_latency("exponential:0.1")(rng) >= 0
+    for bad in ("gaussian:1", "fixed", "uniform:1", "lognormal:x,1"):
+        with pytest.raises(ValueError):
+            parse_latency(bad)
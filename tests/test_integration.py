@@ -26,3 +26,114 @@ async def test_blocking_flow(user_store):
             assert resp.status_code == 200
         resp = client.post("/chat/a", json={"message": "blocked"})
         assert resp.status_code == 403
+
+
+async def test_batch_flow(user_store):
+    app = create_app()
+    client = TestClient(app)
+    await user_store.get_user("bob")
+
+    with patch("src.api.chat.get_openai_client") as openai:
+        openai_inst = AsyncMock()
+        openai_inst.chat_completion = AsyncMock(side_effect=lambda m: f"re: {m}")
+        openai.return_value = openai_inst
+        items = [{"user_id": "a", "message": "hi bob"} for _ in range(4)]
+        items.append({"user_id": "c", "message": "hello"})
+        resp = client.post("/chat", json={"items": items})
+
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 200, 200, 403, 200]
+    assert results[3]["error"]["code"] == "USER_BLOCKED"
+    assert results[4] == {
+        "user_id": "c",
+        "status_code": 200,
+        "response": "re: hello",
+        "error": None,
+    }
+    user = await user_store.get_user("a")
+    assert user.violation_count == 3
+    assert user.is_blocked is True
+
+
+async def test_batch_reports_upstream_errors_per_item(user_store):
+    import httpx
+
+    client = TestClient(create_app())
+
+    async def flaky(message):
+        if message == "bad":
+            raise httpx.HTTPError("boom")
+        return "ok"
+
+    with patch("src.api.chat.get_openai_client") as openai:
+        openai.return_value.chat_completion = flaky
+        resp = client.post(
+            "/chat",
+            json={
+                "items": [
+                    {"user_id": "a", "message": "good"},
+                    {"user_id": "b", "message": "bad"},
+                ]
+            },
+        )
+    results = resp.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 502]
+    assert results[1]["error"]["code"] == "OPENAI_ERROR"
+
+
+async def test_batch_rate_limits_items_beyond_budget(user_store):
+    from src.services.rate_limiter import MemoryRateLimiter
+
+    client = TestClient(create_app())
+    with (
+        patch("src.api.chat.get_openai_client") as openai,
+        patch(
+            "src.api.chat.get_rate_limiter",
+            return_value=MemoryRateLimiter(per_minute=60, burst=2),
+        ),
+    ):
+        openai.return_value.chat_completion = AsyncMock(return_value="ok")
+        # More items for "a" than its whole burst.
+        items = [{"user_id": "a", "message": "hi"} for _ in range(5)]
+        items.insert(1, {"user_id": "b", "message": "hi"})
+        resp = client.post("/chat", json={"items": items})
+        retry = client.post("/chat", json={"items": items[:1]})
+
+    results = resp.json()["results"]
+    assert [r["status_code"] for r in results] == [200, 200, 200, 429, 429, 429]
+    assert results[3]["error"]["code"] == "RATE_LIMITED"
+    assert "retry after 1s" in results[3]["error"]["details"]
+    assert openai.return_value.chat_completion.await_count == 3
+    assert retry.json()["results"][0]["status_code"] == 429
+
+
+async def test_admin_bulk_unblock_and_listing(user_store):
+    import json
+
+    for user_id in ("a", "b", "c"):
+        for _ in range(3):
+            await user_store.add_violation(user_id)
+    await user_store.add_violation("d")
+
+    client = TestClient(create_app())
+    with patch("src.api.admin.get_user_repository", return_value=user_store):
+        page = client.get("/admin/users", params={"limit": 2}).json()
+        assert [u["user_id"] for u in page["items"]] == ["a", "b"]
+        page = client.get(
+            "/admin/users", params={"limit": 2, "after": page["next_cursor"]}
+        ).json()
+        assert [u["user_id"] for u in page["items"]] == ["c"]
+        assert page["next_cursor"] is None
+
+        resp = client.get("/admin/users/export", params={"status": "violating"})
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        exported = [json.loads(line) for line in resp.text.splitlines()]
+        assert [u["user_id"] for u in exported] == ["a", "b", "c", "d"]
+
+        assert client.post("/admin/unblock", json={}).status_code == 422
+        resp = client.post("/admin/unblock", json={"user_ids": ["a", "b"]})
+        assert resp.json() == {"unblocked": 2, "user_ids": ["a", "b"]}
+
+    assert not await user_store.is_user_blocked("a")
+    assert await user_store.is_user_blocked("c")
@@ -0,0 +1,179 @@
+import asyncio
+import signal
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+import uvicorn
+
+from src.core.lifecycle import DrainMiddleware, Lifecycle
+from src.db import session as db_session
+from src.db.session import create_engine
+from src.main import create_app
+from src.serve import DrainingServer
+from src.services.openai_client import MockOpenAIClient, OpenAIClient
+
+pytestmark = pytest.mark.asyncio
+
+
+def _drain_app(state: Lifecycle, release: asyncio.Event):
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return DrainMiddleware(app, state=state)
+
+
+async def test_drain_waits_for_running_chats_and_refuses_new_ones():
+    state, release = Lifecycle(), asyncio.Event()
+    transport = httpx.ASGITransport(app=_drain_app(state, release))
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        running = asyncio.create_task(client.post("/chat/a"))
+        await asyncio.sleep(0.01)
+        assert state.in_flight == 1
+
+        drain = asyncio.create_task(state.drain(timeout=5, poll=0.01))
+        await asyncio.sleep(0.02)
+        refused = await client.post("/chat/b")
+        assert refused.status_code == 503
+        assert refused.headers["retry-after"] == "1"
+        assert refused.json()["detail"]["code"] == "SHUTTING_DOWN"
+        assert not drain.done()
+
+        release.set()
+        assert (await running).status_code == 200
+        assert await drain == 0
+
+
+async def test_drain_gives_up_at_deadline():
+    state = Lifecycle()
+    state.in_flight = 2
+    assert await state.drain(timeout=0.05, poll=0.01) == 2
+    assert state.draining and not state.ready
+
+
+async def test_lifespan_warms_up_then_drains_and_closes(user_store):
+    client = MockOpenAIClient()
+    client.warm_up = AsyncMock()  # type: ignore[method-assign]
+    client.aclose = AsyncMock()  # type: ignore[method-assign]
+    warm_up_db = AsyncMock()
+    app = create_app()
+    with (
+        patch("src.main.get_user_repository", return_value=user_store),
+        patch("src.main.get_openai_client", return_value=client),
+        patch("src.main.warm_up_db", warm_up_db),
+    ):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as http:
+            async with app.router.lifespan_context(app):
+                assert (await http.get("/health/live")).status_code == 200
+                for _ in range(100):
+                    if app.state.lifecycle.ready:
+                        break
+                    await asyncio.sleep(0.01)
+                ready = await http.get("/health/ready")
+                assert ready.json() == {"status": "ready"}
+            draining = await http.get("/health/ready")
+            assert draining.status_code == 503
+            assert draining.json() == {"status": "draining"}
+
+    warm_up_db.assert_awaited_once()
+    client.warm_up.assert_awaited_once()
+    client.aclose.assert_awaited_once()
+
+
+async def test_lifespan_closes_everything_when_a_flush_fails(user_store, caplog):
+    client = MockOpenAIClient()
+    client.aclose = AsyncMock()  # type: ignore[method-assign]
+    flush = AsyncMock(side_effect=RuntimeError("database gone"))
+    dispose = AsyncMock()
+    app = create_app()
+    with (
+        patch.object(user_store, "aclose", flush),
+        patch("src.main.get_user_repository", return_value=user_store),
+        patch("src.main.get_openai_client", return_value=client),
+        patch("src.main.warm_up_db", AsyncMock()),
+        patch("src.main.dispose_engines", dispose),
+    ):
+        async with app.router.lifespan_context(app):
+            pass
+
+    client.aclose.assert_awaited_once()
+    dispose.assert_awaited_once()
+    assert "database gone" in caplog.text
+
+
+async def test_signal_drains_while_server_still_accepts_connections(user_store):
+    release = asyncio.Event()
+
+    async def slow_completion(message):
+        await release.wait()
+        return "ok"
+
+    client = MockOpenAIClient()
+    client.chat_completion = slow_completion  # type: ignore[method-assign]
+    client.warm_up = AsyncMock()  # type: ignore[method-assign]
+    client.aclose = AsyncMock()  # type: ignore[method-assign]
+    app = create_app()
+    config = uvicorn.Config(app, port=0, log_level="warning")
+    server = DrainingServer(config, drain_seconds=5)
+    with (
+        patch("src.main.get_user_repository", return_value=user_store),
+        patch("src.main.get_openai_client", return_value=client),
+        patch("src.api.chat.get_openai_client", return_value=client),
+        patch("src.main.warm_up_db", AsyncMock()),
+        # uvicorn re-raises the captured signal once it has shut down.
+        patch.object(signal, "raise_signal"),
+    ):
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as http:
+            while (await http.get("/health/ready")).status_code != 200:
+                await asyncio.sleep(0.01)
+            running = asyncio.create_task(
+                http.post("/chat/alice", json={"message": "hello"})
+            )
+            while app.state.lifecycle.in_flight == 0:
+                await asyncio.sleep(0.01)
+
+            server.handle_exit(signal.SIGTERM, None)
+            await asyncio.sleep(0.05)
+            # New connections still reach the worker, which reports draining.
+            ready = await http.get("/health/ready")
+            assert ready.json() == {"status": "draining"}
+            refused = await http.post("/chat/bob", json={"message": "hello"})
+            assert refused.status_code == 503
+            assert refused.json()["detail"]["code"] == "SHUTTING_DOWN"
+            assert not server.should_exit
+
+            release.set()
+            assert (await running).status_code == 200
+        async with asyncio.timeout(5):
+            await serving
+
+    client.aclose.assert_awaited_once()
+
+
+async def test_upstream_warm_up_opens_connections_per_backend():
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json={"data": []})
+
+    client = OpenAIClient(transport=httpx.MockTransport(handler))
+    await client.warm_up(3)
+    await client.aclose()
+    assert len(requests) == 3
+    assert all(path.endswith("/models") for path in requests)
+
+
+async def test_db_warm_up_fills_the_pool(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    monkeypatch.setattr(db_session, "_engine", engine)
+    await db_session.warm_up(3)
+    assert engine.pool.checkedin() == 3  # type: ignore[attr-defined]
+    await engine.dispose()
@@ -0,0 +1,84 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    _LabelledMetric,
+    monitor_event_loop,
+)
+from src.main import create_app
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("h", "Help.", ("stage",), buckets=(0.1, 1.0))
+    child = histogram.labels("db")
+    child.observe(0.05)
+    child.observe(0.5)
+    child.observe(5)
+
+    assert histogram.render().splitlines() == [
+        "# HELP h Help.",
+        "# TYPE h histogram",
+        'h_bucket{stage="db",le="0.1"} 1',
+        'h_bucket{stage="db",le="1"} 2',
+        'h_bucket{stage="db",le="+Inf"} 3',
+        'h_sum{stage="db"} 5.55',
+        'h_count{stage="db"} 3',
+    ]
+
+
+def test_counter_and_gauge():
+    counter = Counter("c_total", "Help.", ("status",))
+    counter.labels("200").inc()
+    counter.labels("200").inc(2)
+    counter.labels('a"b').inc()
+    assert 'c_total{status="200"} 3' in counter.render()
+    assert 'c_total{status="a\\"b"} 1' in counter.render()
+    with pytest.raises(ValueError):
+        counter.labels()
+
+    gauge = Gauge("g", "Help.", function=lambda: 4)
+    assert gauge.render().endswith("g 4\n")
+
+
+def test_incomplete_metric_cannot_be_created():
+    class Untyped(_LabelledMetric):
+        def samples(self):
+            return iter(())
+
+    with pytest.raises(TypeError, match="_new_child"):
+        Untyped("u", "Help.", ())
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor():
+    with patch("src.core.metrics.EVENT_LOOP_LAG", Histogram("lag", "Help.")) as lag:
+        task = asyncio.create_task(monitor_event_loop(0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+    assert lag.labels().counts != [0] * len(lag.labels().counts)
+
+
+def test_metrics_endpoint_reports_stages_and_routes():
+    client = TestClient(create_app())
+    with patch("src.api.chat.get_openai_client") as openai:
+        openai.return_value.chat_completion = AsyncMock(return_value="ok")
+        assert client.post("/chat/alice", json={"message": "hi"}).status_code == 200
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+    assert (
+        'http_requests_total{method="POST",route="/chat/{user_id}",status="200"}'
+        in (body)
+    )
+    for stage in ("rate_limit", "block_check", "content_check", "user_upsert"):
+        assert f'chat_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'chat_stage_duration_seconds_count{stage="upstream"}' in body
+    assert "# TYPE db_pool_checkouts_total counter" in body
@@ -20,3 +20,24 @@ async def test_process_message_blocks_after_three(user_store):
         with patch.object(service, "check_content_violation", return_value=True):
             v, blocked = await service.process_message("hi bob", "alice")
     assert blocked is True
+
+
+async def test_process_message_query_count(user_store, statements):
+    service = ModerationService(user_store)
+    await user_store.get_user("bob")
+    await user_store.get_user_id_matcher()
+
+    statements.clear()
+    # A new user is looked up, then registered.
+    assert await service.process_message("hello", "alice") == (False, False)
+    assert len(statements) == 2
+
+    # A known user's clean request is a single read.
+    statements.clear()
+    assert await service.process_message("hello", "alice") == (False, False)
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("SELECT")
+
+    statements.clear()
+    assert await service.process_message("hi bob", "alice") == (True, False)
+    assert len(statements) == 2
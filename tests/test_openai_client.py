@@ -1,5 +1,6 @@
+import httpx
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import Mock
 
 from src.services.openai_client import OpenAIClient, get_openai_client
 
@@ -12,13 +13,34 @@ def test_get_openai_client_cached():
 
 @pytest.mark.asyncio
 async def test_chat_completion_success(monkeypatch):
-    client = OpenAIClient()
-    fake_response = MagicMock()
-    fake_response.json.return_value = {"choices": [{"message": {"content": "ok"}}]}
-    fake_response.raise_for_status.return_value = None
-    post_mock = AsyncMock(return_value=fake_response)
-    client._client = MagicMock()
-    client._client.post = post_mock
+    post_mock = Mock(
+        return_value=httpx.Response(
+            200, json={"choices": [{"message": {"content": "ok"}}]}
+        )
+    )
+    client = OpenAIClient(transport=httpx.MockTransport(post_mock))
 
     result = await client.chat_completion("hi")
     assert result == "ok"
+    post_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_parses_events():
+    body = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+
+    def handler(request):
+        assert b'"stream": true' in request.content or b'"stream":true' in (
+            request.content
+        )
+        return httpx.Response(200, text=body)
+
+    client = OpenAIClient(transport=httpx.MockTransport(handler))
+    deltas = [d async for d in client.chat_completion_stream("hi")]
+    assert deltas == ["Hel", "lo"]
+    await client.aclose()
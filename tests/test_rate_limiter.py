@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from src.repository.rate_limit_repository import DatabaseRateLimiter
+from src.services.rate_limiter import MemoryRateLimiter, RateLimitExceeded
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(params=["memory", "database"])
+def make_limiter(request, session_factory):
+    def make(per_minute, burst):
+        if request.param == "memory":
+            return MemoryRateLimiter(per_minute, burst)
+        return DatabaseRateLimiter(per_minute, burst, session_factory)
+
+    return make
+
+
+async def test_burst_then_reject(make_limiter):
+    limiter = make_limiter(per_minute=60, burst=3)
+    for _ in range(3):
+        await limiter.acquire("alice")
+    with pytest.raises(RateLimitExceeded) as exc:
+        await limiter.acquire("alice")
+    assert exc.value.retry_after == 1
+    # Buckets are per user.
+    await limiter.acquire("bob")
+
+
+async def test_cost_larger_than_budget(make_limiter):
+    limiter = make_limiter(per_minute=6, burst=5)
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice", cost=6)
+    # A rejected request takes nothing.
+    await limiter.acquire("alice", cost=5)
+
+
+async def test_acquire_up_to_takes_what_is_left(make_limiter):
+    limiter = make_limiter(per_minute=60, burst=5)
+    assert await limiter.acquire_up_to("alice", 3) == (3, 0)
+    assert await limiter.acquire_up_to("alice", 8) == (2, 1)
+    assert await limiter.acquire_up_to("alice", 2) == (0, 1)
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice")
+
+    disabled = make_limiter(per_minute=0, burst=1)
+    assert await disabled.acquire_up_to("alice", 50) == (50, 0)
+
+
+async def test_refill(make_limiter):
+    limiter = make_limiter(per_minute=1200, burst=1)
+    await limiter.acquire("alice")
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice")
+    await asyncio.sleep(0.1)
+    await limiter.acquire("alice")
+
+
+async def test_overrides(make_limiter):
+    limiter = make_limiter(per_minute=60, burst=1)
+    await limiter.set_override("alice", per_minute=0, burst=1)
+    for _ in range(5):
+        await limiter.acquire("alice")
+
+    await limiter.clear_override("alice")
+    await limiter.acquire("alice")
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice")
+
+    await limiter.set_override("alice", per_minute=60, burst=2)
+    await limiter.acquire("alice")
+    await limiter.acquire("alice")
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice")
+
+
+async def test_disabled_globally(make_limiter):
+    limiter = make_limiter(per_minute=0, burst=1)
+    for _ in range(5):
+        await limiter.acquire("alice")
+
+
+async def test_override_applies_when_disabled_globally(make_limiter):
+    limiter = make_limiter(per_minute=0, burst=5)
+    await limiter.set_override("alice", per_minute=60, burst=1)
+    await limiter.acquire("alice")
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("alice")
+    assert await limiter.acquire_up_to("bob", 3) == (3, 0)
+
+
+async def test_database_limiter_disabled_only_reads(session_factory, statements):
+    limiter = DatabaseRateLimiter(0, 1, session_factory)
+    statements.clear()
+    await limiter.acquire("alice")
+    assert await limiter.acquire_up_to("alice", 3) == (3, 0)
+
+    assert len(statements) == 2
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from benchmarks.replay import _Outcome, _percentile, generate_log, read_log, report
+
+
+def test_read_log_accepts_epoch_iso_and_missing_timestamps():
+    requests = read_log(
+        [
+            '{"user_id": "a", "message": "hi", "timestamp": 10.5}\n',
+            "\n",
+            '{"user_id": 7, "message": "yo", "timestamp": "1970-01-01T00:00:20Z"}\n',
+            '{"user_id": "c", "message": "hey"}\n',
+        ]
+    )
+    assert [(r.user_id, r.timestamp) for r in requests] == [
+        ("a", 10.5),
+        ("7", 20.0),
+        ("c", None),
+    ]
+
+
+def test_read_log_reports_bad_line():
+    with pytest.raises(ValueError, match="line 2"):
+        read_log(['{"user_id": "a", "message": "hi"}', '{"user_id": "b"}'])
+
+
+def test_generated_log_round_trips_and_contains_violations():
+    import json
+
+    log = generate_log(200, users=10, violation_rate=0.5, seed=1)
+    requests = read_log(json.dumps(record) for record in log)
+    assert len(requests) == 200
+    assert len({r.user_id for r in requests}) > 1
+    assert any(" tell user-" in r.message for r in requests)
+
+
+def test_report_percentiles_and_status_mix():
+    assert _percentile([0.1, 0.2, 0.3, 0.4], 0.5) == 0.2
+    outcomes = [_Outcome(i / 100, "200") for i in range(1, 100)]
+    outcomes.append(_Outcome(1.0, "403"))
+    out = io.StringIO()
+    report(outcomes, 2.0, {"moderation_blocks_total": 1.0}, out=out)
+    text = out.getvalue()
+    assert "throughput    50.0 req/s" in text
+    assert "p99           990.0 ms" in text
+    assert "  403         1" in text
+    assert "blocks        1" in text
@@ -0,0 +1,120 @@
+import json
+import logging
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.profiler import SamplingProfiler, render_folded
+from src.core.timing import ServerTimingMiddleware, _spans, span, timed
+from src.main import create_app
+
+
+def test_span_is_noop_outside_requests():
+    with span("anything"):
+        pass
+    assert _spans.get() is None
+
+
+@pytest.mark.asyncio
+async def test_spans_accumulate():
+    @timed("work")
+    async def work() -> int:
+        return 1
+
+    spans: dict[str, list[float]] = {}
+    token = _spans.set(spans)
+    try:
+        assert await work() == 1
+        assert await work() == 1
+        with span("other"):
+            pass
+    finally:
+        _spans.reset(token)
+    assert spans["work"][1] == 2
+    assert set(spans) == {"work", "other"}
+
+
+def test_server_timing_header():
+    client = TestClient(create_app())
+    with patch("src.api.chat.get_openai_client") as openai:
+        openai.return_value.chat_completion = AsyncMock(return_value="ok")
+        resp = client.post("/chat/alice", json={"message": "hi"})
+
+    names = [entry.split(";")[0] for entry in resp.headers["server-timing"].split(", ")]
+    assert {"moderation", "repo.admit", "total"} <= set(names)
+    assert names[-1] == "total"
+
+
+def test_request_log_line(caplog):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, header=False, log=True)
+
+    @app.get("/x")
+    async def x() -> dict[str, bool]:
+        with span("step"):
+            pass
+        return {"ok": True}
+
+    with caplog.at_level(logging.INFO, logger="src.core.timing"):
+        resp = TestClient(app).get("/x")
+    assert "server-timing" not in resp.headers
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["route"] == "/x"
+    assert line["status"] == 200
+    assert line["spans"]["step"]["calls"] == 1
+
+
+def test_sampling_profiler_folds_stacks():
+    profiler = SamplingProfiler()
+    done = threading.Event()
+
+    def busy() -> None:
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy)
+    worker.start()
+    try:
+        stacks = profiler.sample(worker.ident or 0, 0.05, 0.001)
+    finally:
+        done.set()
+        worker.join()
+
+    assert sum(stacks.values()) > 0
+    folded = render_folded(stacks)
+    assert "busy" in folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_sampling_profiler_runs_one_at_a_time():
+    profiler = SamplingProfiler()
+    thread = threading.Thread(
+        target=profiler.sample, args=(threading.get_ident(), 0.2, 0.01)
+    )
+    thread.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(RuntimeError):
+            profiler.sample(threading.get_ident(), 0.01, 0.01)
+    finally:
+        thread.join()
+
+
+def test_profile_endpoint():
+    client = TestClient(create_app())
+    assert client.post("/admin/profile?seconds=0.01").status_code == 404
+
+    with patch("src.api.admin.get_settings") as settings:
+        settings.return_value.profiler_enabled = True
+        settings.return_value.profiler_max_seconds = 1.0
+        assert client.post("/admin/profile?seconds=5").status_code == 422
+        resp = client.post("/admin/profile?seconds=0.05&interval=0.005")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert resp.text.strip()
@@ -0,0 +1,101 @@
+import importlib.util
+
+import httpx
+import pytest
+from pydantic import ValidationError
+from unittest.mock import patch
+
+from src.core.config import OpenAIBackend, Settings
+from src.services.concurrency_limiter import UpstreamOverloaded
+from src.services.openai_client import OpenAIClient
+from src.services.upstream_pool import TokenBucket, UpstreamPool
+
+
+def make_pool(*backends, transport=None):
+    return UpstreamPool(
+        list(backends),
+        timeout=5,
+        max_connections=10,
+        max_keepalive=5,
+        http2=False,
+        failure_threshold=2,
+        cooldown_seconds=60,
+        transport=transport,
+    )
+
+
+def test_token_bucket_budget():
+    bucket = TokenBucket(60)
+    bucket.take(60)
+    assert bucket.available() < 1
+    assert 0 < bucket.seconds_until(1) <= 1
+    assert TokenBucket(None).available() == float("inf")
+
+
+def test_routes_to_least_loaded_backend_with_budget():
+    pool = make_pool(
+        OpenAIBackend(base_url="http://a", rpm=1),
+        OpenAIBackend(base_url="http://b"),
+    )
+    first = pool.acquire(10)
+    second = pool.acquire(10)
+    assert {first.base_url, second.base_url} == {"http://a", "http://b"}
+
+    # "a" has spent its one request per minute, so everything goes to "b".
+    pool.release(first, True)
+    pool.release(second, True)
+    assert pool.acquire(10).base_url == "http://b"
+
+
+def test_rejects_when_no_backend_has_budget():
+    pool = make_pool(OpenAIBackend(base_url="http://a", tpm=100))
+    with pytest.raises(UpstreamOverloaded) as exc:
+        pool.acquire(200)
+    assert exc.value.retry_after >= 1
+
+
+def test_unhealthy_backend_is_avoided():
+    pool = make_pool(
+        OpenAIBackend(base_url="http://a"), OpenAIBackend(base_url="http://b")
+    )
+    bad = pool.backends[0]
+    for _ in range(2):
+        bad.in_flight += 1
+        pool.release(bad, False)
+    assert all(pool.acquire(1).base_url == "http://b" for _ in range(3))
+
+
+@pytest.mark.asyncio
+async def test_client_fails_over_between_backends():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.host, request.headers["Authorization"]))
+        if request.url.host == "down.local":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    backends = [
+        OpenAIBackend(base_url="http://down.local/v1", api_key="k1"),
+        OpenAIBackend(base_url="http://up.local/v1", api_key="k2"),
+    ]
+    with (
+        patch("src.core.config.Settings.upstream_backends", return_value=backends),
+        patch("src.services.openai_client.asyncio.sleep"),
+    ):
+        client = OpenAIClient(transport=httpx.MockTransport(handler))
+        assert await client.chat_completion("hi") == "ok"
+    assert ("up.local", "Bearer k2") in seen
+    await client.aclose()
+
+
+def test_http2_without_h2_is_a_configuration_error(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *args: None if name == "h2" else find_spec(name, *args),
+    )
+    monkeypatch.setenv("OPENAI_HTTP2", "true")
+    with pytest.raises(ValidationError, match=r"httpx\[http2\]"):
+        Settings()
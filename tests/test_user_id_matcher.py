@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from src.repository.user_id_matcher import UserIdMatcher, _Automaton
+
+
+def test_find_is_case_insensitive():
+    matcher = UserIdMatcher(["Bob", "carol"])
+    assert matcher.find("hey BOB, how are you?") == "Bob"
+    assert matcher.find("nobody here") is None
+
+
+def test_find_excludes_sender():
+    matcher = UserIdMatcher(["alice", "bob"])
+    assert matcher.find("alice says hi", exclude="alice") is None
+    assert matcher.find("alice says hi to bob", exclude="alice") == "bob"
+
+
+def test_overlapping_ids_use_suffix_links():
+    matcher = UserIdMatcher(["she", "he", "hers"])
+    assert matcher.find("ushers", exclude="she") in {"he", "hers"}
+    assert matcher.find("xhex", exclude="he") is None
+
+
+def test_incremental_add_matches_before_and_after_rebuild():
+    matcher = UserIdMatcher(["alice"])
+    matcher.add("bob")
+    assert "bob" in matcher
+    assert matcher.find("ping bob") == "bob"
+
+    matcher.update(f"user-{i}" for i in range(1000))
+    assert len(matcher) == 1002
+    assert matcher.find("ping bob") == "bob"
+    assert matcher.find("talk to user-999 now", exclude="bob") in {
+        "user-9",
+        "user-99",
+        "user-999",
+    }
+
+
+@pytest.mark.asyncio
+async def test_add_rebuilds_in_a_worker_thread(monkeypatch):
+    builders: list[threading.Thread] = []
+    build = _Automaton.build
+
+    def record(self):
+        builders.append(threading.current_thread())
+        build(self)
+
+    matcher = UserIdMatcher(f"user-{i:03d}" for i in range(100))
+    monkeypatch.setattr(_Automaton, "build", record)
+    matcher.update(f"new-{i:03d}" for i in range(300))
+
+    # Past the threshold, yet nothing was built on the event loop.
+    assert builders == []
+    assert matcher.find("ping new-299") == "new-299"
+
+    assert matcher._rebuilding is not None
+    await matcher._rebuilding
+    assert builders and threading.main_thread() not in builders
+    # The rebuild covers the IDs known when it started; later ones stay pending.
+    assert (matcher._main.size, matcher._pending.size) == (357, 43)
+    assert matcher.find("ping new-299") == "new-299"
+    assert matcher.find("ping user-007") == "user-007"
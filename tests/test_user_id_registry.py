@@ -0,0 +1,38 @@
+import pytest
+
+from src.repository.user_id_registry import UserIdRegistry
+from src.repository.user_repository import UserRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_load_reads_existing_users(session_factory, user_store):
+    await user_store.get_user("alice")
+    registry = UserIdRegistry(session_factory, 60.0, 5.0)
+    matcher = await registry.get_matcher()
+    assert "alice" in matcher
+    assert registry.stats().loaded is True
+
+
+async def test_sync_picks_up_users_from_other_workers(session_factory):
+    local = UserRepository(session_factory)
+    other_worker = UserRepository(session_factory)
+    await local.get_user("alice")
+    matcher = await local.get_user_id_matcher()
+
+    await other_worker.get_user("bob")
+    assert "bob" not in matcher
+
+    seen = await local.user_ids.sync()
+    assert seen >= 1
+    assert "bob" in matcher
+    assert local.user_ids.stats().size == 2
+
+
+async def test_stale_registry_syncs_on_access(session_factory):
+    local = UserRepository(session_factory)
+    local.user_ids = UserIdRegistry(session_factory, 0.0, 5.0)
+    await local.get_user_id_matcher()
+    await UserRepository(session_factory).get_user("carol")
+    matcher = await local.get_user_id_matcher()
+    assert "carol" in matcher
@@ -39,3 +39,89 @@ async def test_is_user_blocked_checks_expiry(user_store: UserStore):
         await session.commit()
     blocked = await user_store.is_user_blocked("dave")
     assert blocked is False
+
+
+async def test_admit_creates_user_and_records_strikes(user_store: UserStore):
+    admission = await user_store.admit("erin")
+    assert admission.violation_count == 0
+    assert admission.was_blocked is False
+    assert await user_store.user_exists("erin")
+
+    for _ in range(3):
+        admission = await user_store.admit("erin", violation=True)
+    assert admission.violation_recorded is True
+    assert admission.is_blocked is True
+    assert admission.violation_count == 3
+
+    admission = await user_store.admit("erin", violation=True)
+    assert admission.was_blocked is True
+    assert admission.violation_recorded is False
+    assert admission.violation_count == 3
+
+
+async def test_admit_expires_due_block(user_store: UserStore):
+    for _ in range(3):
+        await user_store.add_violation("frank")
+    async with user_store._session_factory() as session:  # type: ignore[attr-defined]
+        user = await session.get(User, "frank")
+        assert user is not None
+        user.blocked_until = datetime.now(timezone.utc) - timedelta(minutes=1)
+        await session.commit()
+
+    admission = await user_store.admit("frank", violation=True)
+    assert admission.was_blocked is False
+    assert admission.is_blocked is False
+    assert admission.violation_count == 1
+
+
+async def test_admit_many_single_transaction(user_store: UserStore):
+    for _ in range(2):
+        await user_store.add_violation("gina")
+    admissions = await user_store.admit_many(
+        [("gina", False), ("gina", True), ("gina", True), ("hank", True)]
+    )
+    assert [a.violation_recorded for a in admissions] == [False, True, False, True]
+    assert admissions[1].is_blocked is True
+    assert admissions[2].was_blocked is True
+    assert admissions[3].violation_count == 1
+
+    gina = await user_store.get_user("gina")
+    hank = await user_store.get_user("hank")
+    assert (gina.violation_count, gina.is_blocked) == (3, True)
+    assert (hank.violation_count, hank.is_blocked) == (1, False)
+
+
+async def test_unblock_users_by_id_and_cutoff(user_store: UserStore):
+    for user_id in ("ivy", "jack", "kim"):
+        for _ in range(3):
+            await user_store.add_violation(user_id)
+    async with user_store._session_factory() as session:  # type: ignore[attr-defined]
+        user = await session.get(User, "kim")
+        assert user is not None
+        user.last_violation = datetime.now(timezone.utc) + timedelta(hours=1)
+        await session.commit()
+
+    assert await user_store.unblock_users(["ivy", "nobody"]) == ["ivy"]
+    assert not user_store.blocklist.contains("ivy")
+
+    unblocked = await user_store.unblock_users(
+        blocked_before=datetime.now(timezone.utc) + timedelta(minutes=1)
+    )
+    assert unblocked == ["jack"]
+    kim = await user_store.get_user("kim")
+    assert (kim.is_blocked, kim.violation_count) == (True, 3)
+
+
+async def test_list_users_keyset_pages(user_store: UserStore):
+    for i in range(5):
+        for _ in range(3 if i % 2 == 0 else 1):
+            await user_store.add_violation(f"u{i}")
+    await user_store.get_user("clean")
+
+    first = await user_store.list_users(blocked_only=False, limit=3)
+    assert [u.user_id for u in first] == ["u0", "u1", "u2"]
+    rest = await user_store.list_users(blocked_only=False, after="u2", limit=3)
+    assert [u.user_id for u in rest] == ["u3", "u4"]
+
+    blocked = [u.user_id async for u in user_store.iter_users(page_size=2)]
+    assert blocked == ["u0", "u2", "u4"]
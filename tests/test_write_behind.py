@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select
+
+from src.core.config import get_settings
+from src.db.models import User
+from src.main import create_app
+from src.repository.user_repository import UserRepository
+from src.repository.write_behind import WriteBehindQueue
+from src.services.openai_client import MockOpenAIClient
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def deferred_store(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "user_write_behind", True)
+    monkeypatch.setattr(get_settings(), "user_write_behind_interval_ms", 10_000)
+    return UserRepository(session_factory)
+
+
+async def _rows(store):
+    async with store._session_factory() as session:
+        return {u.user_id: u for u in await session.scalars(select(User))}
+
+
+async def test_batches_and_coalesces_keys():
+    batches: list[list[str]] = []
+
+    async def flush(keys):
+        batches.append(keys)
+
+    queue = WriteBehindQueue(flush, interval=10, max_batch=2)
+    for key in ("a", "b", "a", "c"):
+        queue.add(key)
+    assert len(queue) == 3
+    await asyncio.sleep(0)  # max_batch reached: the flusher wakes up early
+    await queue.aclose()
+    assert sorted(k for batch in batches for k in batch) == ["a", "b", "c"]
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+async def test_flushes_on_interval():
+    flushed = asyncio.Event()
+
+    async def flush(keys):
+        flushed.set()
+
+    queue = WriteBehindQueue(flush, interval=0.01, max_batch=100)
+    queue.add("a")
+    await asyncio.wait_for(flushed.wait(), 1)
+    assert len(queue) == 0
+    await queue.aclose()
+
+
+async def test_killed_mid_batch_loses_nothing():
+    written: list[str] = []
+    started = asyncio.Event()
+    hang = True
+
+    async def flush(keys):
+        if hang:
+            started.set()
+            await asyncio.sleep(3600)
+        written.extend(keys)
+
+    queue = WriteBehindQueue(flush, interval=10, max_batch=2)
+    queue.add("a")
+    queue.add("b")
+    await asyncio.wait_for(started.wait(), 1)
+    queue.add("c")  # queued while the first batch is in flight
+
+    hang = False
+    await queue.aclose()  # cancels the stuck flush, then drains
+    assert sorted(written) == ["a", "b", "c"]
+    assert len(queue) == 0
+
+
+async def test_failed_batch_is_retried():
+    calls = 0
+    written: list[str] = []
+
+    async def flush(keys):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("db down")
+        written.extend(keys)
+
+    queue = WriteBehindQueue(flush, interval=10, max_batch=10)
+    queue.add("a")
+    with pytest.raises(RuntimeError):
+        await queue.flush()
+    assert "a" in queue
+    await queue.aclose()
+    assert written == ["a"]
+
+
+async def test_new_users_are_registered_in_batches(deferred_store):
+    await deferred_store.user_ids.load()
+    for user_id in ("u1", "u2", "u3"):
+        admission = await deferred_store.admit(user_id)
+        assert admission.violation_count == 0 and not admission.is_blocked
+
+    assert await _rows(deferred_store) == {}
+    assert await deferred_store.user_exists("u2")
+    assert {"u1", "u2", "u3"} <= await deferred_store.get_all_user_ids()
+    assert (await deferred_store.get_user_id_matcher()).find("hi u3") == "u3"
+
+    await deferred_store.aclose()
+    assert set(await _rows(deferred_store)) == {"u1", "u2", "u3"}
+
+
+async def test_strikes_stay_synchronous(deferred_store):
+    await deferred_store.admit("eve")  # registration deferred
+    for expected in (1, 2, 3):
+        admission = await deferred_store.admit("eve", violation=True)
+        assert admission.violation_count == expected
+    assert admission.is_blocked
+
+    # Written immediately, before any flush.
+    rows = await _rows(deferred_store)
+    assert rows["eve"].violation_count == 3 and rows["eve"].is_blocked
+
+    deferred_store.blocklist.discard("eve")
+    admission = await deferred_store.admit("eve")
+    assert admission.was_blocked
+    await deferred_store.aclose()  # the deferred insert must not reset strikes
+    assert (await _rows(deferred_store))["eve"].violation_count == 3
+
+
+async def test_shutdown_flushes_pending_registrations(deferred_store):
+    app = create_app()
+    with (
+        patch("src.main.get_user_repository", return_value=deferred_store),
+        patch("src.main.get_openai_client", return_value=MockOpenAIClient()),
+        patch("src.main.warm_up_db", AsyncMock()),
+    ):
+        async with app.router.lifespan_context(app):
+            await deferred_store.admit("new")
+            assert "new" in deferred_store.write_behind
+    assert "new" in await _rows(deferred_store)